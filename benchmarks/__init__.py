@@ -0,0 +1 @@
+"""Нагрузочные замеры производительности моделей, расчетов и интерфейса"""
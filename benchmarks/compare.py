@@ -0,0 +1,50 @@
+"""Сравнение двух файлов результатов замеров
+
+Пример:
+    python -m benchmarks.compare base.json new.json --threshold 0.1
+
+Код возврата 1, если хотя бы один замер стал медленнее более чем на threshold.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(base, new, threshold=0.1):
+    """
+    Сравнение замеров с одинаковыми именами по минимальному времени
+    (минимум меньше всего зависит от фоновой нагрузки на машину)
+
+    Returns:
+        list: кортежи (имя, базовое время, новое время, отношение, регрессия ли это)
+    """
+    base_results = {result['name']: result for result in base['results']}
+    rows = []
+    for result in new['results']:
+        previous = base_results.get(result['name'])
+        if previous is None or not previous['min']:
+            continue
+        ratio = result['min'] / previous['min']
+        rows.append((result['name'], previous['min'], result['min'], ratio, ratio > 1 + threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Сравнение результатов замеров")
+    parser.add_argument('base')
+    parser.add_argument('new')
+    parser.add_argument('--threshold', type=float, default=0.1,
+                        help="допустимое относительное замедление")
+    args = parser.parse_args(argv)
+
+    with open(args.base, encoding='utf-8') as base_file, open(args.new, encoding='utf-8') as new_file:
+        rows = compare(json.load(base_file), json.load(new_file), args.threshold)
+
+    for name, base_time, new_time, ratio, regression in rows:
+        mark = "  РЕГРЕССИЯ" if regression else ""
+        print(f"{name:40s} {base_time * 1000:10.3f} мс -> {new_time * 1000:10.3f} мс  x{ratio:.2f}{mark}")
+    return 1 if any(row[4] for row in rows) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
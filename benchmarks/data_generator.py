@@ -0,0 +1,127 @@
+"""Генератор синтетических данных для замеров производительности
+
+Дополняет базовые данные db.sql / db_sqlite.sql партнерами, продукцией,
+заявками и позициями заявок в заданном масштабе. Данные воспроизводимы:
+при одинаковых параметрах и seed генерируется один и тот же набор.
+"""
+import random
+
+
+# Количество строк в одном пакете вставки (одна транзакция на пакет)
+CHUNK_SIZE = 5000
+
+
+def generate(db, partners=1000, requests=None, lines_per_request=3, products=None, seed=42):
+    """
+    Заполнение базы синтетическими данными
+
+    Args:
+        db: DatabaseConnection (любое хранилище)
+        partners: количество новых партнеров
+        requests: количество новых заявок (по умолчанию равно числу партнеров)
+        lines_per_request: количество позиций в каждой заявке
+        products: количество новой продукции (по умолчанию partners // 10, не меньше 100)
+        seed: начальное значение генератора случайных чисел
+
+    Returns:
+        dict: количество созданных партнеров, продукции, заявок и позиций
+    """
+    rng = random.Random(seed)
+    if requests is None:
+        requests = partners
+    if products is None:
+        products = max(100, partners // 10)
+
+    partner_type_ids = _ids(db, "SELECT id FROM partner_types")
+    product_type_ids = _ids(db, "SELECT id FROM product_types")
+
+    first = _max_id(db, 'partners')
+    _insert(db, """
+        INSERT INTO partners (partner_type_id, company_name, director_name, email,
+                              phone, legal_address, inn, rating)
+        VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+    """, (
+        (
+            rng.choice(partner_type_ids),
+            f"Партнер {seed}-{i}",
+            f"Директор {i}",
+            f"partner{seed}_{i}@example.ru",
+            f"{rng.randint(100, 999)} {rng.randint(100, 999)} {rng.randint(10, 99)} {rng.randint(10, 99)}",
+            f"{rng.randint(100000, 999999)}, город {i % 1000}, ул. Тестовая, {i % 100}",
+            f"B{seed:03d}{i:09d}",
+            rng.randint(0, 10),
+        )
+        for i in range(partners)
+    ))
+    partner_ids = _ids(db, "SELECT id FROM partners WHERE id > %s ORDER BY id", (first,))
+
+    first = _max_id(db, 'products')
+    _insert(db, """
+        INSERT INTO products (product_type_id, product_name, article, min_cost_for_partner)
+        VALUES (%s, %s, %s, %s)
+    """, (
+        (
+            rng.choice(product_type_ids),
+            f"Продукция {seed}-{i}",
+            f"B{seed:03d}{i:09d}",
+            round(rng.uniform(100, 10000), 2),
+        )
+        for i in range(products)
+    ))
+    product_rows = db.execute_query(
+        "SELECT id, min_cost_for_partner FROM products WHERE id > %s ORDER BY id", (first,)
+    ) or []
+
+    first = _max_id(db, 'partner_requests')
+    _insert(db, """
+        INSERT INTO partner_requests (partner_id, request_date, status, total_cost)
+        VALUES (%s, NOW(), 'Новая', 0.00)
+    """, ((rng.choice(partner_ids),) for _ in range(requests)))
+    request_ids = _ids(db, "SELECT id FROM partner_requests WHERE id > %s ORDER BY id", (first,))
+
+    # Общую стоимость заявок пересчитывают триггеры на request_products
+    lines_per_request = min(lines_per_request, len(product_rows))
+    _insert(db, """
+        INSERT INTO request_products (request_id, product_id, quantity, cost_per_unit)
+        VALUES (%s, %s, %s, %s)
+    """, (
+        (request_id, product['id'], rng.randint(1, 10000), product['min_cost_for_partner'])
+        for request_id in request_ids
+        for product in rng.sample(product_rows, lines_per_request)
+    ))
+
+    return {
+        'partners': len(partner_ids),
+        'products': len(product_rows),
+        'requests': len(request_ids),
+        'lines': len(request_ids) * lines_per_request,
+    }
+
+
+def _insert(db, query, rows):
+    """Вставка строк пакетами, по одной транзакции на пакет"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= CHUNK_SIZE:
+            _insert_chunk(db, query, chunk)
+            chunk = []
+    if chunk:
+        _insert_chunk(db, query, chunk)
+
+
+def _insert_chunk(db, query, chunk):
+    """Вставка одного пакета строк"""
+    if not db.execute_many(query, chunk):
+        raise RuntimeError("Не удалось записать синтетические данные")
+
+
+def _ids(db, query, params=None):
+    """Список идентификаторов из первого столбца id"""
+    return [row['id'] for row in db.execute_query(query, params) or []]
+
+
+def _max_id(db, table):
+    """Наибольший идентификатор в таблице (0 для пустой таблицы)"""
+    result = db.execute_query(f"SELECT MAX(id) as max_id FROM {table}")
+    return (result[0]['max_id'] or 0) if result else 0
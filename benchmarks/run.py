@@ -0,0 +1,229 @@
+"""Запуск замеров производительности с сохранением результатов в JSON
+
+Пример:
+    python -m benchmarks.run --scale 10000 --output results.json
+
+По умолчанию замеры выполняются на временной базе SQLite, заполненной
+генератором синтетических данных. Замер окна интерфейса требует дисплея
+(например, виртуального: ``xvfb-run python -m benchmarks.run``) и без него
+пропускается.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks import data_generator
+
+
+def measure(func, repeat=5, number=1):
+    """
+    Замер времени выполнения функции
+
+    Args:
+        func: функция без аргументов
+        repeat: количество серий
+        number: количество вызовов в серии
+
+    Returns:
+        dict: время одного вызова в секундах (минимум, медиана, среднее по сериям)
+    """
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        timings.append((time.perf_counter() - start) / number)
+    return {
+        'repeat': repeat,
+        'number': number,
+        'min': min(timings),
+        'median': statistics.median(timings),
+        'mean': statistics.mean(timings),
+    }
+
+
+def model_cases(db, rng):
+    """Замеры моделей: выборки заявок и позиций, изменение позиций"""
+    from models.partner_request import PartnerRequest
+
+    model = PartnerRequest(db)
+    request_ids = [row['id'] for row in db.execute_query("SELECT id FROM partner_requests")]
+    product_ids = [row['id'] for row in db.execute_query("SELECT id FROM products")]
+
+    yield 'get_all_requests_with_partners', model.get_all_requests_with_partners, 3, 1
+    yield 'get_requests_page', lambda: model.get_requests_page(page_size=50), 5, 20
+    yield 'get_request_products', lambda: model.get_request_products(rng.choice(request_ids)), 5, 100
+    yield 'add_product_to_request', lambda: model.add_product_to_request(
+        rng.choice(request_ids), rng.choice(product_ids), rng.randint(1, 100)
+    ), 5, 50
+    yield 'add_products_to_request_100', lambda: model.add_products_to_request(
+        rng.choice(request_ids),
+        [(product_id, rng.randint(1, 100)) for product_id in rng.sample(product_ids, 100)]
+    ), 5, 5
+
+
+def calculation_cases(db, rng):
+    """Замеры расчетов: материалы (поштучно и пакетом) и стоимость заявки"""
+    from utils.calculations import calculate_order_cost
+    from utils.material_calculator import calculate_material_amount, calculate_material_amounts
+
+    rows = [
+        (rng.randint(1, 5), rng.randint(1, 5), rng.randint(0, 10000), rng.randint(0, 1000),
+         round(rng.uniform(0.1, 10), 2), round(rng.uniform(0.1, 10), 2))
+        for _ in range(10000)
+    ]
+    products = [
+        {'quantity': rng.randint(1, 10000), 'min_cost_for_partner': round(rng.uniform(100, 10000), 2)}
+        for _ in range(1000)
+    ]
+
+    yield 'material_calculator_single', lambda: calculate_material_amount(*rows[0], db), 5, 1000
+    yield 'material_calculator_batch_10000', lambda: calculate_material_amounts(rows, db), 5, 1
+    yield 'calculate_order_cost_1000', lambda: calculate_order_cost(products), 5, 10
+    try:
+        from utils.material_engine import MaterialEngine
+    except ImportError:
+        return
+    engine = MaterialEngine.from_database(db)
+    columns = list(zip(*rows))
+    yield 'material_engine_10000', lambda: engine.calculate(*columns), 5, 10
+
+
+def ui_cases():
+    """Замер обновления списка заявок в главном окне (нужен дисплей)"""
+    import tkinter as tk
+
+    try:
+        tk.Tk().destroy()
+    except tk.TclError:
+        return
+
+    from views.main_window import MainWindow
+
+    app = MainWindow()
+    done = []
+    on_loaded = app._on_requests_loaded
+
+    def on_requests_loaded(result):
+        on_loaded(result)
+        done.append(True)
+
+    app._on_requests_loaded = on_requests_loaded
+
+    def load_requests():
+        # Время от запроса до отрисовки карточек первой страницы
+        done.clear()
+        app.load_requests()
+        while not done:
+            app.root.update()
+        app.root.update_idletasks()
+
+    try:
+        load_requests()
+        yield 'main_window_load_requests', load_requests, 5, 1
+    finally:
+        app.executor.shutdown()
+        app.db.disconnect()
+        app.root.destroy()
+
+
+def run(scale, lines_per_request=3, seed=42, include_ui=True):
+    """
+    Генерация данных и выполнение всех замеров
+
+    Returns:
+        dict: описание окружения и результаты замеров
+    """
+    from database import connection
+    from database.backends import SQLiteBackend
+    from database.connection import DatabaseConnection
+
+    directory = tempfile.mkdtemp(prefix='partner_orders_bench_')
+    path = os.path.join(directory, 'bench.sqlite3')
+    # Главное окно создает собственное подключение, поэтому хранилище
+    # по умолчанию переключается на временную базу
+    connection.DB_BACKEND = 'sqlite'
+    connection.SQLITE_CONFIG['path'] = path
+
+    db = DatabaseConnection(backend=SQLiteBackend(path, connection.SQLITE_CONFIG['schema_path']))
+    db.error_reporter = lambda title, message: print(f"{title}: {message}", file=sys.stderr)
+    if not db.connect():
+        raise RuntimeError("Не удалось открыть базу для замеров")
+
+    try:
+        start = time.perf_counter()
+        counts = data_generator.generate(
+            db, partners=scale, lines_per_request=lines_per_request, seed=seed
+        )
+        generation_time = time.perf_counter() - start
+
+        rng = random.Random(seed)
+        cases = list(model_cases(db, rng)) + list(calculation_cases(db, rng))
+        results = []
+        for name, func, repeat, number in cases:
+            results.append({'name': name, **measure(func, repeat, number)})
+            print(f"{name:40s} {results[-1]['median'] * 1000:10.3f} мс", file=sys.stderr)
+        if include_ui:
+            for name, func, repeat, number in ui_cases():
+                results.append({'name': name, **measure(func, repeat, number)})
+                print(f"{name:40s} {results[-1]['median'] * 1000:10.3f} мс", file=sys.stderr)
+    finally:
+        db.disconnect()
+        shutil.rmtree(directory, ignore_errors=True)
+
+    return {
+        'environment': _environment(),
+        'dataset': {'scale': scale, 'seed': seed, 'generation_seconds': generation_time, **counts},
+        'results': results,
+    }
+
+
+def _environment():
+    """Сведения о версии кода и окружении"""
+    try:
+        commit = subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        'commit': commit,
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'sqlite': sqlite3.sqlite_version,
+        'backend': 'sqlite',
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Замеры производительности")
+    parser.add_argument('--scale', type=int, default=1000,
+                        help="количество синтетических партнеров и заявок (10^3–10^6)")
+    parser.add_argument('--lines', type=int, default=3, help="позиций в каждой заявке")
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--no-ui', action='store_true', help="не замерять окно интерфейса")
+    parser.add_argument('--output', help="файл для результатов в формате JSON (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+
+    report = run(args.scale, args.lines, args.seed, include_ui=not args.no_ui)
+    text = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as output:
+            output.write(text + '\n')
+    else:
+        print(text)
+
+
+if __name__ == '__main__':
+    main()
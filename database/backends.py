@@ -0,0 +1,381 @@
+"""Хранилища данных: сервер MySQL и встроенная база SQLite"""
+import datetime
+import functools
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import uuid
+from collections import OrderedDict
+from decimal import Decimal
+
+import mysql.connector
+
+
+# Коды ошибок MySQL: соединение не установлено (запрос не отправлялся)
+CONNECT_ERRORS = {2002, 2003, 2005}
+# Коды ошибок MySQL: соединение потеряно (сервер закрыл его по wait_timeout,
+# перезапустился или связь прервалась)
+DISCONNECT_ERRORS = {2006, 2013, 2055, 4031}
+
+
+class MySQLBackend:
+    """Хранилище на сервере MySQL (mysql-connector)"""
+    name = 'mysql'
+    errors = (mysql.connector.Error,)
+    # Часто выполняемые запросы подготавливаются на сервере (см. StatementCache)
+    prepared_statements = True
+
+    def __init__(self, config, statement_cache_size=64):
+        self.config = config
+        self.statement_cache_size = statement_cache_size
+
+    def create_connection(self):
+        """Открытие нового соединения с MySQL"""
+        # Без явной единицы работы каждый запрос фиксируется сразу, поэтому
+        # соединение из пула не держит устаревший снимок данных
+        return mysql.connector.connect(autocommit=True, **self.config)
+
+    @staticmethod
+    def ping(connection):
+        """Проверка, что соединение все еще живо"""
+        connection.ping(reconnect=False)
+        return True
+
+    @staticmethod
+    def reset(connection):
+        """Откат незавершенной транзакции перед возвратом соединения в пул"""
+        if connection.in_transaction:
+            connection.rollback()
+
+    @staticmethod
+    def is_connect_failure(error):
+        """Ошибка установки соединения"""
+        return getattr(error, 'errno', None) in CONNECT_ERRORS
+
+    @staticmethod
+    def is_disconnect(error):
+        """Ошибка из-за потерянного соединения (само соединение больше не пригодно)"""
+        errno = getattr(error, 'errno', None)
+        if errno in CONNECT_ERRORS or errno in DISCONNECT_ERRORS:
+            return True
+        # "MySQL Connection not available" выдается без кода ошибки
+        return errno is None and isinstance(
+            error, (mysql.connector.OperationalError, mysql.connector.InterfaceError)
+        )
+
+    def prepare(self, connection, query):
+        """Подготовленное выражение из кэша соединения"""
+        # Кэш хранится в самом соединении и закрывается вместе с ним
+        cache = getattr(connection, 'statement_cache', None)
+        if cache is None:
+            cache = connection.statement_cache = StatementCache(connection, self.statement_cache_size)
+        return cache.get(query)
+
+
+class SQLiteBackend:
+    """Встроенное хранилище SQLite для локальной работы без сервера
+
+    База хранится в одном файле в режиме WAL: читатели не блокируют
+    записывающего, поэтому пул соединений работает так же, как с MySQL.
+    Запросы моделей написаны для MySQL и переводятся на диалект SQLite
+    при выполнении (см. ``translate``). Если файла базы нет, он создается
+    по скрипту ``schema_path`` (та же схема и те же начальные данные).
+    """
+    name = 'sqlite'
+    errors = (sqlite3.Error,)
+    # Модуль sqlite3 сам кэширует скомпилированные запросы соединения
+    # (параметр cached_statements), отдельный кэш не нужен
+    prepared_statements = False
+    statement_cache_size = 256
+
+    # Настройки соединения: WAL, умеренная синхронизация, кэш страниц в памяти
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA foreign_keys = ON",
+        "PRAGMA busy_timeout = 5000",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -16000",
+        "PRAGMA mmap_size = 268435456",
+    )
+
+    def __init__(self, path, schema_path=None):
+        self.path = path
+        self.schema_path = schema_path
+        # База в памяти (':memory:') открывается по URI с общим кэшем, чтобы все
+        # соединения пула видели одну базу. Она существует, пока открыто хотя бы
+        # одно соединение, поэтому хранилище держит собственное соединение
+        self._memory_uri = None
+        self._memory_anchor = None
+        self._memory_lock = threading.Lock()
+
+    def create_connection(self):
+        """Открытие нового соединения с файлом базы (с созданием схемы при первом запуске)"""
+        if self.path == ':memory:':
+            self._open_memory_database()
+            raw = self._connect(self._memory_uri, uri=True)
+        else:
+            new_database = not os.path.exists(self.path)
+            raw = self._connect(self.path)
+            if new_database:
+                self._create_schema(raw)
+        return SQLiteConnection(raw)
+
+    def _connect(self, database, uri=False):
+        """Открытие соединения sqlite3 с функциями и настройками приложения"""
+        # Транзакциями управляет DatabaseConnection, поэтому модуль sqlite3
+        # не должен открывать их неявно
+        raw = sqlite3.connect(
+            database, isolation_level=None, check_same_thread=False,
+            cached_statements=self.statement_cache_size, uri=uri
+        )
+        raw.row_factory = sqlite3.Row
+        raw.create_function('NOW', 0, _now)
+        raw.create_function('MD5', 1, _md5)
+        for pragma in self.PRAGMAS:
+            raw.execute(pragma)
+        return raw
+
+    def _open_memory_database(self):
+        """Создание общей базы в памяти и ее схемы (один раз на хранилище)"""
+        with self._memory_lock:
+            if self._memory_anchor is not None:
+                return
+            uri = f"file:partner_orders_{uuid.uuid4().hex}?mode=memory&cache=shared"
+            anchor = self._connect(uri, uri=True)
+            self._create_schema(anchor)
+            self._memory_uri = uri
+            self._memory_anchor = anchor
+
+    def _create_schema(self, raw):
+        """Создание схемы и начальных данных по скрипту schema_path"""
+        if self.schema_path:
+            with open(self.schema_path, encoding='utf-8') as schema:
+                raw.executescript(schema.read())
+
+    @staticmethod
+    def ping(connection):
+        """Проверка, что соединение все еще живо"""
+        connection.raw.execute("SELECT 1")
+        return True
+
+    @staticmethod
+    def reset(connection):
+        """Откат незавершенной транзакции перед возвратом соединения в пул"""
+        connection.rollback()
+
+    @staticmethod
+    def is_connect_failure(error):
+        """У встроенной базы нет сетевого соединения"""
+        return False
+
+    @staticmethod
+    def is_disconnect(error):
+        """У встроенной базы нет сетевого соединения"""
+        return False
+
+
+class SQLiteConnection:
+    """Соединение SQLite с интерфейсом соединения mysql-connector
+
+    Реализует только то, что использует DatabaseConnection: курсоры со
+    строками-словарями, явное начало транзакции, фиксацию и откат.
+    """
+    def __init__(self, raw):
+        self.raw = raw
+
+    def cursor(self, dictionary=False, buffered=None):
+        """Новый курсор; курсор SQLite читает строки по мере выборки в любом случае"""
+        return SQLiteCursor(self.raw.cursor(), dictionary)
+
+    def start_transaction(self):
+        """Начало транзакции
+
+        Явные транзакции открываются только для записи, поэтому блокировка
+        записи берется сразу (BEGIN IMMEDIATE). При отложенном BEGIN два
+        соединения, начавшие с чтения, получали бы SQLITE_BUSY при переходе
+        к записи, и busy_timeout внутри транзакции этого не повторяет.
+        """
+        self.raw.execute("BEGIN IMMEDIATE")
+
+    def commit(self):
+        """Фиксация транзакции"""
+        if self.raw.in_transaction:
+            self.raw.execute("COMMIT")
+
+    def rollback(self):
+        """Откат транзакции"""
+        if self.raw.in_transaction:
+            self.raw.execute("ROLLBACK")
+
+    def consume_results(self):
+        """Непрочитанные строки SQLite не мешают следующим запросам"""
+
+    def close(self):
+        """Закрытие соединения"""
+        self.raw.close()
+
+
+class SQLiteCursor:
+    """Курсор SQLite, принимающий запросы в диалекте MySQL"""
+    def __init__(self, raw, dictionary):
+        self.raw = raw
+        self.dictionary = dictionary
+
+    @property
+    def lastrowid(self):
+        return self.raw.lastrowid
+
+    @property
+    def rowcount(self):
+        return self.raw.rowcount
+
+    def execute(self, query, params=None):
+        self.raw.execute(translate(query), _adapt_params(params))
+
+    def executemany(self, query, params_list):
+        self.raw.executemany(translate(query), [_adapt_params(params) for params in params_list])
+
+    def fetchone(self):
+        row = self.raw.fetchone()
+        return self._convert(row) if row is not None else None
+
+    def fetchmany(self, size):
+        return [self._convert(row) for row in self.raw.fetchmany(size)]
+
+    def fetchall(self):
+        return [self._convert(row) for row in self.raw.fetchall()]
+
+    def close(self):
+        self.raw.close()
+
+    def _convert(self, row):
+        """Строка в виде словаря (как у курсора mysql-connector с dictionary=True)"""
+        return dict(row) if self.dictionary else tuple(row)
+
+
+# Код ошибки MySQL "неизвестный идентификатор подготовленного выражения"
+ER_UNKNOWN_STMT_HANDLER = 1243
+
+
+class PreparedStatement:
+    """Подготовленное на сервере выражение (курсор mysql-connector с prepared=True)
+
+    Выражение подготавливается при первом выполнении и затем выполняется
+    повторно без разбора запроса сервером. Если сервер больше не знает
+    выражение (соединение было переустановлено), оно подготавливается заново.
+    """
+    def __init__(self, connection, query):
+        self.connection = connection
+        self.query = query
+        self.cursor = None
+
+    @property
+    def lastrowid(self):
+        return self.cursor.lastrowid
+
+    @property
+    def rowcount(self):
+        return self.cursor.rowcount
+
+    def execute(self, query=None, params=None):
+        """Выполнение выражения; текст запроса берется из кэша"""
+        if self.cursor is None:
+            self.cursor = self.connection.cursor(prepared=True, dictionary=True)
+        try:
+            # Курсор сравнивает запрос по идентичности объекта, поэтому
+            # передается всегда один и тот же объект строки
+            self.cursor.execute(self.query, params)
+        except mysql.connector.Error as e:
+            if e.errno != ER_UNKNOWN_STMT_HANDLER:
+                raise
+            # Прежний курсор закрывается, чтобы не оставлять его открытым
+            self.close()
+            self.cursor = self.connection.cursor(prepared=True, dictionary=True)
+            self.cursor.execute(self.query, params)
+
+    def fetchall(self):
+        return self.cursor.fetchall()
+
+    def close(self):
+        """Освобождение выражения на сервере"""
+        if self.cursor is not None:
+            try:
+                self.cursor.close()
+            except mysql.connector.Error:
+                pass
+            self.cursor = None
+
+
+class StatementCache:
+    """LRU-кэш подготовленных выражений одного соединения (ключ - текст запроса)"""
+    def __init__(self, connection, capacity=64):
+        self.connection = connection
+        self.capacity = capacity
+        self._statements = OrderedDict()
+
+    def __len__(self):
+        return len(self._statements)
+
+    def get(self, query):
+        """Подготовленное выражение для запроса (создается при промахе)"""
+        statement = self._statements.get(query)
+        if statement is not None:
+            self._statements.move_to_end(query)
+            return statement
+
+        statement = self._statements[query] = PreparedStatement(self.connection, query)
+        if len(self._statements) > self.capacity:
+            _, evicted = self._statements.popitem(last=False)
+            evicted.close()
+        return statement
+
+    def clear(self):
+        """Освобождение всех выражений (например, после переподключения)"""
+        for statement in self._statements.values():
+            statement.close()
+        self._statements.clear()
+
+
+# Замены конструкций MySQL на эквиваленты SQLite
+_ON_DUPLICATE = re.compile(r'ON\s+DUPLICATE\s+KEY\s+UPDATE', re.IGNORECASE)
+_VALUES_FUNCTION = re.compile(r'\bVALUES\((\w+)\)', re.IGNORECASE)
+
+
+@functools.lru_cache(maxsize=256)
+def translate(query):
+    """
+    Перевод запроса моделей с диалекта MySQL на диалект SQLite
+
+    Заменяются параметры ``%s`` на ``?`` и ``ON DUPLICATE KEY UPDATE ...
+    VALUES(столбец)`` на ``ON CONFLICT DO UPDATE SET ... excluded.столбец``.
+    Функции NOW() и MD5() регистрируются в соединении.
+    """
+    query = query.replace('%s', '?')
+    if _ON_DUPLICATE.search(query):
+        query = _ON_DUPLICATE.sub('ON CONFLICT DO UPDATE SET', query)
+        query = _VALUES_FUNCTION.sub(r'excluded.\1', query)
+    return query
+
+
+def _adapt_params(params):
+    """Приведение параметров к типам, которые понимает sqlite3"""
+    if not params:
+        return ()
+    return tuple(str(value) if isinstance(value, Decimal) else value for value in params)
+
+
+def _now():
+    """Аналог NOW() MySQL: локальное время в формате DATETIME"""
+    return datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+
+
+def _md5(value):
+    """Аналог MD5() MySQL: шестнадцатеричный хэш или NULL"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        value = value.encode('utf-8')
+    return hashlib.md5(value).hexdigest()
@@ -1,74 +1,694 @@
 """Модуль для управления подключением к базе данных"""
-import mysql.connector
+import os
+import random
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
 from mysql.connector import Error
-from tkinter import messagebox
+
+from database.backends import MySQLBackend, SQLiteBackend
+from database.errors import DatabaseError, log_error
+from database.instrumentation import QueryInstrumentation, estimate_size
+
+
+# Параметры подключения к базе данных
+DB_CONFIG = {
+    'host': 'localhost',
+    'database': 'user2',
+    'user': 'root',
+    'password': '',
+    'charset': 'utf8mb4'
+}
+
+# Хранилище данных: 'mysql' (сервер, DB_CONFIG) или 'sqlite' (локальный файл,
+# SQLITE_CONFIG); выбирается переменной окружения PARTNER_DB_BACKEND
+DB_BACKEND = os.environ.get('PARTNER_DB_BACKEND', 'mysql')
+
+# Параметры встроенной базы SQLite
+SQLITE_CONFIG = {
+    'path': os.environ.get('PARTNER_DB_PATH', 'partner_orders.sqlite3'),
+    'schema_path': os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'db_sqlite.sql')
+}
+
+
+# Учет запросов: запросы дольше threshold секунд пишутся в журнал медленных
+# запросов (логгер partner_orders.sql и файл log_path, если он задан)
+SLOW_QUERY_CONFIG = {
+    'slow_threshold': 0.2,
+    'log_path': os.environ.get('PARTNER_SLOW_QUERY_LOG')
+}
+
+
+# Повтор после потери соединения с сервером: количество попыток и границы
+# задержки (экспоненциальный рост со случайным разбросом), секунды
+RETRY_CONFIG = {
+    'attempts': 3,
+    'base_delay': 0.1,
+    'max_delay': 2.0
+}
+
+
+def create_backend(name=None):
+    """Создание хранилища по имени ('mysql' или 'sqlite')"""
+    name = name or DB_BACKEND
+    if name == 'mysql':
+        return MySQLBackend(DB_CONFIG)
+    if name == 'sqlite':
+        return SQLiteBackend(**SQLITE_CONFIG)
+    raise ValueError(f"Неизвестное хранилище данных: {name!r}")
+
+
+class PoolError(Error):
+    """Ошибка пула соединений (например, нет свободных соединений)"""
+
+
+class ConnectionPool:
+    """Пул соединений с базой данных
+
+    Соединения создаются по требованию, но не более ``size`` одновременно.
+    Перед повторной выдачей соединение проверяется функцией ``health_check``
+    (если оно простаивало дольше ``validation_interval`` секунд), а
+    простаивающие дольше ``idle_timeout`` секунд соединения закрываются.
+    Возвращаемое соединение сбрасывается функцией ``reset`` (откат незавершенной
+    транзакции), чтобы следующий владелец не читал устаревший снимок данных.
+    """
+    def __init__(self, connection_factory, size=5, idle_timeout=300,
+                 checkout_timeout=10, health_check=None, validation_interval=0,
+                 reset=None):
+        if size < 1:
+            raise ValueError("Размер пула должен быть положительным")
+        self.connection_factory = connection_factory
+        self.size = size
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check = health_check
+        self.validation_interval = validation_interval
+        self.reset = reset
+
+        self._idle = deque()  # (соединение, время возврата в пул)
+        self._created = 0
+        self._closed = False
+        self._condition = threading.Condition()
+
+    @property
+    def created(self):
+        """Количество открытых соединений (свободных и выданных)"""
+        return self._created
+
+    @property
+    def idle(self):
+        """Количество свободных соединений в пуле"""
+        return len(self._idle)
+
+    def checkout(self, timeout=None):
+        """Получение соединения из пула"""
+        if timeout is None:
+            timeout = self.checkout_timeout
+        deadline = time.monotonic() + timeout
+
+        while True:
+            connection = None
+            create = False
+            with self._condition:
+                if self._closed:
+                    raise PoolError(msg="Пул соединений закрыт")
+                expired = self._evict_idle()
+                if self._idle:
+                    # Берем последнее возвращенное соединение: оно "теплее" остальных
+                    connection, returned_at = self._idle.pop()
+                elif self._created < self.size:
+                    self._created += 1
+                    create = True
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolError(msg="Нет свободных соединений с базой данных")
+                    # Простаивающих соединений нет, поэтому закрывать нечего
+                    self._condition.wait(remaining)
+                    continue
+
+            # Закрытие устаревших соединений (обмен с сервером) выполняется вне
+            # блокировки, чтобы не задерживать остальные потоки
+            for stale in expired:
+                self._close_quietly(stale)
+
+            # Создание и проверка соединения выполняются вне блокировки
+            if create:
+                try:
+                    return self.connection_factory()
+                except Exception:
+                    self._forget()
+                    raise
+
+            # Недавно использованное соединение не проверяется: потерю
+            # соединения обрабатывает повтор запроса в DatabaseConnection
+            if time.monotonic() - returned_at < self.validation_interval:
+                return connection
+            if self._is_healthy(connection):
+                return connection
+            self._close_quietly(connection)
+            self._forget()
+
+    def checkin(self, connection, discard=False):
+        """Возврат соединения в пул"""
+        if not discard and self.reset is not None:
+            try:
+                self.reset(connection)
+            except Exception:
+                # Соединение, которое не удалось сбросить, не возвращается в пул
+                discard = True
+
+        with self._condition:
+            if discard or self._closed:
+                self._created -= 1
+            else:
+                self._idle.append((connection, time.monotonic()))
+                connection = None
+            self._condition.notify()
+
+        if connection is not None:
+            self._close_quietly(connection)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Контекстный менеджер: выдача соединения и его возврат в пул"""
+        connection = self.checkout(timeout)
+        try:
+            yield connection
+        finally:
+            self.checkin(connection)
+
+    def close_all(self):
+        """Закрытие всех свободных соединений и самого пула"""
+        with self._condition:
+            self._closed = True
+            idle = [connection for connection, _ in self._idle]
+            self._idle.clear()
+            self._created -= len(idle)
+            self._condition.notify_all()
+
+        for connection in idle:
+            self._close_quietly(connection)
+
+    def _evict_idle(self):
+        """Изъятие соединений, простаивающих дольше idle_timeout (под блокировкой)
+
+        Возвращает список изъятых соединений: их закрывает вызывающий код
+        после снятия блокировки.
+        """
+        expired = []
+        if not self.idle_timeout:
+            return expired
+        threshold = time.monotonic() - self.idle_timeout
+        # Самые старые соединения находятся в начале очереди
+        while self._idle and self._idle[0][1] < threshold:
+            connection, _ = self._idle.popleft()
+            self._created -= 1
+            expired.append(connection)
+        return expired
+
+    def _forget(self):
+        """Учет закрытого соединения, которое не вернется в пул"""
+        with self._condition:
+            self._created -= 1
+            self._condition.notify()
+
+    def _is_healthy(self, connection):
+        """Проверка соединения перед повторной выдачей"""
+        if self.health_check is None:
+            return True
+        try:
+            return self.health_check(connection) is not False
+        except Exception:
+            return False
+
+    @staticmethod
+    def _close_quietly(connection):
+        """Закрытие соединения без выброса исключений"""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+class Transaction:
+    """Единица работы в рамках DatabaseConnection.transaction()
+
+    Вложенные единицы работы выполняются на соединении внешней и
+    оформляются точками сохранения (SAVEPOINT).
+    """
+    def __init__(self, connection, parent=None, savepoint=None):
+        self.connection = connection
+        self.parent = parent
+        self.savepoint = savepoint
+        self.depth = parent.depth + 1 if parent else 0
+        self.rollback_only = False
+        self.committed = False
+        self.broken = False  # соединение непригодно для возврата в пул
+        self._on_commit = []
+
+    def set_rollback_only(self):
+        """Пометка единицы работы на откат при выходе из блока"""
+        self.rollback_only = True
+
+    def on_commit(self, callback):
+        """Регистрация функции, вызываемой после фиксации внешней транзакции"""
+        self._on_commit.append(callback)
 
 
 class DatabaseConnection:
-    """Класс для управления подключением к базе данных"""
-    def __init__(self):
-        self.connection = None
-        self.cursor = None
-        
+    """Класс для управления подключением к базе данных
+
+    Каждый запрос получает собственное соединение из пула и собственный курсор,
+    поэтому модели можно использовать одновременно из нескольких окон и потоков.
+    Внутри блока ``with db.transaction():`` запросы текущего потока выполняются
+    на одном соединении и фиксируются один раз при выходе из блока.
+    """
+    def __init__(self, pool_size=5, idle_timeout=300, backend=None, raise_errors=False):
+        self.backend = backend or create_backend()
+        # Ошибки, которые перехватываются и показываются пользователю
+        self.errors = (PoolError,) + tuple(self.backend.errors)
+        self.pool_size = pool_size
+        self.idle_timeout = idle_timeout
+        self.pool = None
+        self.retry_attempts = RETRY_CONFIG['attempts']
+        self.retry_base_delay = RETRY_CONFIG['base_delay']
+        self.retry_max_delay = RETRY_CONFIG['max_delay']
+        # Функция сообщения об ошибках (title, message). По умолчанию ошибки
+        # пишутся в журнал; окно приложения устанавливает показ диалога
+        self.error_reporter = log_error
+        # Выбрасывать DatabaseError вместо сообщения и возврата None/False
+        self.raise_errors = raise_errors
+        # Статистика выполнения запросов (см. database/instrumentation.py)
+        self.instrumentation = QueryInstrumentation(**SLOW_QUERY_CONFIG)
+        # Текущая единица работы потока (см. transaction)
+        self._local = threading.local()
+
     def connect(self):
         """Установка соединения с базой данных"""
         try:
-            self.connection = mysql.connector.connect(
-                host='localhost',
-                database='user2',
-                user='root',
-                password='',
-                charset='utf8mb4'
+            self.instrumentation.open()
+            self.pool = ConnectionPool(
+                self.backend.create_connection,
+                size=self.pool_size,
+                idle_timeout=self.idle_timeout,
+                health_check=self.backend.ping,
+                validation_interval=30,
+                reset=self.backend.reset
             )
-            self.cursor = self.connection.cursor(dictionary=True)
+            # Проверяем доступность сервера, сразу открывая первое соединение
+            with self.pool.connection():
+                pass
             return True
-        except Error as e:
-            messagebox.showerror("Ошибка подключения", f"Не удалось подключиться к базе данных:\n{str(e)}")
+        except self.errors as e:
+            self._report("Ошибка подключения", f"Не удалось подключиться к базе данных:\n{str(e)}", e)
             return False
-    
+
     def disconnect(self):
         """Закрытие соединения с базой данных"""
-        if self.cursor:
-            self.cursor.close()
-        if self.connection and self.connection.is_connected():
-            self.connection.close()
-    
-    def execute_query(self, query, params=None):
-        """Выполнение запроса к базе данных"""
+        if self.pool:
+            self.pool.close_all()
+        self.instrumentation.close()
+
+    @contextmanager
+    def _connection(self, commit=False):
+        """Соединение текущей единицы работы или отдельное соединение из пула"""
+        transaction = self.current_transaction
+        if transaction is not None:
+            try:
+                yield transaction.connection
+            except self.errors:
+                # Ошибка запроса не выходит за пределы execute_*, поэтому
+                # единица работы откатывается при выходе из блока
+                transaction.set_rollback_only()
+                raise
+            return
+
+        connection = self.pool.checkout()
+        broken = False
         try:
-            if params:
-                self.cursor.execute(query, params)
+            if commit:
+                connection.start_transaction()
+            yield connection
+            if commit:
+                connection.commit()
+        except self.errors as e:
+            # Потерянное соединение закрывается, а не возвращается в пул
+            broken = self.backend.is_disconnect(e)
+            if commit and not broken:
+                connection.rollback()
+            raise
+        finally:
+            self.pool.checkin(connection, discard=broken)
+
+    @contextmanager
+    def _cursor(self, commit=False, query=None, prepared=False):
+        """
+        Курсор на соединении текущей единицы работы или на отдельном соединении из пула
+
+        При ``prepared=True`` (и поддержке хранилищем) возвращается подготовленное
+        выражение для ``query`` из кэша соединения; оно не закрывается после запроса.
+        """
+        with self._connection(commit) as connection:
+            if prepared and self.backend.prepared_statements:
+                yield self.backend.prepare(connection, query)
+                return
+            cursor = connection.cursor(dictionary=True)
+            try:
+                yield cursor
+            finally:
+                cursor.close()
+
+    @property
+    def current_transaction(self):
+        """Единица работы, открытая в текущем потоке (или None)"""
+        return getattr(self._local, 'transaction', None)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Единица работы: все запросы блока фиксируются одной транзакцией
+
+        Исключение внутри блока или ошибка любого запроса (execute_* вернул
+        признак ошибки) приводят к откату. Вложенный блок откатывается до своей
+        точки сохранения, не затрагивая внешний.
+        
+        Если транзакцию или точку сохранения не удалось открыть, ошибка
+        сообщается так же, как ошибки запросов, и выбрасывается DatabaseError:
+        блок в этом случае не выполняется.
+
+        Yields:
+            Transaction: единица работы; после выхода из блока ``committed``
+                         показывает, были ли изменения зафиксированы
+        """
+        parent = self.current_transaction
+        if parent is None:
+            try:
+                transaction = Transaction(self._retry(self._begin, idempotent=True))
+            except self.errors as e:
+                self._fail("Ошибка транзакции", f"Не удалось начать транзакцию:\n{str(e)}", e)
+        else:
+            savepoint = f"sp_{parent.depth + 1}"
+            try:
+                self._run(parent.connection, f"SAVEPOINT {savepoint}")
+            except self.errors as e:
+                parent.set_rollback_only()
+                self._fail("Ошибка транзакции", f"Не удалось создать точку сохранения:\n{str(e)}", e)
+            transaction = Transaction(parent.connection, parent, savepoint)
+
+        self._local.transaction = transaction
+        broken = False
+        try:
+            yield transaction
+        except BaseException:
+            broken = not self._rollback(transaction)
+            raise
+        else:
+            if transaction.rollback_only:
+                broken = not self._rollback(transaction)
             else:
-                self.cursor.execute(query)
-            return self.cursor.fetchall()
-        except Error as e:
-            messagebox.showerror("Ошибка запроса", f"Ошибка при выполнении запроса:\n{str(e)}")
-            return None
-    
-    def execute_update(self, query, params=None):
-        """Выполнение запроса на изменение данных"""
+                broken = not self._commit(transaction)
+        finally:
+            self._local.transaction = parent
+            if parent is None:
+                self.pool.checkin(transaction.connection, discard=broken or transaction.broken)
+
+        if transaction.committed and parent is None:
+            for callback in transaction._on_commit:
+                callback()
+
+    def _begin(self):
+        """Соединение из пула с открытой транзакцией"""
+        connection = self.pool.checkout()
         try:
-            if params:
-                self.cursor.execute(query, params)
+            connection.start_transaction()
+        except Exception:
+            self.pool.checkin(connection, discard=True)
+            raise
+        return connection
+
+    def _retry(self, operation, idempotent):
+        """
+        Выполнение операции с повтором после потери соединения с сервером
+
+        Повторяются операции, для которых соединение не удалось установить,
+        а для идемпотентных (чтение) - также прерванные потерей соединения.
+        Внутри единицы работы повтор невозможен: транзакция уже потеряна.
+        """
+        for attempt in range(self.retry_attempts):
+            try:
+                return operation()
+            except self.errors as e:
+                if attempt + 1 >= self.retry_attempts or not self._can_retry(e, idempotent):
+                    raise
+                time.sleep(self._backoff_delay(attempt))
+
+    def _can_retry(self, error, idempotent):
+        """Можно ли повторить операцию после ошибки"""
+        if self.current_transaction is not None:
+            return False
+        if self.backend.is_connect_failure(error):
+            return True
+        return idempotent and self.backend.is_disconnect(error)
+
+    def _backoff_delay(self, attempt):
+        """Задержка перед повтором: экспоненциальная со случайным разбросом"""
+        return random.uniform(0, min(self.retry_max_delay, self.retry_base_delay * 2 ** attempt))
+
+    def on_commit(self, callback):
+        """Вызов функции после фиксации текущей единицы работы (или сразу, если ее нет)"""
+        transaction = self.current_transaction
+        if transaction is None:
+            callback()
+        else:
+            transaction.on_commit(callback)
+
+    def _commit(self, transaction):
+        """Фиксация единицы работы; False, если соединение стало непригодным"""
+        try:
+            if transaction.parent is None:
+                transaction.connection.commit()
+            else:
+                self._run(transaction.connection, f"RELEASE SAVEPOINT {transaction.savepoint}")
+                transaction.parent._on_commit.extend(transaction._on_commit)
+            transaction.committed = True
+            return True
+        except self.errors as e:
+            if transaction.parent is not None:
+                transaction.parent.set_rollback_only()
+                usable = True
+            else:
+                usable = self._rollback(transaction)
+            transaction.broken = not usable
+            self._report("Ошибка обновления", f"Ошибка при фиксации изменений:\n{str(e)}", e)
+            return usable
+
+    def _rollback(self, transaction):
+        """Откат единицы работы; False, если соединение стало непригодным"""
+        try:
+            if transaction.parent is None:
+                transaction.connection.rollback()
             else:
-                self.cursor.execute(query)
-            self.connection.commit()
+                self._run(transaction.connection, f"ROLLBACK TO SAVEPOINT {transaction.savepoint}")
             return True
-        except Error as e:
-            self.connection.rollback()
-            messagebox.showerror("Ошибка обновления", f"Ошибка при обновлении данных:\n{str(e)}")
+        except self.errors:
+            if transaction.parent is not None:
+                transaction.parent.set_rollback_only()
+                return True
             return False
-    
-    def execute_insert(self, query, params=None):
+
+    @staticmethod
+    def _run(connection, statement):
+        """Выполнение служебной команды без результата"""
+        cursor = connection.cursor()
+        try:
+            cursor.execute(statement)
+        finally:
+            cursor.close()
+
+    @staticmethod
+    def _execute(cursor, query, params):
+        """Выполнение запроса на курсоре"""
+        if params:
+            cursor.execute(query, params)
+        else:
+            cursor.execute(query)
+
+    def _report(self, title, message, error):
+        """Сообщение об ошибке через error_reporter или исключение DatabaseError"""
+        if self.raise_errors:
+            raise DatabaseError(title, message) from error
+        self.error_reporter(title, message)
+
+    def _fail(self, title, message, error):
+        """Сообщение об ошибке и DatabaseError там, где вернуть признак ошибки нельзя"""
+        self._report(title, message, error)
+        raise DatabaseError(title, message) from error
+
+    def _record(self, query, start, rows=0, size=0, error=False):
+        """Учет выполненного запроса в статистике"""
+        if self.instrumentation is not None:
+            self.instrumentation.record(query, time.perf_counter() - start, rows, size, error)
+
+    @staticmethod
+    def _affected_rows(cursor):
+        """Количество измененных строк (0, если драйвер его не сообщает)"""
+        return max(getattr(cursor, 'rowcount', 0) or 0, 0)
+
+    def execute_query(self, query, params=None, prepared=False):
+        """Выполнение запроса к базе данных
+
+        Часто выполняемые запросы передаются с ``prepared=True``: они
+        подготавливаются сервером один раз для соединения и берутся из кэша.
+        """
+        def run():
+            with self._cursor(query=query, prepared=prepared) as cursor:
+                self._execute(cursor, query, params)
+                return cursor.fetchall()
+
+        start = time.perf_counter()
+        try:
+            rows = self._retry(run, idempotent=True)
+        except self.errors as e:
+            self._record(query, start, error=True)
+            self._report("Ошибка запроса", f"Ошибка при выполнении запроса:\n{str(e)}", e)
+            return None
+        if self.instrumentation is not None and self.instrumentation.enabled:
+            self._record(query, start, len(rows), estimate_size(rows))
+        return rows
+
+    def execute_update(self, query, params=None, prepared=False):
+        """Выполнение запроса на изменение данных"""
+        def run():
+            with self._cursor(commit=True, query=query, prepared=prepared) as cursor:
+                self._execute(cursor, query, params)
+                return self._affected_rows(cursor)
+
+        start = time.perf_counter()
+        try:
+            affected = self._retry(run, idempotent=False)
+        except self.errors as e:
+            self._record(query, start, error=True)
+            self._report("Ошибка обновления", f"Ошибка при обновлении данных:\n{str(e)}", e)
+            return False
+        self._record(query, start, affected)
+        return True
+
+    def execute_insert(self, query, params=None, prepared=False):
         """Выполнение запроса на вставку данных с возвратом ID"""
+        def run():
+            with self._cursor(commit=True, query=query, prepared=prepared) as cursor:
+                self._execute(cursor, query, params)
+                return cursor.lastrowid
+
+        start = time.perf_counter()
         try:
-            if params:
-                self.cursor.execute(query, params)
-            else:
-                self.cursor.execute(query)
-            self.connection.commit()
-            return self.cursor.lastrowid
-        except Error as e:
-            self.connection.rollback()
-            messagebox.showerror("Ошибка вставки", f"Ошибка при добавлении данных:\n{str(e)}")
+            last_id = self._retry(run, idempotent=False)
+        except self.errors as e:
+            self._record(query, start, error=True)
+            self._report("Ошибка вставки", f"Ошибка при добавлении данных:\n{str(e)}", e)
             return None
+        self._record(query, start, 1)
+        return last_id
+    
+    def execute_many(self, query, params_list):
+        """Выполнение запроса на изменение для набора параметров с одной фиксацией"""
+        def run():
+            with self._cursor(commit=True) as cursor:
+                cursor.executemany(query, params_list)
+                return self._affected_rows(cursor)
+
+        start = time.perf_counter()
+        try:
+            affected = self._retry(run, idempotent=False)
+        except self.errors as e:
+            self._record(query, start, error=True)
+            self._report("Ошибка обновления", f"Ошибка при обновлении данных:\n{str(e)}", e)
+            return False
+        self._record(query, start, affected)
+        return True
+    
+    def iter_query(self, query, params=None, batch_size=500):
+        """
+        Потоковое выполнение запроса: строки читаются с сервера порциями
+        
+        Память расходуется только на одну порцию, поэтому так можно обходить
+        таблицы целиком (выгрузки, отчеты).
+        
+        Yields:
+            dict: строка результата
+        """
+        for batch in self.iter_query_batches(query, params, batch_size):
+            yield from batch
+    
+    def iter_query_batches(self, query, params=None, batch_size=500):
+        """
+        Потоковое выполнение запроса с выдачей строк пакетами
+        
+        Используется небуферизованный курсор: сервер передает строки по мере
+        чтения. Пока генератор не исчерпан, соединение занято; внутри единицы
+        работы нельзя выполнять другие запросы до окончания обхода.
+        
+        Args:
+            query: текст запроса
+            params: параметры запроса
+            batch_size: количество строк в пакете
+            
+        Yields:
+            list: очередной пакет строк (не пустой)
+        """
+        if batch_size < 1:
+            raise ValueError("Размер пакета должен быть положительным")
+        
+        transaction = self.current_transaction
+        if transaction is not None:
+            connection = transaction.connection
+        else:
+            try:
+                connection = self._retry(self.pool.checkout, idempotent=True)
+            except self.errors as e:
+                self._report("Ошибка запроса", f"Ошибка при выполнении запроса:\n{str(e)}", e)
+                return
+        
+        cursor = None
+        finished = False
+        # В статистику попадает только время работы с БД, без обработки пакетов
+        elapsed = 0.0
+        row_count = size = 0
+        try:
+            start = time.perf_counter()
+            cursor = connection.cursor(dictionary=True, buffered=False)
+            self._execute(cursor, query, params)
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                elapsed += time.perf_counter() - start
+                if not rows:
+                    break
+                row_count += len(rows)
+                size += estimate_size(rows)
+                yield rows
+                start = time.perf_counter()
+            finished = True
+            self._record(query, time.perf_counter() - elapsed, row_count, size)
+        except self.errors as e:
+            if transaction is not None:
+                transaction.set_rollback_only()
+            self._record(query, time.perf_counter() - elapsed, row_count, size, error=True)
+            self._report("Ошибка запроса", f"Ошибка при выполнении запроса:\n{str(e)}", e)
+        finally:
+            # Обход прерван: непрочитанные строки остаются в соединении
+            if not finished and transaction is not None:
+                try:
+                    connection.consume_results()
+                except self.errors:
+                    transaction.set_rollback_only()
+            if cursor is not None:
+                try:
+                    cursor.close()
+                except self.errors:
+                    finished = False
+            if transaction is None:
+                # Соединение с непрочитанным результатом в пул не возвращается
+                self.pool.checkin(connection, discard=not finished)
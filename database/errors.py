@@ -0,0 +1,23 @@
+"""Ошибки слоя доступа к данным и способы сообщать о них"""
+import logging
+
+
+logger = logging.getLogger('partner_orders.db')
+
+
+class DatabaseError(Exception):
+    """Ошибка выполнения операции с базой данных
+
+    Выбрасывается методами DatabaseConnection в режиме ``raise_errors=True``
+    (пакетные задания, рабочие процессы); исходное исключение драйвера
+    доступно в ``__cause__``.
+    """
+    def __init__(self, title, message):
+        super().__init__(message)
+        self.title = title
+        self.message = message
+
+
+def log_error(title, message):
+    """Сообщение об ошибке по умолчанию: запись в журнал (без интерфейса)"""
+    logger.error("%s: %s", title, message)
@@ -0,0 +1,211 @@
+"""Учет выполнения запросов: время, объем результата, источник вызова"""
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+
+
+# Границы интервалов гистограммы времени выполнения, мс
+LATENCY_BUCKETS = (1, 5, 10, 50, 100, 500, 1000)
+
+logger = logging.getLogger('partner_orders.sql')
+
+# Файлы журнала медленных запросов: абсолютный путь -> [обработчик, число
+# пользователей]. Несколько подключений с одним файлом пишут через один
+# обработчик, и каждый запрос попадает в файл один раз
+_file_handlers = {}
+_file_handlers_lock = threading.Lock()
+
+
+def _acquire_file_handler(log_path):
+    """Подключение файла журнала к логгеру (или учет еще одного пользователя)"""
+    path = os.path.abspath(log_path)
+    with _file_handlers_lock:
+        entry = _file_handlers.get(path)
+        if entry is None:
+            handler = logging.FileHandler(path, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(asctime)s %(message)s'))
+            logger.addHandler(handler)
+            entry = _file_handlers[path] = [handler, 0]
+        entry[1] += 1
+    return path
+
+
+def _release_file_handler(path):
+    """Отключение файла журнала после ухода последнего пользователя"""
+    with _file_handlers_lock:
+        entry = _file_handlers.get(path)
+        if entry is None:
+            return
+        entry[1] -= 1
+        if entry[1] > 0:
+            return
+        del _file_handlers[path]
+    logger.removeHandler(entry[0])
+    entry[0].close()
+
+
+def normalize_query(query):
+    """Текст запроса без лишних пробелов; списки параметров IN (...) схлопываются"""
+    query = ' '.join(query.split())
+    return re.sub(r'%s(?:\s*,\s*%s)+', '%s, ...', query)
+
+
+def estimate_size(rows):
+    """Приблизительный объем полученных данных в байтах"""
+    size = 0
+    for row in rows:
+        for value in (row.values() if isinstance(row, dict) else row):
+            if isinstance(value, (str, bytes, bytearray)):
+                size += len(value)
+            elif value is not None:
+                size += 8
+    return size
+
+
+def find_caller(skip_modules=('database.', 'models.reference_data')):
+    """Метод модели, из которого выполнен запрос (например, 'Product.get_product_types')"""
+    frame = sys._getframe(1)
+    fallback = None
+    while frame is not None:
+        module = frame.f_globals.get('__name__', '')
+        if not module.startswith(skip_modules):
+            owner = frame.f_locals.get('self')
+            name = frame.f_code.co_name
+            if owner is not None:
+                name = f"{type(owner).__name__}.{name}"
+            elif not module.startswith('models.'):
+                name = f"{module}.{name}"
+            # Лямбды и генераторы не считаются источником, если есть метод выше по стеку
+            if not frame.f_code.co_name.startswith('<'):
+                if module.startswith('models.'):
+                    return name
+                if fallback is None or fallback[1]:
+                    fallback = (name, False)
+            elif fallback is None:
+                fallback = (name, True)
+        frame = frame.f_back
+    return fallback[0] if fallback else None
+
+
+class StatementStats:
+    """Накопленная статистика одного (нормализованного) запроса"""
+    def __init__(self, statement):
+        self.statement = statement
+        self.count = 0
+        self.errors = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.rows = 0
+        self.bytes = 0
+        self.histogram = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.callers = {}
+
+    def add(self, elapsed, rows, size, caller, error):
+        self.count += 1
+        self.errors += int(error)
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+        self.rows += rows
+        self.bytes += size
+        milliseconds = elapsed * 1000
+        bucket = next(
+            (i for i, bound in enumerate(LATENCY_BUCKETS) if milliseconds <= bound),
+            len(LATENCY_BUCKETS)
+        )
+        self.histogram[bucket] += 1
+        self.callers[caller] = self.callers.get(caller, 0) + 1
+
+    def to_dict(self):
+        return {
+            'statement': self.statement,
+            'count': self.count,
+            'errors': self.errors,
+            'total_ms': self.total_time * 1000,
+            'avg_ms': self.total_time * 1000 / self.count if self.count else 0.0,
+            'max_ms': self.max_time * 1000,
+            'rows': self.rows,
+            'bytes': self.bytes,
+            'histogram': dict(zip(_bucket_labels(), self.histogram)),
+            'callers': dict(sorted(self.callers.items(), key=lambda item: -item[1])),
+        }
+
+
+class QueryInstrumentation:
+    """Учет запросов DatabaseConnection
+
+    Для каждого запроса накапливаются количество выполнений, время
+    (с гистограммой), число строк, объем данных и вызывающие методы моделей.
+    Запросы дольше ``slow_threshold`` секунд записываются в журнал медленных
+    запросов (логгер ``partner_orders.sql`` и, если задан, файл ``log_path``).
+    Повторяющиеся запросы с большим ``count`` указывают на шаблон N+1.
+    Файл журнала освобождается методом ``close``.
+    """
+    def __init__(self, slow_threshold=0.2, log_path=None, enabled=True):
+        self.slow_threshold = slow_threshold
+        self.enabled = enabled
+        self.log_path = log_path
+        self.started = time.time()
+        self._statements = {}
+        self._lock = threading.Lock()
+        self._log_file = None
+        self.open()
+
+    def open(self):
+        """Подключение файла журнала медленных запросов (повторный вызов ничего не делает)"""
+        if self.log_path and self._log_file is None:
+            self._log_file = _acquire_file_handler(self.log_path)
+
+    def close(self):
+        """Отключение файла журнала медленных запросов"""
+        if self._log_file is not None:
+            _release_file_handler(self._log_file)
+            self._log_file = None
+
+    def record(self, query, elapsed, rows=0, size=0, error=False):
+        """Учет одного выполнения запроса"""
+        if not self.enabled:
+            return
+        statement = normalize_query(query)
+        caller = find_caller()
+        with self._lock:
+            stats = self._statements.get(statement)
+            if stats is None:
+                stats = self._statements[statement] = StatementStats(statement)
+            stats.add(elapsed, rows, size, caller, error)
+
+        if self.slow_threshold is not None and elapsed >= self.slow_threshold:
+            logger.warning(
+                "Медленный запрос %.1f мс (%s, строк: %d): %s",
+                elapsed * 1000, caller, rows, statement
+            )
+
+    def snapshot(self):
+        """Статистика всех запросов, упорядоченная по суммарному времени"""
+        with self._lock:
+            statements = [stats.to_dict() for stats in self._statements.values()]
+        statements.sort(key=lambda stats: -stats['total_ms'])
+        return {
+            'started': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(self.started)),
+            'slow_threshold_ms': self.slow_threshold * 1000 if self.slow_threshold is not None else None,
+            'statements': statements,
+        }
+
+    def dump_json(self, path):
+        """Сохранение статистики в файл JSON"""
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(self.snapshot(), output, ensure_ascii=False, indent=2)
+
+    def reset(self):
+        """Сброс накопленной статистики"""
+        with self._lock:
+            self._statements.clear()
+            self.started = time.time()
+
+
+def _bucket_labels():
+    """Подписи интервалов гистограммы"""
+    return [f"<={bound}ms" for bound in LATENCY_BUCKETS] + [f">{LATENCY_BUCKETS[-1]}ms"]
@@ -0,0 +1,372 @@
+"""Обновление схемы существующих баз данных
+
+Скрипты db.sql и db_sqlite.sql создают базу с нуля. Базы, созданные их
+более ранними версиями, приводятся к текущей схеме шагами из MIGRATIONS.
+Каждый шаг сначала проверяет, применен ли он, поэтому скрипт можно
+запускать повторно (и на новой базе он ничего не меняет).
+
+Примеры:
+    python -m database.migrations
+    PARTNER_DB_BACKEND=sqlite PARTNER_DB_PATH=partner_orders.sqlite3 python -m database.migrations
+"""
+import argparse
+
+from database.connection import create_backend
+
+
+class Migration:
+    """Шаг обновления схемы
+
+    Args:
+        name: описание шага для вывода
+        check: {хранилище: запрос}; запрос возвращает строку, если шаг уже применен
+        statements: {хранилище: [выражения]}; выполняются по порядку
+    """
+    def __init__(self, name, check, statements):
+        self.name = name
+        self.check = check
+        self.statements = statements
+
+    def is_applied(self, cursor, backend_name):
+        """Проверка, что шаг уже применен"""
+        cursor.execute(self.check[backend_name])
+        return bool(cursor.fetchall())
+
+    def apply(self, cursor, backend_name):
+        """Выполнение выражений шага"""
+        for statement in self.statements[backend_name]:
+            cursor.execute(statement)
+
+
+def column_exists(table, column):
+    """Запросы проверки наличия столбца"""
+    return {
+        'mysql': (
+            "SELECT 1 FROM information_schema.COLUMNS "
+            f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table}' AND COLUMN_NAME = '{column}'"
+        ),
+        'sqlite': f"SELECT 1 FROM pragma_table_info('{table}') WHERE name = '{column}'",
+    }
+
+
+def table_exists(table):
+    """Запросы проверки наличия таблицы"""
+    return {
+        'mysql': (
+            "SELECT 1 FROM information_schema.TABLES "
+            f"WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = '{table}'"
+        ),
+        'sqlite': f"SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = '{table}'",
+    }
+
+
+def triggers_exist(*names):
+    """Запросы проверки наличия всех перечисленных триггеров"""
+    listed = ', '.join(f"'{name}'" for name in names)
+    return {
+        'mysql': (
+            "SELECT COUNT(*) FROM information_schema.TRIGGERS "
+            f"WHERE TRIGGER_SCHEMA = DATABASE() AND TRIGGER_NAME IN ({listed}) "
+            f"HAVING COUNT(*) = {len(names)}"
+        ),
+        'sqlite': (
+            "SELECT COUNT(*) FROM sqlite_master "
+            f"WHERE type = 'trigger' AND name IN ({listed}) "
+            f"HAVING COUNT(*) = {len(names)}"
+        ),
+    }
+
+
+# Триггеры инкрементального пересчета итога заявки (как в db.sql и db_sqlite.sql)
+_REQUEST_TOTAL_TRIGGERS = {
+    'mysql': [
+        """CREATE TRIGGER trg_request_products_after_insert
+        AFTER INSERT ON request_products
+        FOR EACH ROW
+            UPDATE partner_requests
+            SET total_cost = total_cost + NEW.quantity * NEW.cost_per_unit
+            WHERE id = NEW.request_id""",
+        """CREATE TRIGGER trg_request_products_after_update
+        AFTER UPDATE ON request_products
+        FOR EACH ROW
+            UPDATE partner_requests
+            SET total_cost = total_cost
+                + IF(id = NEW.request_id, NEW.quantity * NEW.cost_per_unit, 0)
+                - IF(id = OLD.request_id, OLD.quantity * OLD.cost_per_unit, 0)
+            WHERE id IN (OLD.request_id, NEW.request_id)""",
+        """CREATE TRIGGER trg_request_products_after_delete
+        AFTER DELETE ON request_products
+        FOR EACH ROW
+            UPDATE partner_requests
+            SET total_cost = total_cost - OLD.quantity * OLD.cost_per_unit
+            WHERE id = OLD.request_id""",
+    ],
+    'sqlite': [
+        """CREATE TRIGGER trg_request_products_after_insert
+        AFTER INSERT ON request_products
+        FOR EACH ROW
+        BEGIN
+            UPDATE partner_requests
+            SET total_cost = ROUND(total_cost + NEW.quantity * NEW.cost_per_unit, 2)
+            WHERE id = NEW.request_id;
+        END""",
+        """CREATE TRIGGER trg_request_products_after_update
+        AFTER UPDATE ON request_products
+        FOR EACH ROW
+        BEGIN
+            UPDATE partner_requests
+            SET total_cost = ROUND(total_cost
+                + CASE WHEN id = NEW.request_id THEN NEW.quantity * NEW.cost_per_unit ELSE 0 END
+                - CASE WHEN id = OLD.request_id THEN OLD.quantity * OLD.cost_per_unit ELSE 0 END, 2)
+            WHERE id IN (OLD.request_id, NEW.request_id);
+        END""",
+        """CREATE TRIGGER trg_request_products_after_delete
+        AFTER DELETE ON request_products
+        FOR EACH ROW
+        BEGIN
+            UPDATE partner_requests
+            SET total_cost = ROUND(total_cost - OLD.quantity * OLD.cost_per_unit, 2)
+            WHERE id = OLD.request_id;
+        END""",
+    ],
+}
+
+# Однократная сверка итогов с позициями: до появления триггеров итог
+# пересчитывало приложение, и он мог разойтись с позициями
+_RESYNC_REQUEST_TOTALS = """
+    UPDATE partner_requests
+    SET total_cost = (
+        SELECT ROUND(COALESCE(SUM(rp.quantity * rp.cost_per_unit), 0), 2)
+        FROM request_products rp
+        WHERE rp.request_id = partner_requests.id
+    )
+    WHERE total_cost <> (
+        SELECT ROUND(COALESCE(SUM(rp.quantity * rp.cost_per_unit), 0), 2)
+        FROM request_products rp
+        WHERE rp.request_id = partner_requests.id
+    )
+"""
+
+
+# Триггеры журнала изменений заявок (как в db.sql и db_sqlite.sql)
+_CHANGE_LOG_TRIGGER_NAMES = (
+    'trg_partner_requests_log_insert', 'trg_partner_requests_log_update',
+    'trg_request_products_log_insert', 'trg_request_products_log_update',
+    'trg_request_products_log_delete', 'trg_partners_log_update',
+)
+_CHANGE_LOG_TRIGGERS = {
+    'mysql': [
+        """CREATE TRIGGER trg_partner_requests_log_insert
+        AFTER INSERT ON partner_requests
+        FOR EACH ROW
+            INSERT INTO request_changes (request_id) VALUES (NEW.id)""",
+        """CREATE TRIGGER trg_partner_requests_log_update
+        AFTER UPDATE ON partner_requests
+        FOR EACH ROW
+            INSERT INTO request_changes (request_id)
+            SELECT NEW.id FROM DUAL
+            WHERE NOT (NEW.partner_id <=> OLD.partner_id AND NEW.request_date <=> OLD.request_date
+                       AND NEW.status <=> OLD.status)""",
+        """CREATE TRIGGER trg_request_products_log_insert
+        AFTER INSERT ON request_products
+        FOR EACH ROW
+            INSERT INTO request_changes (request_id) VALUES (NEW.request_id)""",
+        """CREATE TRIGGER trg_request_products_log_update
+        AFTER UPDATE ON request_products
+        FOR EACH ROW
+            INSERT INTO request_changes (request_id) SELECT NEW.request_id UNION SELECT OLD.request_id""",
+        """CREATE TRIGGER trg_request_products_log_delete
+        AFTER DELETE ON request_products
+        FOR EACH ROW
+            INSERT INTO request_changes (request_id) VALUES (OLD.request_id)""",
+        """CREATE TRIGGER trg_partners_log_update
+        AFTER UPDATE ON partners
+        FOR EACH ROW
+            INSERT INTO request_changes (request_id) SELECT id FROM partner_requests WHERE partner_id = NEW.id""",
+    ],
+    'sqlite': [
+        """CREATE TRIGGER trg_partner_requests_log_insert
+        AFTER INSERT ON partner_requests
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO request_changes (request_id) VALUES (NEW.id);
+        END""",
+        """CREATE TRIGGER trg_partner_requests_log_update
+        AFTER UPDATE ON partner_requests
+        FOR EACH ROW WHEN NOT (NEW.partner_id IS OLD.partner_id AND NEW.request_date IS OLD.request_date
+                               AND NEW.status IS OLD.status)
+        BEGIN
+            INSERT INTO request_changes (request_id) VALUES (NEW.id);
+        END""",
+        """CREATE TRIGGER trg_request_products_log_insert
+        AFTER INSERT ON request_products
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO request_changes (request_id) VALUES (NEW.request_id);
+        END""",
+        """CREATE TRIGGER trg_request_products_log_update
+        AFTER UPDATE ON request_products
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO request_changes (request_id) SELECT NEW.request_id UNION SELECT OLD.request_id;
+        END""",
+        """CREATE TRIGGER trg_request_products_log_delete
+        AFTER DELETE ON request_products
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO request_changes (request_id) VALUES (OLD.request_id);
+        END""",
+        """CREATE TRIGGER trg_partners_log_update
+        AFTER UPDATE ON partners
+        FOR EACH ROW
+        BEGIN
+            INSERT INTO request_changes (request_id) SELECT id FROM partner_requests WHERE partner_id = NEW.id;
+        END""",
+    ],
+}
+
+
+def _with_triggers(drop, create, *after):
+    """Пересоздание триггеров и выражения после него для каждого хранилища"""
+    return {
+        backend: [f"DROP TRIGGER IF EXISTS {name}" for name in drop] + create[backend] + list(after)
+        for backend in create
+    }
+
+
+# Шаги в порядке появления изменений схемы
+MIGRATIONS = [
+    # Итог заявки поддерживается триггерами позиций, модели его не пересчитывают
+    Migration(
+        "триггеры итога заявки",
+        triggers_exist('trg_request_products_after_insert', 'trg_request_products_after_update',
+                       'trg_request_products_after_delete'),
+        _with_triggers(
+            ('trg_request_products_after_insert', 'trg_request_products_after_update',
+             'trg_request_products_after_delete'),
+            _REQUEST_TOTAL_TRIGGERS,
+            _RESYNC_REQUEST_TOTALS
+        )
+    ),
+    # Хэш логотипа хранится в столбце и вычисляется при записи логотипа, а не
+    # при каждой выборке заявок
+    Migration(
+        "partners.logo_hash",
+        column_exists('partners', 'logo_hash'),
+        {
+            'mysql': [
+                "ALTER TABLE partners ADD COLUMN logo_hash CHAR(32) AS (MD5(logo)) STORED AFTER logo",
+            ],
+            'sqlite': [
+                "ALTER TABLE partners ADD COLUMN logo_hash CHAR(32) NULL",
+                "UPDATE partners SET logo_hash = MD5(logo) WHERE logo IS NOT NULL",
+            ],
+        }
+    ),
+    Migration(
+        "триггеры partners.logo_hash",
+        triggers_exist('trg_partners_logo_hash_after_insert', 'trg_partners_logo_hash_after_update'),
+        {
+            # В MySQL столбец вычисляемый, триггеры не нужны
+            'mysql': [],
+            'sqlite': [
+                "DROP TRIGGER IF EXISTS trg_partners_logo_hash_after_insert",
+                """CREATE TRIGGER trg_partners_logo_hash_after_insert
+                AFTER INSERT ON partners
+                FOR EACH ROW WHEN NEW.logo IS NOT NULL
+                BEGIN
+                    UPDATE partners SET logo_hash = MD5(NEW.logo) WHERE id = NEW.id;
+                END""",
+                "DROP TRIGGER IF EXISTS trg_partners_logo_hash_after_update",
+                """CREATE TRIGGER trg_partners_logo_hash_after_update
+                AFTER UPDATE OF logo ON partners
+                FOR EACH ROW
+                BEGIN
+                    UPDATE partners SET logo_hash = MD5(NEW.logo) WHERE id = NEW.id;
+                END""",
+            ],
+        }
+    ),
+    # Изменения заявок записываются триггерами в журнал request_changes,
+    # который читает лента изменений клиентов
+    Migration(
+        "журнал изменений заявок",
+        table_exists('request_changes'),
+        {
+            'mysql': [
+                """CREATE TABLE IF NOT EXISTS request_changes (
+                    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+                    request_id INT NOT NULL
+                )""",
+            ],
+            'sqlite': [
+                """CREATE TABLE IF NOT EXISTS request_changes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    request_id INTEGER NOT NULL
+                )""",
+            ],
+        }
+    ),
+    Migration(
+        "триггеры журнала изменений заявок",
+        triggers_exist(*_CHANGE_LOG_TRIGGER_NAMES),
+        _with_triggers(_CHANGE_LOG_TRIGGER_NAMES, _CHANGE_LOG_TRIGGERS)
+    ),
+]
+
+
+def migrate(backend, migrations=MIGRATIONS):
+    """
+    Применение недостающих шагов обновления схемы
+
+    Args:
+        backend: хранилище (MySQLBackend или SQLiteBackend)
+        migrations: шаги обновления
+
+    Returns:
+        list: названия примененных шагов
+    """
+    applied = []
+    connection = backend.create_connection()
+    try:
+        cursor = connection.cursor()
+        for migration in migrations:
+            if not migration.statements[backend.name] or migration.is_applied(cursor, backend.name):
+                continue
+            # В SQLite шаг выполняется атомарно; в MySQL выражения DDL
+            # фиксируются сразу, поэтому шаги составлены так, чтобы их
+            # можно было повторить после сбоя
+            connection.start_transaction()
+            try:
+                migration.apply(cursor, backend.name)
+                connection.commit()
+            except Exception:
+                connection.rollback()
+                raise
+            applied.append(migration.name)
+        cursor.close()
+    finally:
+        connection.close()
+    return applied
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Обновление схемы базы данных")
+    parser.add_argument('--backend', choices=('mysql', 'sqlite'),
+                        help="хранилище (по умолчанию из PARTNER_DB_BACKEND)")
+    args = parser.parse_args(argv)
+
+    try:
+        applied = migrate(create_backend(args.backend))
+    except Exception as e:
+        parser.exit(1, f"Ошибка обновления схемы: {e}\n")
+
+    if applied:
+        for name in applied:
+            print(f"Применено: {name}")
+    else:
+        print("Схема базы данных не требует обновления")
+
+
+if __name__ == '__main__':
+    main()
@@ -24,6 +24,8 @@ CREATE TABLE partners (
     inn VARCHAR(20) NOT NULL UNIQUE,
     rating INT NOT NULL CHECK (rating >= 0),
     logo LONGBLOB NULL,
+    -- Хэш логотипа вычисляется при записи логотипа (ключ кэша миниатюр)
+    logo_hash CHAR(32) AS (MD5(logo)) STORED,
     FOREIGN KEY (partner_type_id) REFERENCES partner_types(id)
 );
 
@@ -63,6 +65,15 @@ CREATE TABLE partner_requests (
     FOREIGN KEY (partner_id) REFERENCES partners(id)
 );
 
+-- Журнал изменений заявок для ленты изменений. Номер записи служит версией:
+-- AUTO_INCREMENT выдается без общей блокировки, поэтому изменения разных
+-- клиентов не ждут друг друга. Номера становятся видны в порядке фиксации
+-- транзакций, а не выдачи; пропуски учитывает PartnerRequest.get_changes_since
+CREATE TABLE request_changes (
+    id BIGINT PRIMARY KEY AUTO_INCREMENT,
+    request_id INT NOT NULL
+);
+
 -- Таблица продукции в заявках
 CREATE TABLE request_products (
     id INT PRIMARY KEY AUTO_INCREMENT,
@@ -225,6 +236,68 @@ CREATE INDEX idx_request_products_request_id ON request_products(request_id);
 CREATE INDEX idx_request_products_product_id ON request_products(product_id);
 CREATE INDEX idx_products_product_type_id ON products(product_type_id);
 
+-- Триггеры инкрементального пересчета общей стоимости заявки:
+-- при изменении позиции к итогу прибавляется только разница, в той же транзакции
+CREATE TRIGGER trg_request_products_after_insert
+AFTER INSERT ON request_products
+FOR EACH ROW
+    UPDATE partner_requests
+    SET total_cost = total_cost + NEW.quantity * NEW.cost_per_unit
+    WHERE id = NEW.request_id;
+
+CREATE TRIGGER trg_request_products_after_update
+AFTER UPDATE ON request_products
+FOR EACH ROW
+    UPDATE partner_requests
+    SET total_cost = total_cost
+        + IF(id = NEW.request_id, NEW.quantity * NEW.cost_per_unit, 0)
+        - IF(id = OLD.request_id, OLD.quantity * OLD.cost_per_unit, 0)
+    WHERE id IN (OLD.request_id, NEW.request_id);
+
+CREATE TRIGGER trg_request_products_after_delete
+AFTER DELETE ON request_products
+FOR EACH ROW
+    UPDATE partner_requests
+    SET total_cost = total_cost - OLD.quantity * OLD.cost_per_unit
+    WHERE id = OLD.request_id;
+
+-- Лента изменений: новая заявка, изменение ее полей, ее позиций и ее партнера
+-- добавляют запись в журнал изменений. Итог, измененный триггерами позиций,
+-- повторно не записывается: изменение уже записал триггер позиции
+CREATE TRIGGER trg_partner_requests_log_insert
+AFTER INSERT ON partner_requests
+FOR EACH ROW
+    INSERT INTO request_changes (request_id) VALUES (NEW.id);
+
+CREATE TRIGGER trg_partner_requests_log_update
+AFTER UPDATE ON partner_requests
+FOR EACH ROW
+    INSERT INTO request_changes (request_id)
+    SELECT NEW.id FROM DUAL
+    WHERE NOT (NEW.partner_id <=> OLD.partner_id AND NEW.request_date <=> OLD.request_date
+               AND NEW.status <=> OLD.status);
+
+CREATE TRIGGER trg_request_products_log_insert
+AFTER INSERT ON request_products
+FOR EACH ROW
+    INSERT INTO request_changes (request_id) VALUES (NEW.request_id);
+
+CREATE TRIGGER trg_request_products_log_update
+AFTER UPDATE ON request_products
+FOR EACH ROW
+    INSERT INTO request_changes (request_id) SELECT NEW.request_id UNION SELECT OLD.request_id;
+
+CREATE TRIGGER trg_request_products_log_delete
+AFTER DELETE ON request_products
+FOR EACH ROW
+    INSERT INTO request_changes (request_id) VALUES (OLD.request_id);
+
+-- Изменение партнера отмечается в его заявках (карточка заявки показывает данные партнера)
+CREATE TRIGGER trg_partners_log_update
+AFTER UPDATE ON partners
+FOR EACH ROW
+    INSERT INTO request_changes (request_id) SELECT id FROM partner_requests WHERE partner_id = NEW.id;
+
 -- Представление для просмотра заявок с информацией о партнере
 CREATE VIEW partner_requests_view AS
 SELECT 
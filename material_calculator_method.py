@@ -2,8 +2,48 @@
 Метод расчета количества материала для производства продукции
 """
 
+# Коэффициенты из исходных данных db.sql. Используются, только если не передано
+# подключение к БД; иначе значения берутся из кэша справочников.
+DEFAULT_PRODUCT_COEFFICIENTS = {
+    1: 1.5,   # Древесно-плитные материалы
+    2: 3.5,   # Декоративные панели
+    3: 5.25,  # Плитка
+    4: 4.5,   # Фасадные материалы
+    5: 2.17   # Напольные покрытия
+}
+
+DEFAULT_MATERIAL_DEFECTS = {
+    1: 0.002,   # Тип материала 1
+    2: 0.005,   # Тип материала 2
+    3: 0.003,   # Тип материала 3
+    4: 0.0015,  # Тип материала 4
+    5: 0.0018   # Тип материала 5
+}
+
+
+def get_coefficients(db_connection=None):
+    """
+    Получение словарей коэффициентов типов продукции и процентов брака
+    
+    Args:
+        db_connection: подключение к БД (None - значения по умолчанию)
+    
+    Returns:
+        tuple: (коэффициенты типов продукции, проценты брака материалов) в виде float
+    """
+    if db_connection is None:
+        return DEFAULT_PRODUCT_COEFFICIENTS, DEFAULT_MATERIAL_DEFECTS
+    
+    from models.reference_data import get_coefficient_tables
+    product_coefficients, material_defects = get_coefficient_tables(db_connection)
+    return (
+        {key: float(value) for key, value in product_coefficients.items()},
+        {key: float(value) for key, value in material_defects.items()}
+    )
+
+
 def calculate_material_amount(product_type_id, material_type_id, required_quantity, 
-                            stock_quantity, param1, param2):
+                            stock_quantity, param1, param2, db_connection=None):
     """
     Расчет количества необходимого материала для производства продукции
     
@@ -14,6 +54,7 @@ def calculate_material_amount(product_type_id, material_type_id, required_quanti
         stock_quantity (int): количество продукции на складе
         param1 (float): первый параметр продукции (положительное число)
         param2 (float): второй параметр продукции (положительное число)
+        db_connection: подключение к БД для получения коэффициентов (необязательно)
     
     Returns:
         int: количество необходимого материала или -1 при ошибке
@@ -33,23 +74,8 @@ def calculate_material_amount(product_type_id, material_type_id, required_quanti
         if param1 <= 0 or param2 <= 0:
             return -1
         
-        # Словарь коэффициентов типов продукции
-        product_coefficients = {
-            1: 1.5,   # Древесно-плитные материалы
-            2: 3.5,   # Декоративные панели
-            3: 5.25,  # Плитка
-            4: 4.5,   # Фасадные материалы
-            5: 2.17   # Напольные покрытия
-        }
-        
-        # Словарь процентов брака материалов
-        material_defects = {
-            1: 0.002,   # Тип материала 1
-            2: 0.005,   # Тип материала 2
-            3: 0.003,   # Тип материала 3
-            4: 0.0015,  # Тип материала 4
-            5: 0.0018   # Тип материала 5
-        }
+        # Словари коэффициентов типов продукции и процентов брака материалов
+        product_coefficients, material_defects = get_coefficients(db_connection)
         
         # Проверка существования типов
         if product_type_id not in product_coefficients:
@@ -0,0 +1,167 @@
+"""События изменения данных и их доставка подписчикам (окнам приложения)"""
+import threading
+
+
+class Event:
+    """Базовое событие изменения данных"""
+    def __eq__(self, other):
+        return type(self) is type(other) and vars(self) == vars(other)
+
+    def __repr__(self):
+        fields = ', '.join(f"{name}={value!r}" for name, value in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+
+class RequestCreated(Event):
+    """Создана заявка"""
+    def __init__(self, request_id, partner_id):
+        self.request_id = request_id
+        self.partner_id = partner_id
+
+
+class RequestUpdated(Event):
+    """Изменены данные заявки (например, партнер)"""
+    def __init__(self, request_id):
+        self.request_id = request_id
+
+
+class RequestTotalChanged(Event):
+    """Изменилась общая стоимость заявки"""
+    def __init__(self, request_id):
+        self.request_id = request_id
+
+
+class RequestLinesChanged(RequestTotalChanged):
+    """Добавлены, изменены или удалены позиции заявки (вместе с ними меняется итог)"""
+    def __init__(self, request_id, product_ids):
+        super().__init__(request_id)
+        self.product_ids = tuple(product_ids)
+
+
+class RequestVersionChanged(Event):
+    """Лента изменений получила новую версию заявки
+
+    Изменение могло быть сделано другим клиентом, поэтому окна, которые
+    показывают подробности заявки, сверяют с ними новый итог.
+    """
+    def __init__(self, request_id, total_cost):
+        self.request_id = request_id
+        self.total_cost = total_cost
+
+
+class PartnerCreated(Event):
+    """Создан партнер"""
+    def __init__(self, partner_id):
+        self.partner_id = partner_id
+
+
+class PartnerUpdated(Event):
+    """Изменены данные партнера"""
+    def __init__(self, partner_id):
+        self.partner_id = partner_id
+
+
+class ProductCreated(Event):
+    """Создана продукция"""
+    def __init__(self, product_id):
+        self.product_id = product_id
+
+
+class ProductTypeCreated(Event):
+    """Создан тип продукции"""
+    def __init__(self, type_id):
+        self.type_id = type_id
+
+
+class Subscription:
+    """Подписка обработчика на события заданного типа"""
+    def __init__(self, bus, event_type, handler, deliver=None, owner=None):
+        self.bus = bus
+        self.event_type = event_type
+        self.handler = handler
+        self.deliver = deliver
+        self.owner = owner
+
+    def cancel(self):
+        """Отмена подписки"""
+        self.bus.unsubscribe(self)
+
+    def notify(self, event):
+        """Передача события обработчику (напрямую или через ``deliver``)"""
+        if self.deliver is None:
+            self._call(event)
+        else:
+            self.deliver(self._call, event)
+
+    def _call(self, event):
+        owner = self.owner
+        if owner is not None:
+            try:
+                alive = owner.winfo_exists()
+            except Exception:
+                alive = False
+            if not alive:
+                # Окно закрыто: подписка больше не нужна
+                self.cancel()
+                return
+        self.handler(event)
+
+
+class EventBus:
+    """Шина событий внутри процесса
+
+    Модели публикуют события после фиксации изменений (см.
+    ``DatabaseConnection.on_commit``), окна подписываются на нужные типы
+    событий и обновляют только затронутые виджеты. Обработчик получает
+    события заданного типа и его подтипов. События публикуются из рабочих
+    потоков, поэтому окна передают ``deliver=executor.post``, чтобы
+    обработчик вызывался в потоке Tk; подписка с ``owner`` отменяется
+    сама, когда окно-владелец закрыто.
+    """
+    def __init__(self):
+        self._subscriptions = []
+        self._lock = threading.Lock()
+
+    def subscribe(self, event_type, handler, deliver=None, owner=None):
+        """
+        Подписка на события
+
+        Args:
+            event_type: класс события (события подклассов тоже доставляются)
+            handler: обработчик (event) -> None
+            deliver: функция доставки (callback, event), например executor.post
+            owner: виджет-владелец; после его уничтожения подписка отменяется
+
+        Returns:
+            Subscription: подписка (метод cancel отменяет ее)
+        """
+        subscription = Subscription(self, event_type, handler, deliver, owner)
+        with self._lock:
+            self._subscriptions.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Отмена подписки"""
+        with self._lock:
+            if subscription in self._subscriptions:
+                self._subscriptions.remove(subscription)
+
+    def publish(self, event):
+        """Рассылка события всем подписчикам его типа"""
+        with self._lock:
+            subscriptions = [s for s in self._subscriptions if isinstance(event, s.event_type)]
+        for subscription in subscriptions:
+            subscription.notify(event)
+
+    def publish_on_commit(self, db_connection, event):
+        """Публикация события после фиксации текущей единицы работы"""
+        db_connection.on_commit(lambda: self.publish(event))
+
+    def clear(self):
+        """Отмена всех подписок"""
+        with self._lock:
+            self._subscriptions.clear()
+
+
+# Единая шина событий для всего приложения
+event_bus = EventBus()
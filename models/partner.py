@@ -1,4 +1,7 @@
 """Модель для работы с партнерами"""
+from database.errors import DatabaseError
+from models.events import PartnerCreated, PartnerUpdated, event_bus
+from models.reference_data import reference_cache
 
 
 class Partner:
@@ -17,9 +20,26 @@ class Partner:
         return self.db.execute_query(query)
     
     def get_partner_types(self):
-        """Получение типов партнеров"""
+        """Получение типов партнеров (из кэша справочников)"""
         query = "SELECT id, type_name FROM partner_types ORDER BY type_name"
-        return self.db.execute_query(query)
+        return reference_cache.get('partner_types', self.db, lambda: self.db.execute_query(query))
+    
+    def get_partner_logo(self, partner_id):
+        """
+        Получение логотипа партнера (загружается отдельно от списка заявок)
+        
+        Returns:
+            bytes: логотип или None, если логотипа нет
+        
+        Raises:
+            DatabaseError: логотип не удалось загрузить (ошибка БД), чтобы
+                ее не путали с отсутствием логотипа
+        """
+        query = "SELECT logo FROM partners WHERE id = %s"
+        result = self.db.execute_query(query, (partner_id,))
+        if result is None:
+            raise DatabaseError("Ошибка запроса", f"Не удалось загрузить логотип партнера {partner_id}")
+        return result[0]['logo'] if result else None
     
     def update_partner(self, partner_id, partner_type_id, company_name, director_name, 
                       email, phone, legal_address, inn, rating):
@@ -32,7 +52,10 @@ class Partner:
         """
         params = (partner_type_id, company_name, director_name, email, phone, 
                  legal_address, inn, rating, partner_id)
-        return self.db.execute_update(query, params)
+        success = self.db.execute_update(query, params)
+        if success:
+            event_bus.publish_on_commit(self.db, PartnerUpdated(partner_id))
+        return success
     
     def create_partner(self, partner_type_id, company_name, director_name, 
                       email, phone, legal_address, inn, rating):
@@ -44,4 +67,7 @@ class Partner:
         """
         params = (partner_type_id, company_name, director_name, email, phone, 
                  legal_address, inn, rating)
-        return self.db.execute_insert(query, params)
+        partner_id = self.db.execute_insert(query, params)
+        if partner_id:
+            event_bus.publish_on_commit(self.db, PartnerCreated(partner_id))
+        return partner_id
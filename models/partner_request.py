@@ -1,8 +1,54 @@
 """Модель для работы с заявками партнеров"""
+import base64
+import time
+
+from models.events import (
+    RequestCreated, RequestLinesChanged, RequestTotalChanged, RequestUpdated, event_bus
+)
 from models.partner import Partner
 from models.product import Product
 
 
+# Время (секунды), после которого пропуск в номерах журнала изменений считается
+# откатом транзакции, а не еще не зафиксированным изменением
+CHANGE_GAP_TIMEOUT = 30
+
+# Количество последних записей журнала изменений, которые не удаляются при очистке
+CHANGE_LOG_KEEP = 100000
+
+
+class ChangeVersion:
+    """Отметка ленты изменений
+
+    Номера записей журнала изменений выдаются при вставке, а другим клиентам
+    видны только после фиксации транзакции, поэтому запись с меньшим номером
+    может появиться позже записи с большим. Отметка хранит номер, до которого
+    журнал прочитан без пропусков (``mark``), номера уже прочитанных записей
+    выше него (``seen``) и время, с которого ожидается первый пропуск
+    (``gap_since``). Признак ``more`` означает, что в журнале остались
+    записи сверх прочитанного лимита.
+    """
+    __slots__ = ('mark', 'seen', 'gap_since', 'more')
+
+    def __init__(self, mark, seen=frozenset(), gap_since=None, more=False):
+        self.mark = mark
+        self.seen = seen
+        self.gap_since = gap_since
+        self.more = more
+
+    def __gt__(self, other):
+        return self.mark > other.mark
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, ChangeVersion)
+            and (self.mark, self.seen, self.gap_since) == (other.mark, other.seen, other.gap_since)
+        )
+
+    def __repr__(self):
+        return f"ChangeVersion({self.mark}, seen={sorted(self.seen)}, gap_since={self.gap_since})"
+
+
 class PartnerRequest:
     """Класс для работы с заявками партнеров"""
     def __init__(self, db_connection):
@@ -22,7 +68,7 @@ class PartnerRequest:
                 p.legal_address,
                 p.phone,
                 p.rating,
-                p.logo
+                p.logo_hash
             FROM partner_requests pr
             JOIN partners p ON pr.partner_id = p.id
             JOIN partner_types pt ON p.partner_type_id = pt.id
@@ -30,6 +76,199 @@ class PartnerRequest:
         """
         return self.db.execute_query(query)
     
+    def get_requests_page(self, cursor=None, page_size=50):
+        """
+        Получение страницы заявок (постраничная выборка по ключу pr.id)
+        
+        Args:
+            cursor: непрозрачный курсор из предыдущего вызова или None для первой страницы
+            page_size: количество заявок на странице
+            
+        Returns:
+            tuple: (список заявок, курсор следующей страницы или None, если страниц больше нет)
+        """
+        condition = ""
+        params = []
+        if cursor is not None:
+            condition = "WHERE pr.id < %s"
+            params.append(self._decode_cursor(cursor))
+        # Запрашиваем на одну запись больше, чтобы узнать, есть ли следующая страница
+        params.append(page_size + 1)
+        
+        query = f"""
+            SELECT 
+                pr.id as request_id,
+                pr.partner_id,
+                pr.total_cost,
+                pt.type_name as partner_type,
+                p.company_name,
+                p.legal_address,
+                p.phone,
+                p.rating,
+                p.logo_hash
+            FROM partner_requests pr
+            JOIN partners p ON pr.partner_id = p.id
+            JOIN partner_types pt ON p.partner_type_id = pt.id
+            {condition}
+            ORDER BY pr.id DESC
+            LIMIT %s
+        """
+        rows = self.db.execute_query(query, tuple(params))
+        if not rows:
+            return [], None
+        
+        if len(rows) > page_size:
+            rows = rows[:page_size]
+            return rows, self._encode_cursor(rows[-1]['request_id'])
+        return rows, None
+    
+    def get_requests_by_ids(self, request_ids):
+        """Получение заявок с информацией о партнерах по списку ID (для точечного обновления)"""
+        request_ids = list(request_ids)
+        if not request_ids:
+            return []
+        placeholders = ', '.join(['%s'] * len(request_ids))
+        query = f"""
+            SELECT 
+                pr.id as request_id,
+                pr.partner_id,
+                pr.total_cost,
+                pt.type_name as partner_type,
+                p.company_name,
+                p.legal_address,
+                p.phone,
+                p.rating,
+                p.logo_hash
+            FROM partner_requests pr
+            JOIN partners p ON pr.partner_id = p.id
+            JOIN partner_types pt ON p.partner_type_id = pt.id
+            WHERE pr.id IN ({placeholders})
+            ORDER BY pr.id DESC
+        """
+        return self.db.execute_query(query, tuple(request_ids))
+    
+    def get_change_version(self):
+        """Текущая отметка ленты изменений (начальная отметка для get_changes_since)"""
+        result = self.db.execute_query("SELECT COALESCE(MAX(id), 0) as version FROM request_changes")
+        return ChangeVersion(result[0]['version']) if result else None
+    
+    def get_changes_since(self, version, limit=500):
+        """
+        Заявки с информацией о партнерах, измененные после отметки
+        
+        Каждое изменение заявки, ее позиций или ее партнера (в том числе
+        сделанное другим клиентом) добавляет запись в журнал изменений
+        ``request_changes`` (триггеры в db.sql), поэтому опрос выполняется
+        одним запросом по первичному ключу журнала. Пропуск в номерах
+        записей ожидается до CHANGE_GAP_TIMEOUT секунд: за это время
+        транзакция, получившая номер, успевает зафиксироваться.
+        
+        Args:
+            version: отметка (ChangeVersion) из предыдущего вызова
+            limit: наибольшее количество записей журнала за один вызов
+            
+        Returns:
+            tuple: (измененные заявки в порядке изменения, новая отметка);
+                   при ошибке БД - (None, прежняя отметка)
+        """
+        query = """
+            SELECT id, request_id
+            FROM request_changes
+            WHERE id > %s
+            ORDER BY id
+            LIMIT %s
+        """
+        # Уже прочитанные записи выше отметки выбираются повторно, поэтому
+        # лимит увеличивается на их количество
+        entries = self.db.execute_query(query, (version.mark, limit + len(version.seen)), prepared=True)
+        if entries is None:
+            return None, version
+        
+        mark, gap_since = version.mark, version.gap_since
+        now = time.monotonic()
+        for entry in entries:
+            if entry['id'] == mark + 1:
+                mark += 1
+                continue
+            # Пропуск перед записью: ожидается, пока он не станет окончательным
+            if mark != version.mark or gap_since is None:
+                gap_since = now
+                break
+            if now - gap_since < CHANGE_GAP_TIMEOUT:
+                break
+            mark, gap_since = entry['id'], None
+        else:
+            gap_since = None
+        
+        # Заявки по порядку их последнего изменения
+        changed = {}
+        for entry in entries:
+            if entry['id'] not in version.seen:
+                changed.pop(entry['request_id'], None)
+                changed[entry['request_id']] = entry['id']
+        seen = frozenset(
+            entry['id'] for entry in entries if entry['id'] > mark
+        )
+        new_version = ChangeVersion(mark, seen, gap_since, more=len(entries) - len(version.seen) >= limit)
+        if not changed:
+            return [], new_version
+        
+        rows = self.get_requests_by_ids(changed)
+        if rows is None:
+            return None, version
+        order = {request_id: position for position, request_id in enumerate(changed)}
+        rows.sort(key=lambda row: order[row['request_id']])
+        return rows, new_version
+    
+    def prune_change_log(self, keep=CHANGE_LOG_KEEP):
+        """Удаление старых записей журнала изменений (остаются последние keep)"""
+        result = self.db.execute_query("SELECT COALESCE(MAX(id), 0) as version FROM request_changes")
+        if not result:
+            return False
+        return self.db.execute_update(
+            "DELETE FROM request_changes WHERE id <= %s", (result[0]['version'] - keep,)
+        )
+    
+    def iter_requests_with_partners(self, batch_size=500):
+        """Потоковый обход всех заявок с информацией о партнерах (для выгрузок)"""
+        query = """
+            SELECT 
+                pr.id as request_id,
+                pr.partner_id,
+                pr.total_cost,
+                pt.type_name as partner_type,
+                p.company_name,
+                p.legal_address,
+                p.phone,
+                p.rating
+            FROM partner_requests pr
+            JOIN partners p ON pr.partner_id = p.id
+            JOIN partner_types pt ON p.partner_type_id = pt.id
+            ORDER BY pr.id DESC
+        """
+        return self.db.iter_query(query, batch_size=batch_size)
+    
+    def count_requests(self):
+        """Получение общего количества заявок"""
+        result = self.db.execute_query("SELECT COUNT(*) as count FROM partner_requests")
+        return result[0]['count'] if result else 0
+    
+    @staticmethod
+    def _encode_cursor(last_id):
+        """Упаковка идентификатора последней заявки в курсор"""
+        return base64.urlsafe_b64encode(f"id:{last_id}".encode()).decode('ascii')
+    
+    @staticmethod
+    def _decode_cursor(cursor):
+        """Распаковка курсора страницы"""
+        try:
+            prefix, value = base64.urlsafe_b64decode(cursor.encode('ascii')).decode().split(':')
+            if prefix != 'id':
+                raise ValueError(cursor)
+            return int(value)
+        except (ValueError, UnicodeError, AttributeError):
+            raise ValueError(f"Некорректный курсор страницы: {cursor!r}")
+    
     def get_request_by_id(self, request_id):
         """Получение информации о конкретной заявке"""
         query = """
@@ -52,7 +291,7 @@ class PartnerRequest:
             JOIN partner_types pt ON p.partner_type_id = pt.id
             WHERE pr.id = %s
         """
-        result = self.db.execute_query(query, (request_id,))
+        result = self.db.execute_query(query, (request_id,), prepared=True)
         return result[0] if result else None
     
     def create_request(self, partner_id):
@@ -61,16 +300,37 @@ class PartnerRequest:
             INSERT INTO partner_requests (partner_id, request_date, status, total_cost)
             VALUES (%s, NOW(), 'Новая', 0.00)
         """
-        return self.db.execute_insert(query, (partner_id,))
+        request_id = self.db.execute_insert(query, (partner_id,))
+        if request_id:
+            event_bus.publish_on_commit(self.db, RequestCreated(request_id, partner_id))
+        return request_id
     
     def update_request_partner(self, request_id, partner_id):
         """Обновление партнера в заявке"""
         query = "UPDATE partner_requests SET partner_id = %s WHERE id = %s"
-        return self.db.execute_update(query, (partner_id, request_id))
+        success = self.db.execute_update(query, (partner_id, request_id))
+        if success:
+            event_bus.publish_on_commit(self.db, RequestUpdated(request_id))
+        return success
     
-    def get_request_products(self, request_id):
-        """Получение списка продукции в заявке"""
-        query = """
+    def get_request_products(self, request_id, product_ids=None):
+        """
+        Получение списка продукции в заявке
+        
+        Args:
+            request_id: идентификатор заявки
+            product_ids: если задан, возвращаются только позиции этих продуктов
+        """
+        condition = ""
+        params = [request_id]
+        if product_ids is not None:
+            product_ids = list(product_ids)
+            if not product_ids:
+                return []
+            condition = f"AND rp.product_id IN ({', '.join(['%s'] * len(product_ids))})"
+            params.extend(product_ids)
+        
+        query = f"""
             SELECT 
                 rp.id,
                 rp.product_id,
@@ -82,49 +342,115 @@ class PartnerRequest:
                 ROUND(rp.quantity * rp.cost_per_unit, 2) as total_cost
             FROM request_products rp
             JOIN products prod ON rp.product_id = prod.id
-            WHERE rp.request_id = %s
+            WHERE rp.request_id = %s {condition}
             ORDER BY prod.product_name
         """
-        return self.db.execute_query(query, (request_id,))
+        # Выборка всей заявки выполняется часто и подготавливается на сервере
+        return self.db.execute_query(query, tuple(params), prepared=product_ids is None)
+    
+    def iter_all_request_products(self, batch_size=500):
+        """Потоковый обход продукции всех заявок (для выгрузок и отчетов)"""
+        query = """
+            SELECT 
+                rp.request_id,
+                rp.product_id,
+                prod.product_name,
+                prod.article,
+                rp.quantity,
+                rp.cost_per_unit,
+                ROUND(rp.quantity * rp.cost_per_unit, 2) as total_cost
+            FROM request_products rp
+            JOIN products prod ON rp.product_id = prod.id
+            ORDER BY rp.request_id, rp.id
+        """
+        return self.db.iter_query(query, batch_size=batch_size)
     
     def add_product_to_request(self, request_id, product_id, quantity):
         """Добавление продукции в заявку"""
         # Получаем минимальную стоимость продукта
         query = "SELECT min_cost_for_partner FROM products WHERE id = %s"
-        result = self.db.execute_query(query, (product_id,))
+        result = self.db.execute_query(query, (product_id,), prepared=True)
         if not result:
             return False
         
         cost_per_unit = float(result[0]['min_cost_for_partner'])
         
-        # Добавляем продукт в заявку
+        # Добавляем продукт в заявку; общую стоимость заявки
+        # в той же транзакции корректирует триггер на request_products
         query = """
             INSERT INTO request_products (request_id, product_id, quantity, cost_per_unit)
             VALUES (%s, %s, %s, %s)
             ON DUPLICATE KEY UPDATE quantity = %s, cost_per_unit = %s
         """
         params = (request_id, product_id, quantity, cost_per_unit, quantity, cost_per_unit)
-        success = self.db.execute_update(query, params)
-        
+        success = self.db.execute_update(query, params, prepared=True)
         if success:
-            # Обновляем общую стоимость заявки
-            self.update_request_total(request_id)
+            event_bus.publish_on_commit(self.db, RequestLinesChanged(request_id, [product_id]))
+        return success
+    
+    def add_products_to_request(self, request_id, items):
+        """
+        Пакетное добавление продукции в заявку
+        
+        Цены загружаются одним запросом, позиции записываются одним executemany
+        с единственной фиксацией транзакции. Если какой-либо продукт не найден,
+        заявка не изменяется.
+        
+        Args:
+            request_id: идентификатор заявки
+            items: набор пар (product_id, quantity); при повторе продукта
+                   используется последнее количество
+            
+        Returns:
+            bool: успешность добавления
+        """
+        lines = {}
+        for product_id, quantity in items:
+            lines[product_id] = quantity
+        if not lines:
+            return True
         
+        # Получаем минимальные стоимости всех продуктов одним запросом
+        placeholders = ', '.join(['%s'] * len(lines))
+        query = f"SELECT id, min_cost_for_partner FROM products WHERE id IN ({placeholders})"
+        result = self.db.execute_query(query, tuple(lines))
+        if not result:
+            return False
+        prices = {row['id']: row['min_cost_for_partner'] for row in result}
+        if any(product_id not in prices for product_id in lines):
+            return False
+        
+        # Общую стоимость заявки корректирует триггер на request_products
+        query = """
+            INSERT INTO request_products (request_id, product_id, quantity, cost_per_unit)
+            VALUES (%s, %s, %s, %s)
+            ON DUPLICATE KEY UPDATE quantity = VALUES(quantity), cost_per_unit = VALUES(cost_per_unit)
+        """
+        params = [
+            (request_id, product_id, quantity, prices[product_id])
+            for product_id, quantity in lines.items()
+        ]
+        success = self.db.execute_many(query, params)
+        if success:
+            event_bus.publish_on_commit(self.db, RequestLinesChanged(request_id, lines))
         return success
     
     def remove_product_from_request(self, request_id, product_id):
         """Удаление продукции из заявки"""
+        # Общую стоимость заявки корректирует триггер на request_products
         query = "DELETE FROM request_products WHERE request_id = %s AND product_id = %s"
-        success = self.db.execute_update(query, (request_id, product_id))
-        
+        success = self.db.execute_update(query, (request_id, product_id), prepared=True)
         if success:
-            # Обновляем общую стоимость заявки
-            self.update_request_total(request_id)
-        
+            event_bus.publish_on_commit(self.db, RequestLinesChanged(request_id, [product_id]))
         return success
     
     def update_request_total(self, request_id):
-        """Обновление общей стоимости заявки"""
+        """
+        Полный пересчет общей стоимости заявки
+        
+        При изменении позиций итог поддерживается триггерами инкрементально;
+        метод нужен для сверки и исправления итога после ручных правок данных.
+        """
         query = """
             UPDATE partner_requests 
             SET total_cost = (
@@ -134,4 +460,16 @@ class PartnerRequest:
             )
             WHERE id = %s
         """
-        return self.db.execute_update(query, (request_id, request_id))
+        with self.db.transaction() as transaction:
+            success = self.db.execute_update(query, (request_id, request_id), prepared=True)
+            # Триггер заявки не записывает изменение одного итога (обычно его
+            # уже записал триггер позиции), поэтому сверка записывает его сама
+            if success:
+                success = self.db.execute_update(
+                    "INSERT INTO request_changes (request_id) VALUES (%s)", (request_id,)
+                )
+            if success:
+                event_bus.publish_on_commit(self.db, RequestTotalChanged(request_id))
+            else:
+                transaction.set_rollback_only()
+        return success
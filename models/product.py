@@ -1,4 +1,7 @@
 """Модель для работы с продукцией"""
+from models.events import ProductCreated, ProductTypeCreated, event_bus
+from models.reference_data import reference_cache
+from utils.product_index import ProductIndex
 
 
 class Product:
@@ -7,7 +10,7 @@ class Product:
         self.db = db_connection
     
     def get_all_products(self):
-        """Получение списка всей продукции"""
+        """Получение списка всей продукции (из кэша справочников)"""
         query = """
             SELECT 
                 p.id,
@@ -19,25 +22,44 @@ class Product:
             JOIN product_types pt ON p.product_type_id = pt.id
             ORDER BY p.product_name
         """
-        return self.db.execute_query(query)
+        return reference_cache.get('products', self.db, lambda: self.db.execute_query(query))
+    
+    def get_product_index(self):
+        """
+        Поисковый индекс продукции для подбора по мере ввода
+        
+        Индекс хранится в кэше справочников: строится из списка всей продукции
+        и перестраивается после устаревания записи, чтобы в поиск попадала
+        продукция, созданная другими клиентами. Продукция, созданная в этом
+        приложении, добавляется в индекс сразу (см. create_product). Поиск
+        к БД не обращается.
+        
+        Returns:
+            ProductIndex: индекс или None при ошибке загрузки продукции
+        """
+        def build():
+            products = self.get_all_products()
+            return ProductIndex(products) if products is not None else None
+        
+        return reference_cache.get('product_index', self.db, build)
     
     def get_product_types(self):
-        """Получение типов продукции с коэффициентами"""
+        """Получение типов продукции с коэффициентами (из кэша справочников)"""
         query = """
             SELECT id, type_name, coefficient
             FROM product_types
             ORDER BY type_name
         """
-        return self.db.execute_query(query)
+        return reference_cache.get('product_types', self.db, lambda: self.db.execute_query(query))
     
     def get_material_types(self):
-        """Получение типов материалов с процентом брака"""
+        """Получение типов материалов с процентом брака (из кэша справочников)"""
         query = """
             SELECT id, type_name, defect_percentage
             FROM material_types
             ORDER BY type_name
         """
-        return self.db.execute_query(query)
+        return reference_cache.get('material_types', self.db, lambda: self.db.execute_query(query))
     
     def create_product_type(self, type_name, coefficient):
         """Создание нового типа продукции"""
@@ -45,7 +67,12 @@ class Product:
             INSERT INTO product_types (type_name, coefficient)
             VALUES (%s, %s)
         """
-        return self.db.execute_insert(query, (type_name, coefficient))
+        type_id = self.db.execute_insert(query, (type_name, coefficient))
+        if type_id:
+            # Внутри единицы работы кэш сбрасывается только после фиксации
+            self.db.on_commit(lambda: reference_cache.invalidate('product_types'))
+            event_bus.publish_on_commit(self.db, ProductTypeCreated(type_id))
+        return type_id
     
     def create_product(self, product_type_id, product_name, article, min_cost_for_partner):
         """Создание новой продукции"""
@@ -53,10 +80,37 @@ class Product:
             INSERT INTO products (product_type_id, product_name, article, min_cost_for_partner)
             VALUES (%s, %s, %s, %s)
         """
-        return self.db.execute_insert(query, (product_type_id, product_name, article, min_cost_for_partner))
+        product_id = self.db.execute_insert(query, (product_type_id, product_name, article, min_cost_for_partner))
+        if product_id:
+            # Внутри единицы работы кэш сбрасывается только после фиксации
+            self.db.on_commit(lambda: reference_cache.invalidate('products'))
+            # Строка в том же виде, что и строки get_all_products
+            product = {
+                'id': product_id,
+                'product_name': product_name,
+                'article': article,
+                'min_cost_for_partner': min_cost_for_partner,
+                'product_type': self._product_type_name(product_type_id)
+            }
+            self.db.on_commit(lambda: self._add_to_index(product))
+            event_bus.publish_on_commit(self.db, ProductCreated(product_id))
+        return product_id
+    
+    def _add_to_index(self, product):
+        """Добавление созданной продукции в уже построенный поисковый индекс"""
+        index = reference_cache.peek('product_index', self.db)
+        if index is not None:
+            index.add(product)
+    
+    def _product_type_name(self, product_type_id):
+        """Наименование типа продукции по id (из кэша справочников)"""
+        for product_type in self.get_product_types() or []:
+            if product_type['id'] == product_type_id:
+                return product_type['type_name']
+        return None
     
     def check_article_exists(self, article):
         """Проверка существования артикула"""
         query = "SELECT COUNT(*) as count FROM products WHERE article = %s"
-        result = self.db.execute_query(query, (article,))
+        result = self.db.execute_query(query, (article,), prepared=True)
         return result[0]['count'] > 0 if result else False
@@ -0,0 +1,132 @@
+"""Кэш справочных данных (типы партнеров, продукции и материалов)"""
+import threading
+import time
+import weakref
+from decimal import Decimal
+
+
+class ReferenceDataCache:
+    """Общий для процесса кэш справочников
+
+    Записи хранятся не дольше ``ttl`` секунд и сбрасываются явно при
+    изменении справочника (например, при создании типа продукции).
+    Записи хранятся отдельно для каждого подключения к БД, чтобы разные базы
+    не смешивались; записи закрытого и удаленного подключения удаляются
+    вместе с ним.
+    """
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        # подключение -> {имя: (время устаревания, данные)}
+        self._entries = weakref.WeakKeyDictionary()
+        # подключение -> {имя: (исходные справочники, вычисленные данные)}
+        self._derived = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def get(self, name, db_connection, loader):
+        """
+        Получение справочника из кэша или загрузка его из БД
+
+        Args:
+            name: имя справочника
+            db_connection: подключение к БД
+            loader: функция загрузки данных; None (ошибка БД) не кэшируется
+
+        Returns:
+            данные справочника
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(db_connection, {}).get(name)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        value = loader()
+        if value is not None:
+            with self._lock:
+                self._entries.setdefault(db_connection, {})[name] = (now + self.ttl, value)
+        return value
+
+    def peek(self, name, db_connection):
+        """Справочник из кэша без загрузки (None, если его нет или он устарел)"""
+        with self._lock:
+            entry = self._entries.get(db_connection, {}).get(name)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        return None
+
+    def get_derived(self, name, db_connection, sources, build):
+        """
+        Получение данных, вычисленных из справочников
+
+        Данные вычисляются заново, только если хотя бы один из справочников
+        ``sources`` был загружен заново (после устаревания или сброса), поэтому
+        они устаревают вместе с ними.
+
+        Args:
+            name: имя вычисляемых данных
+            db_connection: подключение к БД
+            sources: справочники, полученные через get
+            build: функция вычисления данных из sources
+        """
+        sources = tuple(sources)
+        if any(source is None for source in sources):
+            # Ошибка загрузки справочника: результат не кэшируется
+            return build(*sources)
+
+        with self._lock:
+            entry = self._derived.get(db_connection, {}).get(name)
+        if entry is not None and all(a is b for a, b in zip(entry[0], sources)):
+            return entry[1]
+
+        value = build(*sources)
+        with self._lock:
+            self._derived.setdefault(db_connection, {})[name] = (sources, value)
+        return value
+
+    def invalidate(self, name=None):
+        """Сброс справочника с заданным именем (или всего кэша)"""
+        with self._lock:
+            if name is None:
+                self._entries.clear()
+                self._derived.clear()
+            else:
+                for entries in self._entries.values():
+                    entries.pop(name, None)
+
+
+# Единый кэш справочников для всего приложения
+reference_cache = ReferenceDataCache()
+
+
+def get_coefficient_tables(db_connection):
+    """
+    Таблицы коэффициентов для расчета материалов из кэша справочников
+
+    Таблицы строятся один раз на загрузку справочников и возвращаются
+    повторно, поэтому изменять их нельзя.
+
+    Returns:
+        tuple: (словарь id типа продукции -> коэффициент,
+                словарь id типа материала -> процент брака), значения Decimal
+    """
+    from models.product import Product
+
+    product = Product(db_connection)
+    return reference_cache.get_derived(
+        'coefficient_tables', db_connection,
+        (product.get_product_types(), product.get_material_types()),
+        _build_coefficient_tables
+    )
+
+
+def _build_coefficient_tables(product_types, material_types):
+    """Перевод справочников типов продукции и материалов в таблицы Decimal"""
+    product_coefficients = {
+        row['id']: Decimal(str(row['coefficient']))
+        for row in product_types or []
+    }
+    material_defects = {
+        row['id']: Decimal(str(row['defect_percentage']))
+        for row in material_types or []
+    }
+    return product_coefficients, material_defects
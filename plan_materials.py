@@ -0,0 +1,211 @@
+"""Пакетный расчет материалов без графического интерфейса
+
+Позиции производства читаются из файла CSV или JSONL (или из stdin)
+порциями, рассчитываются и сразу записываются в результат, поэтому объем
+занимаемой памяти не зависит от размера файла (миллионы строк).
+
+Столбцы входных данных: product_type_id, material_type_id,
+required_quantity, stock_quantity, param1, param2. К каждой строке
+добавляется столбец material_amount (-1 для позиции с ошибкой).
+
+Примеры:
+    python plan_materials.py lines.csv --output plan.csv
+    python plan_materials.py lines.jsonl --workers 4 > plan.jsonl
+    python plan_materials.py lines.csv --defaults   # без подключения к БД
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from collections import deque
+from decimal import Decimal, InvalidOperation
+
+from utils.parallel_calculator import ParallelMaterialCalculator, chunked
+
+
+# Столбцы входных данных в порядке аргументов расчета
+FIELDS = ('product_type_id', 'material_type_id', 'required_quantity',
+          'stock_quantity', 'param1', 'param2')
+RESULT_FIELD = 'material_amount'
+
+# Форматы файлов по расширению (остальные читаются как CSV)
+JSONL_EXTENSIONS = ('.jsonl', '.ndjson')
+
+
+def load_tables(use_defaults=False):
+    """
+    Таблицы коэффициентов для расчета
+
+    Args:
+        use_defaults: взять значения по умолчанию из material_calculator_method
+                      вместо справочников БД
+
+    Returns:
+        tuple: (коэффициенты типов продукции, проценты брака), значения Decimal
+    """
+    if use_defaults:
+        from material_calculator_method import DEFAULT_PRODUCT_COEFFICIENTS, DEFAULT_MATERIAL_DEFECTS
+        return (
+            {key: Decimal(str(value)) for key, value in DEFAULT_PRODUCT_COEFFICIENTS.items()},
+            {key: Decimal(str(value)) for key, value in DEFAULT_MATERIAL_DEFECTS.items()}
+        )
+
+    from database.connection import DatabaseConnection
+    from models.reference_data import get_coefficient_tables
+
+    # Без интерфейса ошибки БД выбрасываются, а не показываются в окне
+    db = DatabaseConnection(pool_size=1, raise_errors=True)
+    if not db.connect():
+        raise RuntimeError("Не удалось подключиться к базе данных")
+    try:
+        return get_coefficient_tables(db)
+    finally:
+        db.disconnect()
+
+
+def read_records(stream, input_format):
+    """Записи входного файла (словари) по одной"""
+    if input_format == 'jsonl':
+        for line in stream:
+            if line.strip():
+                # Дробные числа читаются как Decimal, чтобы расчет оставался точным
+                yield json.loads(line, parse_float=Decimal)
+    else:
+        yield from csv.DictReader(stream)
+
+
+def parse_row(record):
+    """Аргументы расчета из записи или None, если запись некорректна (результат -1)"""
+    try:
+        values = [record[field] for field in FIELDS]
+        return tuple(_to_int(value) for value in values[:4]) + tuple(
+            _to_decimal(value) for value in values[4:]
+        )
+    except (KeyError, TypeError, ValueError, InvalidOperation):
+        return None
+
+
+def plan(input_stream, output_stream, tables, input_format='csv', output_format=None,
+         chunk_size=10000, workers=0):
+    """
+    Потоковый расчет материалов для всех позиций входного потока
+
+    Args:
+        input_stream: текстовый поток с позициями (CSV или JSONL)
+        output_stream: текстовый поток для результатов
+        tables: таблицы коэффициентов (см. load_tables)
+        input_format: 'csv' или 'jsonl'
+        output_format: формат результата (по умолчанию как у входных данных)
+        chunk_size: количество позиций в одной порции
+        workers: количество процессов для расчета (0 - в текущем процессе)
+
+    Returns:
+        dict: количество обработанных позиций и позиций с ошибкой
+    """
+    writer = _Writer(output_stream, output_format or input_format)
+    stats = {'rows': 0, 'errors': 0}
+    # Записи порций, отправленных на расчет (результаты приходят в том же порядке)
+    pending = deque()
+
+    def row_chunks():
+        for records in chunked(read_records(input_stream, input_format), chunk_size):
+            pending.append(records)
+            yield [parse_row(record) for record in records]
+
+    with ParallelMaterialCalculator(*tables, workers=workers) as calculator:
+        for results in calculator.map_chunks(row_chunks()):
+            for record, result in zip(pending.popleft(), results):
+                record[RESULT_FIELD] = result
+                writer.write(record)
+            stats['rows'] += len(results)
+            stats['errors'] += sum(1 for result in results if result < 0)
+    return stats
+
+
+class _Writer:
+    """Запись результатов в CSV или JSONL по одной строке"""
+    def __init__(self, stream, output_format):
+        self.stream = stream
+        self.output_format = output_format
+        self._csv = None
+
+    def write(self, record):
+        if self.output_format == 'jsonl':
+            self.stream.write(json.dumps(record, ensure_ascii=False, default=_json_default) + '\n')
+            return
+        if self._csv is None:
+            # Столбцы берутся из первой записи, остальные дополняются пустыми значениями
+            self._csv = csv.DictWriter(self.stream, fieldnames=list(record), extrasaction='ignore')
+            self._csv.writeheader()
+        self._csv.writerow(record)
+
+
+def _to_int(value):
+    if isinstance(value, bool):
+        raise ValueError(value)
+    if isinstance(value, str):
+        return int(value.strip())
+    if isinstance(value, int):
+        return value
+    raise ValueError(value)
+
+
+def _to_decimal(value):
+    if isinstance(value, bool) or value is None:
+        raise ValueError(value)
+    return Decimal(value.strip() if isinstance(value, str) else str(value))
+
+
+def _json_default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Значение типа {type(value).__name__} не сериализуется в JSON")
+
+
+def _detect_format(path, default='csv'):
+    if path and path != '-':
+        return 'jsonl' if os.path.splitext(path)[1].lower() in JSONL_EXTENSIONS else 'csv'
+    return default
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетный расчет количества материалов")
+    parser.add_argument('input', nargs='?', default='-',
+                        help="файл с позициями CSV или JSONL (по умолчанию stdin)")
+    parser.add_argument('--output', '-o', default='-', help="файл результатов (по умолчанию stdout)")
+    parser.add_argument('--format', choices=('csv', 'jsonl'),
+                        help="формат входных данных (по умолчанию по расширению файла)")
+    parser.add_argument('--output-format', choices=('csv', 'jsonl'),
+                        help="формат результата (по умолчанию как у входных данных)")
+    parser.add_argument('--chunk-size', type=int, default=10000, help="позиций в одной порции")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="количество процессов для расчета (0 - без параллельности)")
+    parser.add_argument('--defaults', action='store_true',
+                        help="коэффициенты по умолчанию вместо справочников БД")
+    args = parser.parse_args(argv)
+
+    input_format = args.format or _detect_format(args.input)
+    output_format = args.output_format or _detect_format(args.output, input_format)
+
+    try:
+        tables = load_tables(args.defaults)
+    except Exception as e:
+        parser.exit(1, f"Ошибка загрузки коэффициентов: {e}\n")
+
+    input_stream = sys.stdin if args.input == '-' else open(args.input, encoding='utf-8', newline='')
+    output_stream = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    try:
+        stats = plan(input_stream, output_stream, tables, input_format, output_format,
+                     max(1, args.chunk_size), args.workers)
+    finally:
+        if input_stream is not sys.stdin:
+            input_stream.close()
+        if output_stream is not sys.stdout:
+            output_stream.close()
+
+    print(f"Обработано позиций: {stats['rows']}, с ошибкой: {stats['errors']}", file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
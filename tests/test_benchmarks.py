@@ -0,0 +1,51 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from benchmarks import data_generator
+from benchmarks.compare import compare
+from database.backends import SQLiteBackend
+from database.connection import DatabaseConnection, SQLITE_CONFIG
+
+
+class TestDataGenerator(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        backend = SQLiteBackend(
+            os.path.join(self.directory, 'bench.sqlite3'), SQLITE_CONFIG['schema_path']
+        )
+        self.db = DatabaseConnection(backend=backend)
+        self.db.error_reporter = lambda title, message: self.fail(message)
+        self.db.connect()
+
+    def tearDown(self):
+        self.db.disconnect()
+        shutil.rmtree(self.directory)
+
+    def test_generate(self):
+        """Тест генерации данных заданного масштаба с пересчетом сумм"""
+        counts = data_generator.generate(self.db, partners=50, lines_per_request=2)
+        self.assertEqual(counts, {'partners': 50, 'products': 100, 'requests': 50, 'lines': 100})
+
+        result = self.db.execute_query("""
+            SELECT COUNT(*) as count FROM partner_requests pr
+            WHERE ABS(pr.total_cost - (
+                SELECT COALESCE(SUM(quantity * cost_per_unit), 0)
+                FROM request_products rp WHERE rp.request_id = pr.id
+            )) > 0.01
+        """)
+        self.assertEqual(result[0]['count'], 0)
+
+
+class TestCompare(unittest.TestCase):
+    def test_regression(self):
+        """Тест обнаружения замедления сверх порога"""
+        base = {'results': [{'name': 'a', 'min': 1.0}, {'name': 'b', 'min': 1.0}]}
+        new = {'results': [{'name': 'a', 'min': 1.05}, {'name': 'b', 'min': 1.5}, {'name': 'c', 'min': 1.0}]}
+        rows = compare(base, new, threshold=0.1)
+        self.assertEqual([(row[0], row[4]) for row in rows], [('a', False), ('b', True)])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+import time
+import unittest
+from database.connection import ConnectionPool, PoolError
+
+
+class FakeConnection:
+    """Заглушка соединения для тестов пула"""
+    def __init__(self):
+        self.closed = False
+        self.alive = True
+        self.in_transaction = False
+
+    def rollback(self):
+        self.in_transaction = False
+
+    def close(self):
+        self.closed = True
+
+
+class TestConnectionPool(unittest.TestCase):
+    def setUp(self):
+        self.opened = []
+
+        def factory():
+            connection = FakeConnection()
+            self.opened.append(connection)
+            return connection
+
+        self.factory = factory
+
+    def test_reuses_returned_connection(self):
+        """Тест повторного использования соединения"""
+        pool = ConnectionPool(self.factory, size=2)
+        first = pool.checkout()
+        pool.checkin(first)
+        second = pool.checkout()
+        self.assertIs(first, second)
+        self.assertEqual(len(self.opened), 1)
+
+    def test_size_limit(self):
+        """Тест ограничения размера пула"""
+        pool = ConnectionPool(self.factory, size=1)
+        pool.checkout()
+        with self.assertRaises(PoolError):
+            pool.checkout(timeout=0.01)
+
+    def test_health_check_replaces_dead_connection(self):
+        """Тест замены неработающего соединения"""
+        pool = ConnectionPool(self.factory, size=1, health_check=lambda c: c.alive)
+        first = pool.checkout()
+        pool.checkin(first)
+        first.alive = False
+        second = pool.checkout()
+        self.assertIsNot(first, second)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.created, 1)
+
+    def test_idle_eviction(self):
+        """Тест закрытия простаивающих соединений"""
+        pool = ConnectionPool(self.factory, size=2, idle_timeout=0.01)
+        first = pool.checkout()
+        pool.checkin(first)
+        time.sleep(0.02)
+        second = pool.checkout()
+        self.assertTrue(first.closed)
+        self.assertIsNot(first, second)
+
+    def test_idle_eviction_closes_outside_lock(self):
+        """Тест закрытия устаревших соединений без удержания блокировки пула"""
+        pool = ConnectionPool(self.factory, size=2, idle_timeout=0.01)
+        first = pool.checkout()
+        pool.checkin(first)
+        locked = []
+        first.close = lambda: locked.append(pool._condition._is_owned())
+        time.sleep(0.02)
+        pool.checkout()
+        self.assertEqual(locked, [False])
+
+    def test_checkin_resets_connection(self):
+        """Тест отката незавершенной транзакции при возврате соединения"""
+        def reset(connection):
+            if connection.in_transaction:
+                connection.rollback()
+
+        pool = ConnectionPool(self.factory, size=1, reset=reset)
+        first = pool.checkout()
+        first.in_transaction = True
+        pool.checkin(first)
+        self.assertFalse(first.in_transaction)
+        self.assertIs(pool.checkout(), first)
+
+    def test_checkin_discards_connection_failed_reset(self):
+        """Тест закрытия соединения, которое не удалось сбросить"""
+        def reset(connection):
+            raise OSError("connection lost")
+
+        pool = ConnectionPool(self.factory, size=1, reset=reset)
+        first = pool.checkout()
+        pool.checkin(first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.created, 0)
+        self.assertIsNot(pool.checkout(), first)
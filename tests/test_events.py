@@ -0,0 +1,82 @@
+import unittest
+
+from models.events import (
+    EventBus, PartnerUpdated, RequestLinesChanged, RequestTotalChanged, event_bus
+)
+from models.partner_request import PartnerRequest
+
+
+class FakeOwner:
+    """Окно-владелец подписки"""
+    def __init__(self):
+        self.alive = True
+
+    def winfo_exists(self):
+        return self.alive
+
+
+class FakeDatabase:
+    """Заглушка подключения с отложенной фиксацией"""
+    def __init__(self):
+        self.pending = []
+
+    def execute_update(self, query, params=None, prepared=False):
+        return True
+
+    def on_commit(self, callback):
+        self.pending.append(callback)
+
+    def commit(self):
+        for callback in self.pending:
+            callback()
+        self.pending.clear()
+
+
+class TestEventBus(unittest.TestCase):
+    def setUp(self):
+        self.bus = EventBus()
+        self.received = []
+
+    def test_subtypes(self):
+        """Тест доставки событий подтипов и фильтрации по типу"""
+        self.bus.subscribe(RequestTotalChanged, self.received.append)
+        self.bus.publish(RequestLinesChanged(1, [2]))
+        self.bus.publish(PartnerUpdated(3))
+        self.assertEqual(self.received, [RequestLinesChanged(1, [2])])
+
+    def test_deliver_and_owner(self):
+        """Тест доставки через функцию и отмены подписки закрытого окна"""
+        posted = []
+        owner = FakeOwner()
+        self.bus.subscribe(PartnerUpdated, self.received.append,
+                           deliver=lambda callback, event: posted.append((callback, event)), owner=owner)
+        self.bus.publish(PartnerUpdated(1))
+        self.assertEqual(self.received, [])
+        for callback, event in posted:
+            callback(event)
+        self.assertEqual(self.received, [PartnerUpdated(1)])
+
+        owner.alive = False
+        self.bus.publish(PartnerUpdated(2))
+        for callback, event in posted[1:]:
+            callback(event)
+        self.assertEqual(self.received, [PartnerUpdated(1)])
+        self.assertEqual(self.bus._subscriptions, [])
+
+
+class TestModelEvents(unittest.TestCase):
+    def test_published_after_commit(self):
+        """Тест публикации события моделью только после фиксации"""
+        received = []
+        subscription = event_bus.subscribe(RequestTotalChanged, received.append)
+        self.addCleanup(subscription.cancel)
+
+        db = FakeDatabase()
+        PartnerRequest(db).remove_product_from_request(7, 3)
+        self.assertEqual(received, [])
+        db.commit()
+        self.assertEqual(received, [RequestLinesChanged(7, [3])])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,88 @@
+import json
+import os
+import tempfile
+import unittest
+
+from database.instrumentation import QueryInstrumentation, logger, normalize_query
+
+
+class FakeModel:
+    """Модель, выполняющая запрос через учет"""
+    def __init__(self, instrumentation):
+        self.instrumentation = instrumentation
+
+    def load(self, elapsed):
+        self.instrumentation.record("SELECT *\n  FROM t WHERE id IN (%s, %s)", elapsed, rows=2, size=16)
+
+
+class TestQueryInstrumentation(unittest.TestCase):
+    def test_normalize(self):
+        """Тест нормализации текста запроса"""
+        self.assertEqual(
+            normalize_query("SELECT *\n    FROM t WHERE id IN (%s, %s, %s)"),
+            "SELECT * FROM t WHERE id IN (%s, ...)"
+        )
+
+    def test_aggregation(self):
+        """Тест накопления статистики по запросу и вызывающему методу"""
+        instrumentation = QueryInstrumentation(slow_threshold=None)
+        model = FakeModel(instrumentation)
+        model.load(0.002)
+        model.load(0.004)
+
+        statements = instrumentation.snapshot()['statements']
+        self.assertEqual(len(statements), 1)
+        stats = statements[0]
+        self.assertEqual(stats['count'], 2)
+        self.assertEqual(stats['rows'], 4)
+        self.assertEqual(stats['bytes'], 32)
+        self.assertAlmostEqual(stats['max_ms'], 4.0)
+        self.assertEqual(stats['histogram']['<=5ms'], 2)
+        self.assertEqual(stats['callers'], {'FakeModel.load': 2})
+
+    def test_slow_query_log(self):
+        """Тест записи медленных запросов в журнал"""
+        instrumentation = QueryInstrumentation(slow_threshold=0.1)
+        with self.assertLogs('partner_orders.sql', level='WARNING') as logs:
+            instrumentation.record("SELECT 1", 0.5)
+            instrumentation.record("SELECT 2", 0.01)
+        self.assertEqual(len(logs.output), 1)
+        self.assertIn("SELECT 1", logs.output[0])
+
+    def test_shared_log_file(self):
+        """Тест: несколько учетов с одним файлом журнала пишут запрос один раз"""
+        directory = tempfile.mkdtemp()
+        path = os.path.join(directory, 'slow.log')
+        handlers = list(logger.handlers)
+        first = QueryInstrumentation(slow_threshold=0.1, log_path=path)
+        second = QueryInstrumentation(slow_threshold=0.1, log_path=path)
+        self.assertEqual(len(logger.handlers), len(handlers) + 1)
+
+        first.record("SELECT 1", 0.5)
+        first.close()
+        second.record("SELECT 2", 0.5)
+        second.close()
+        second.close()
+        self.assertEqual(logger.handlers, handlers)
+
+        with open(path, encoding='utf-8') as log_file:
+            lines = log_file.read().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertIn("SELECT 1", lines[0])
+        self.assertIn("SELECT 2", lines[1])
+        os.remove(path)
+        os.rmdir(directory)
+
+    def test_dump_json(self):
+        """Тест выгрузки статистики в JSON"""
+        instrumentation = QueryInstrumentation(slow_threshold=None)
+        instrumentation.record("SELECT 1", 0.001)
+        path = os.path.join(tempfile.mkdtemp(), 'stats.json')
+        instrumentation.dump_json(path)
+        with open(path, encoding='utf-8') as stats_file:
+            self.assertEqual(json.load(stats_file)['statements'][0]['statement'], "SELECT 1")
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,85 @@
+import io
+import tempfile
+import unittest
+from unittest.mock import Mock
+from PIL import Image
+from database.errors import DatabaseError
+from models.partner import Partner
+from utils.logo_cache import LogoCache
+
+
+def make_logo():
+    """Создание PNG-логотипа 200x100"""
+    buffer = io.BytesIO()
+    Image.new('RGB', (200, 100), 'blue').save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
+class TestLogoCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.loads = []
+        logo = make_logo()
+
+        def load_logo(partner_id):
+            self.loads.append(partner_id)
+            return logo
+
+        self.cache = LogoCache(load_logo, cache_dir=self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_thumbnail_size(self):
+        """Тест уменьшения логотипа"""
+        image = self.cache.get_thumbnail(1, 'abc')
+        self.assertEqual(image.size, (50, 50))
+
+    def test_disk_cache_skips_database(self):
+        """Тест повторного чтения миниатюры с диска"""
+        self.cache.get_thumbnail(1, 'abc')
+        self.cache.get_thumbnail(1, 'abc')
+        self.assertEqual(self.loads, [1])
+
+    def test_new_hash_reloads_logo(self):
+        """Тест загрузки логотипа после его изменения"""
+        self.cache.get_thumbnail(1, 'abc')
+        self.cache.get_thumbnail(1, 'def')
+        self.assertEqual(self.loads, [1, 1])
+
+    def test_no_logo(self):
+        """Тест партнера без логотипа"""
+        self.assertIsNone(self.cache.get(1, None))
+        self.assertEqual(self.loads, [])
+
+    def test_broken_logo_loaded_once(self):
+        """Тест однократной загрузки поврежденного логотипа"""
+        cache = LogoCache(lambda partner_id: self.loads.append(partner_id) or b'not an image',
+                          cache_dir=self.temp_dir.name)
+        self.assertIsNone(cache.get_thumbnail(2, 'bad'))
+        self.assertIsNone(cache.get_thumbnail(2, 'bad'))
+        self.assertTrue(cache.is_broken(2, 'bad'))
+        self.assertEqual(self.loads, [2])
+        self.assertFalse(cache.is_broken(2, 'new'))
+
+    def test_load_error_not_remembered(self):
+        """Тест повторной загрузки логотипа после ошибки БД"""
+        logo = make_logo()
+        # Ошибка запроса (execute_query вернул None), затем успешная загрузка
+        results = [None, [{'logo': logo}]]
+        db = Mock()
+        db.execute_query.side_effect = lambda query, params=None: results.pop(0)
+
+        cache = LogoCache(Partner(db).get_partner_logo, cache_dir=self.temp_dir.name)
+        with self.assertRaises(DatabaseError):
+            cache.get_thumbnail(3, 'abc')
+        self.assertFalse(cache.is_broken(3, 'abc'))
+        self.assertEqual(cache.get_thumbnail(3, 'abc').size, (50, 50))
+
+    def test_null_logo_remembered(self):
+        """Тест: отсутствующий в БД логотип запоминается как поврежденный"""
+        db = Mock()
+        db.execute_query.return_value = [{'logo': None}]
+        cache = LogoCache(Partner(db).get_partner_logo, cache_dir=self.temp_dir.name)
+        self.assertIsNone(cache.get_thumbnail(3, 'abc'))
+        self.assertTrue(cache.is_broken(3, 'abc'))
@@ -0,0 +1,89 @@
+import gc
+import unittest
+from models.product import Product
+from models.reference_data import get_coefficient_tables, reference_cache
+from utils.material_calculator import MaterialCalculator
+
+
+class FakeDatabase:
+    """Заглушка подключения со справочниками типов продукции и материалов"""
+    def __init__(self):
+        self.queries = []
+        self.product_types = [
+            {'id': 1, 'type_name': 'Древесно-плитные материалы', 'coefficient': '1.50'},
+            {'id': 2, 'type_name': 'Декоративные панели', 'coefficient': '3.50'},
+            {'id': 3, 'type_name': 'Плитка', 'coefficient': '5.25'},
+            {'id': 4, 'type_name': 'Фасадные материалы', 'coefficient': '4.50'},
+            {'id': 5, 'type_name': 'Напольные покрытия', 'coefficient': '2.17'},
+        ]
+        self.material_types = [
+            {'id': i, 'type_name': f'Тип материала {i}', 'defect_percentage': value}
+            for i, value in enumerate(['0.0020', '0.0050', '0.0030', '0.0015', '0.0018'], 1)
+        ]
+
+    def execute_query(self, query, params=None):
+        self.queries.append(query)
+        if 'FROM product_types' in query:
+            return list(self.product_types)
+        return list(self.material_types)
+
+    def execute_insert(self, query, params=None):
+        self.product_types.append({'id': 6, 'type_name': params[0], 'coefficient': params[1]})
+        return 6
+
+    def on_commit(self, callback):
+        callback()
+
+
+class TestMaterialCalculator(unittest.TestCase):
+    rows = [
+        (1, 1, 100, 20, 2.5, 3.0),
+        (3, 2, 10, 0, 1.2, 0.8),
+        (5, 4, 7, 7, 1.0, 1.0),
+        (999, 1, 100, 20, 2.5, 3.0),
+        (2, 3, -1, 0, 1.0, 1.0),
+        (4, 5, 1000, 1, 0.35, 12.7),
+    ]
+
+    def setUp(self):
+        reference_cache.invalidate()
+        self.db = FakeDatabase()
+
+    def test_batch_matches_single_calculation(self):
+        """Тест совпадения пакетного и поштучного расчета"""
+        expected = [MaterialCalculator.calculate_material_amount(*row, self.db) for row in self.rows]
+        result = MaterialCalculator.calculate_material_amounts(self.rows, self.db)
+        self.assertEqual(result, expected)
+        self.assertEqual(result[0], 902)
+        self.assertEqual(result[3], -1)
+
+    def test_coefficients_fetched_once(self):
+        """Тест загрузки коэффициентов один раз на процесс"""
+        for row in self.rows * 50:
+            MaterialCalculator.calculate_material_amount(*row, self.db)
+        MaterialCalculator.calculate_material_amounts(self.rows * 100, self.db)
+        self.assertEqual(len(self.db.queries), 2)
+
+    def test_new_product_type_invalidates_cache(self):
+        """Тест сброса кэша при создании типа продукции"""
+        self.assertEqual(MaterialCalculator.calculate_material_amount(6, 1, 10, 0, 1.0, 1.0, self.db), -1)
+        Product(self.db).create_product_type('Новый тип', '2.00')
+        self.assertEqual(MaterialCalculator.calculate_material_amount(6, 1, 10, 0, 1.0, 1.0, self.db), 21)
+
+    def test_coefficient_tables_reused(self):
+        """Тест повторного использования таблиц Decimal до сброса справочника"""
+        tables = get_coefficient_tables(self.db)
+        self.assertIs(get_coefficient_tables(self.db), tables)
+        reference_cache.invalidate('product_types')
+        self.assertIsNot(get_coefficient_tables(self.db), tables)
+
+    def test_cache_per_connection_object(self):
+        """Тест: новое подключение не получает данные удаленного подключения"""
+        get_coefficient_tables(self.db)
+        del self.db
+        gc.collect()
+        other = FakeDatabase()
+        other.product_types = other.product_types[:1]
+        product_coefficients, _ = get_coefficient_tables(other)
+        self.assertEqual(list(product_coefficients), [1])
+        self.assertEqual(len(other.queries), 2)
@@ -0,0 +1,67 @@
+import random
+import unittest
+
+try:
+    import numpy
+    from utils.material_engine import MaterialEngine
+except ImportError:
+    numpy = None
+
+from material_calculator_method import calculate_material_amount
+
+PRODUCT_COEFFICIENTS = {1: 1.5, 2: 3.5, 3: 5.25, 4: 4.5, 5: 2.17}
+MATERIAL_DEFECTS = {1: 0.002, 2: 0.005, 3: 0.003, 4: 0.0015, 5: 0.0018}
+
+
+@unittest.skipIf(numpy is None, "NumPy не установлен")
+class TestMaterialEngine(unittest.TestCase):
+    def setUp(self):
+        self.engine = MaterialEngine(PRODUCT_COEFFICIENTS, MATERIAL_DEFECTS)
+
+    def calculate(self, rows):
+        return self.engine.calculate(*zip(*rows)).tolist()
+
+    def test_standalone_vectors(self):
+        """Тест на данных из автономных тестов расчета"""
+        rows = [(1, 1, 100, 20, 2.5, 3.0), (999, 1, 100, 20, 2.5, 3.0)]
+        self.assertEqual(self.calculate(rows), [902, -1])
+
+    def test_invalid_rows(self):
+        """Тест позиций с ошибками и без производства"""
+        rows = [
+            (1, 6, 10, 0, 1.0, 1.0),
+            (1, 1, -1, 0, 1.0, 1.0),
+            (1, 1, 10, -5, 1.0, 1.0),
+            (1, 1, 10, 0, 0.0, 1.0),
+            (1, 1, 10, 0, 1.0, -2.0),
+            (2, 2, 5, 10, 1.0, 1.0),
+        ]
+        self.assertEqual(self.calculate(rows), [-1, -1, -1, -1, -1, 0])
+
+    def test_int64_overflow(self):
+        """Тест результата вне диапазона int64: ошибка вместо искаженного значения"""
+        rows = [
+            (1, 1, 1, 0, 9.2e18, 1.0),
+            (1, 1, 10, 0, 1e300, 1e300),
+            (1, 1, 1, 0, 1e18, 1.0),
+        ]
+        result = self.calculate(rows)
+        self.assertEqual(result[:2], [-1, -1])
+        self.assertGreater(result[2], 10 ** 18)
+
+    def test_matches_scalar_method(self):
+        """Тест побитового совпадения с поштучным расчетом"""
+        generator = random.Random(7)
+        rows = [
+            (
+                generator.randint(0, 6),
+                generator.randint(0, 6),
+                generator.randint(-5, 10000),
+                generator.randint(-5, 5000),
+                round(generator.uniform(-1, 50), generator.randint(0, 3)),
+                round(generator.uniform(-1, 50), generator.randint(0, 3)),
+            )
+            for _ in range(5000)
+        ]
+        expected = [calculate_material_amount(*row) for row in rows]
+        self.assertEqual(self.calculate(rows), expected)
@@ -0,0 +1,99 @@
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from database.backends import SQLiteBackend
+from database.connection import SQLITE_CONFIG
+from database.migrations import migrate
+
+
+class TestSQLiteMigrations(unittest.TestCase):
+    """Обновление базы SQLite, созданной ранней версией db_sqlite.sql"""
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'test.sqlite3')
+        self.backend = SQLiteBackend(self.path, SQLITE_CONFIG['schema_path'])
+        self.backend.create_connection().close()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def execute(self, *statements):
+        connection = self.backend.create_connection()
+        try:
+            for statement in statements:
+                rows = connection.raw.execute(statement).fetchall()
+        finally:
+            connection.close()
+        return rows
+
+    def test_new_database_is_current(self):
+        """Тест: база по текущему скрипту не требует обновления"""
+        self.assertEqual(migrate(self.backend), [])
+
+    def test_request_total_triggers(self):
+        """Тест создания триггеров итога заявки и сверки итогов с позициями"""
+        self.execute(
+            "DROP TRIGGER trg_request_products_after_insert",
+            "DROP TRIGGER trg_request_products_after_update",
+            "DROP TRIGGER trg_request_products_after_delete",
+            "INSERT INTO request_products (request_id, product_id, quantity, cost_per_unit) "
+            "VALUES (1, 1, 2, 100.50)",
+        )
+        total = self.execute("SELECT total_cost FROM partner_requests WHERE id = 1")[0][0]
+
+        self.assertEqual(migrate(self.backend), ["триггеры итога заявки"])
+        rows = self.execute("SELECT total_cost FROM partner_requests WHERE id = 1")
+        self.assertEqual(rows[0][0], total + 201)
+        self.assertEqual(migrate(self.backend), [])
+
+        rows = self.execute(
+            "UPDATE request_products SET quantity = 3 WHERE request_id = 1 AND product_id = 1",
+            "SELECT total_cost FROM partner_requests WHERE id = 1",
+        )
+        self.assertEqual(rows[0][0], total + 301.5)
+
+    def test_change_log(self):
+        """Тест создания журнала изменений заявок и его триггеров"""
+        self.execute(*(
+            [f"DROP TRIGGER {name}" for name in (
+                'trg_partner_requests_log_insert', 'trg_partner_requests_log_update',
+                'trg_request_products_log_insert', 'trg_request_products_log_update',
+                'trg_request_products_log_delete', 'trg_partners_log_update',
+            )] + ["DROP TABLE request_changes"]
+        ))
+
+        self.assertEqual(migrate(self.backend), ["журнал изменений заявок", "триггеры журнала изменений заявок"])
+        self.assertEqual(migrate(self.backend), [])
+
+        rows = self.execute(
+            "UPDATE partner_requests SET status = 'В работе' WHERE id = 1",
+            "SELECT request_id FROM request_changes",
+        )
+        self.assertEqual([tuple(row) for row in rows], [(1,)])
+
+    def test_logo_hash(self):
+        """Тест добавления и заполнения хэша логотипа"""
+        self.execute(
+            "DROP TRIGGER trg_partners_logo_hash_after_insert",
+            "DROP TRIGGER trg_partners_logo_hash_after_update",
+            "ALTER TABLE partners DROP COLUMN logo_hash",
+            "UPDATE partners SET logo = x'0102' WHERE id = 1",
+        )
+
+        self.assertEqual(migrate(self.backend), ["partners.logo_hash", "триггеры partners.logo_hash"])
+        self.assertEqual(migrate(self.backend), [])
+
+        rows = self.execute("SELECT logo_hash FROM partners WHERE id = 1")
+        self.assertEqual(rows[0][0], hashlib.md5(b'\x01\x02').hexdigest())
+        rows = self.execute(
+            "UPDATE partners SET logo = x'03' WHERE id = 2",
+            "SELECT logo_hash FROM partners WHERE id = 2",
+        )
+        self.assertEqual(rows[0][0], hashlib.md5(b'\x03').hexdigest())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,44 @@
+import random
+import unittest
+from decimal import Decimal
+
+from utils.material_calculator import MaterialCalculator
+from utils.parallel_calculator import ParallelMaterialCalculator
+
+
+PRODUCT_COEFFICIENTS = {1: Decimal('1.5'), 2: Decimal('3.5'), 3: Decimal('5.25')}
+MATERIAL_DEFECTS = {1: Decimal('0.002'), 2: Decimal('0.005')}
+
+
+class TestParallelMaterialCalculator(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        # Среди позиций есть неизвестные типы и некорректные параметры
+        self.rows = [
+            (rng.randint(1, 4), rng.randint(1, 3), rng.randint(0, 10000), rng.randint(0, 1000),
+             round(rng.uniform(-1, 10), 2), round(rng.uniform(0.1, 10), 2))
+            for _ in range(1000)
+        ]
+        self.expected = [
+            MaterialCalculator.calculate_with_tables(row, PRODUCT_COEFFICIENTS, MATERIAL_DEFECTS)
+            for row in self.rows
+        ]
+
+    def test_matches_sequential(self):
+        """Тест совпадения параллельного расчета с поштучным и порядка результатов"""
+        with ParallelMaterialCalculator(PRODUCT_COEFFICIENTS, MATERIAL_DEFECTS,
+                                        workers=2, chunk_size=64) as calculator:
+            self.assertEqual(calculator.calculate(self.rows), self.expected)
+            # Пул процессов используется повторно
+            self.assertEqual(list(calculator.map(iter(self.rows[:10]))), self.expected[:10])
+        self.assertIn(-1, self.expected)
+
+    def test_in_process(self):
+        """Тест расчета в текущем процессе без запуска пула"""
+        calculator = ParallelMaterialCalculator(PRODUCT_COEFFICIENTS, MATERIAL_DEFECTS, workers=1)
+        self.assertEqual(calculator.calculate(self.rows), self.expected)
+        self.assertIsNone(calculator._executor)
+
+
+if __name__ == '__main__':
+    unittest.main()
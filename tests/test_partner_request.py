@@ -0,0 +1,71 @@
+import unittest
+from models.partner_request import PartnerRequest
+
+
+class FakeDatabase:
+    """Заглушка подключения, возвращающая заявки с убывающими ID"""
+    def __init__(self, ids):
+        self.ids = sorted(ids, reverse=True)
+
+    def execute_query(self, query, params=None):
+        params = list(params or [])
+        limit = params.pop()
+        ids = self.ids
+        if params:
+            ids = [i for i in ids if i < params[0]]
+        return [{'request_id': i} for i in ids[:limit]]
+
+
+class TestRequestsPage(unittest.TestCase):
+    def test_pages_cover_all_requests(self):
+        """Тест обхода всех заявок постранично"""
+        model = PartnerRequest(FakeDatabase(range(1, 8)))
+        seen = []
+        rows, cursor = model.get_requests_page(page_size=3)
+        seen.extend(r['request_id'] for r in rows)
+        while cursor:
+            rows, cursor = model.get_requests_page(cursor, page_size=3)
+            seen.extend(r['request_id'] for r in rows)
+        self.assertEqual(seen, [7, 6, 5, 4, 3, 2, 1])
+
+    def test_invalid_cursor(self):
+        """Тест некорректного курсора"""
+        model = PartnerRequest(FakeDatabase([]))
+        with self.assertRaises(ValueError):
+            model.get_requests_page('garbage')
+
+
+class FakeLineItemDatabase:
+    """Заглушка подключения для пакетного добавления позиций"""
+    def __init__(self, prices):
+        self.prices = prices
+        self.queries = []
+        self.batches = []
+
+    def execute_query(self, query, params=None):
+        self.queries.append(params)
+        return [{'id': i, 'min_cost_for_partner': self.prices[i]} for i in params if i in self.prices]
+
+    def execute_many(self, query, params_list):
+        self.batches.append(params_list)
+        return True
+
+    def on_commit(self, callback):
+        callback()
+
+
+class TestAddProductsToRequest(unittest.TestCase):
+    def test_single_price_query_and_batch(self):
+        """Тест загрузки цен одним запросом и записи одним пакетом"""
+        db = FakeLineItemDatabase({1: 10, 2: 20})
+        model = PartnerRequest(db)
+        self.assertTrue(model.add_products_to_request(5, [(1, 3), (2, 4), (1, 7)]))
+        self.assertEqual(len(db.queries), 1)
+        self.assertEqual(db.batches, [[(5, 1, 7, 10), (5, 2, 4, 20)]])
+
+    def test_unknown_product(self):
+        """Тест отказа при отсутствующем продукте"""
+        db = FakeLineItemDatabase({1: 10})
+        model = PartnerRequest(db)
+        self.assertFalse(model.add_products_to_request(5, [(1, 3), (9, 1)]))
+        self.assertEqual(db.batches, [])
@@ -0,0 +1,59 @@
+import io
+import json
+import unittest
+
+from plan_materials import load_tables, plan
+
+
+CSV_INPUT = (
+    "product_type_id,material_type_id,required_quantity,stock_quantity,param1,param2\n"
+    "1,1,100,20,2.5,3.0\n"
+    "999,1,100,20,2.5,3.0\n"
+    "1,1,10,20,2.5,3.0\n"
+    "1,1,abc,20,2.5,3.0\n"
+)
+
+
+class TestPlanMaterials(unittest.TestCase):
+    def setUp(self):
+        self.tables = load_tables(use_defaults=True)
+
+    def test_csv(self):
+        """Тест потокового расчета CSV порциями с ошибочными строками"""
+        output = io.StringIO()
+        stats = plan(io.StringIO(CSV_INPUT), output, self.tables, chunk_size=3)
+
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0].split(',')[-1], 'material_amount')
+        self.assertEqual([line.split(',')[-1] for line in lines[1:]], ['902', '-1', '0', '-1'])
+        self.assertEqual(stats, {'rows': 4, 'errors': 2})
+
+    def test_jsonl_to_csv(self):
+        """Тест чтения JSONL с записью результата в CSV"""
+        source = '{"product_type_id": 1, "material_type_id": 1, "required_quantity": 100,' \
+                 ' "stock_quantity": 20, "param1": 2.5, "param2": 3.0}\n\n'
+        output = io.StringIO()
+        plan(io.StringIO(source), output, self.tables, input_format='jsonl', output_format='csv')
+        self.assertEqual(output.getvalue().splitlines()[1].split(',')[-1], '902')
+
+    def test_workers(self):
+        """Тест расчета в пуле процессов с сохранением порядка строк"""
+        rows = [
+            {'product_type_id': 1, 'material_type_id': 1, 'required_quantity': quantity,
+             'stock_quantity': 0, 'param1': 2.5, 'param2': 3.0}
+            for quantity in range(200)
+        ]
+        source = ''.join(json.dumps(row) + '\n' for row in rows)
+
+        sequential, parallel = io.StringIO(), io.StringIO()
+        plan(io.StringIO(source), sequential, self.tables, input_format='jsonl', chunk_size=16)
+        stats = plan(io.StringIO(source), parallel, self.tables, input_format='jsonl',
+                     chunk_size=16, workers=2)
+
+        self.assertEqual(parallel.getvalue(), sequential.getvalue())
+        self.assertEqual(stats['rows'], 200)
+        self.assertEqual(json.loads(parallel.getvalue().splitlines()[100])['material_amount'], 1128)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,133 @@
+import unittest
+from decimal import Decimal
+
+from models.product import Product
+from models.reference_data import reference_cache
+from utils.product_index import ProductIndex, normalize
+
+
+PRODUCT_TYPES = [
+    {'id': 1, 'type_name': 'Ламинат', 'coefficient': Decimal('2.35')},
+]
+
+PRODUCTS = [
+    {'id': 1, 'product_name': 'Паркетная доска Ясень темный однополосная', 'article': '8758385'},
+    {'id': 2, 'product_name': 'Инженерная доска Дуб Французская елка однополосная', 'article': '8858958'},
+    {'id': 3, 'product_name': 'Ламинат Дуб дымчато-белый 33 класс 12 мм', 'article': '7750282'},
+    {'id': 4, 'product_name': 'Ламинат Дуб серый 32 класс 8 мм с фаской', 'article': '7028748'},
+    {'id': 5, 'product_name': 'Пробковое напольное клеевое покрытие 32 класс 4 мм', 'article': '5012543'},
+    {'id': 6, 'product_name': 'Плита МДФ 600х300х35', 'article': 'MDF-600'},
+    {'id': 7, 'product_name': 'Ёлочка паркетная', 'article': '875'},
+]
+
+
+class FakeDatabase:
+    """Заглушка подключения со списком продукции"""
+    def __init__(self, products):
+        self.products = list(products)
+        self.queries = 0
+
+    def execute_query(self, query, params=None):
+        if 'FROM product_types' in query:
+            return list(PRODUCT_TYPES)
+        self.queries += 1
+        return list(self.products)
+
+    def execute_insert(self, query, params=None):
+        return 100
+
+    def on_commit(self, callback):
+        callback()
+
+
+def ids(products):
+    return [product['id'] for product in products]
+
+
+class TestProductIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = ProductIndex(PRODUCTS)
+
+    def test_normalize(self):
+        """Тест приведения регистра, "ё" и похожих латинских букв"""
+        self.assertEqual(normalize('Ёлочка  600Х300'), normalize('елочка 600x300'))
+        self.assertEqual(normalize('  MDF-600 '), 'mdf 600')
+
+    def test_article_prefix(self):
+        """Тест поиска по началу артикула: точное совпадение первым"""
+        self.assertEqual(ids(self.index.search('875')), [7, 1])
+        self.assertEqual(ids(self.index.search('mdf600')), [6])
+
+    def test_name_words(self):
+        """Тест поиска по всем словам наименования в любом порядке"""
+        self.assertEqual(ids(self.index.search('дуб ламинат')), [3, 4])
+        self.assertEqual(ids(self.index.search('32 клас')), [4, 5])
+        self.assertEqual(ids(self.index.search('дымч')), [3])
+        self.assertEqual(self.index.search('дуб ясень'), [])
+
+    def test_layout_and_yo(self):
+        """Тест совпадения латинской "x" с кириллической "х" и "е" с "ё" """
+        self.assertEqual(ids(self.index.search('600x300')), [6])
+        self.assertEqual(ids(self.index.search('елоч')), [7])
+
+    def test_ranking_and_limit(self):
+        """Тест порядка результатов и ограничения их количества"""
+        self.assertEqual(ids(self.index.search('ла')), [3, 4])
+        self.assertEqual(ids(self.index.search('паркетн')), [1, 7])
+        self.assertEqual(len(self.index.search('д', limit=2)), 2)
+        self.assertEqual(self.index.search('  '), [])
+
+    def test_add_and_remove(self):
+        """Тест добавления, замены и удаления продукции"""
+        self.index.add({'id': 8, 'product_name': 'Ламинат Орех', 'article': '1'})
+        self.assertEqual(ids(self.index.search('ламинат')), [3, 4, 8])
+        self.index.add({'id': 8, 'product_name': 'Плитка', 'article': '1'})
+        self.assertEqual(ids(self.index.search('ламинат')), [3, 4])
+        self.index.remove(6)
+        self.assertEqual(self.index.search('мдф'), [])
+        self.assertEqual(len(self.index), 7)
+
+
+class TestProductModelIndex(unittest.TestCase):
+    def setUp(self):
+        reference_cache.invalidate()
+        self.ttl = reference_cache.ttl
+
+    def tearDown(self):
+        reference_cache.ttl = self.ttl
+        reference_cache.invalidate()
+
+    def test_index_built_once_and_updated_on_create(self):
+        """Тест построения индекса один раз и его дополнения при создании продукции"""
+        db = FakeDatabase(PRODUCTS)
+        product = Product(db)
+        index = product.get_product_index()
+        self.assertIs(product.get_product_index(), index)
+        self.assertEqual(db.queries, 1)
+
+        product.create_product(1, 'Ламинат Сосна', 'L-100', Decimal('1500.00'))
+        self.assertEqual(ids(index.search('сосна')), [100])
+        self.assertEqual(index.search('сосна')[0]['product_type'], 'Ламинат')
+        self.assertIs(product.get_product_index(), index)
+        self.assertEqual(db.queries, 1)
+
+    def test_index_expires_with_cache(self):
+        """Тест перестроения индекса после устаревания кэша справочников"""
+        db = FakeDatabase(PRODUCTS)
+        product = Product(db)
+        reference_cache.ttl = 0
+        product.get_product_index()
+        # Продукция, созданная другим клиентом
+        db.products.append({'id': 200, 'product_name': 'Ламинат Кедр', 'article': 'K-1'})
+        self.assertEqual(ids(product.get_product_index().search('кедр')), [200])
+
+    def test_index_per_connection(self):
+        """Тест отдельных индексов для разных подключений"""
+        first = Product(FakeDatabase(PRODUCTS))
+        second = Product(FakeDatabase(PRODUCTS[:1]))
+        self.assertEqual(len(first.get_product_index()), len(PRODUCTS))
+        self.assertEqual(len(second.get_product_index()), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
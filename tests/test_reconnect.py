@@ -0,0 +1,90 @@
+import unittest
+from mysql.connector import Error
+
+from database.backends import MySQLBackend
+from database.connection import ConnectionPool, DatabaseConnection
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+        self.lastrowid = 1
+        self.rowcount = 1
+
+    def execute(self, query, params=None):
+        self.connection.executed += 1
+        if self.connection.dead:
+            raise Error(errno=2013, msg="Lost connection to MySQL server during query")
+
+    def fetchall(self):
+        return [{'id': 1}]
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Соединение, которое сервер мог закрыть (dead=True)"""
+    def __init__(self, dead):
+        self.dead = dead
+        self.executed = 0
+        self.closed = False
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+class TestReconnect(unittest.TestCase):
+    def setUp(self):
+        # Первое соединение уже закрыто сервером, следующие исправны
+        self.connections = []
+
+        def factory():
+            connection = FakeConnection(dead=not self.connections)
+            self.connections.append(connection)
+            return connection
+
+        self.errors = []
+        self.db = DatabaseConnection(backend=MySQLBackend({}))
+        self.db.retry_base_delay = 0
+        self.db.error_reporter = lambda title, message: self.errors.append(message)
+        self.db.pool = ConnectionPool(factory, size=2)
+
+    def test_read_is_retried_on_new_connection(self):
+        """Тест повтора чтения после потери соединения"""
+        self.assertEqual(self.db.execute_query("SELECT 1"), [{'id': 1}])
+        self.assertEqual(len(self.connections), 2)
+        self.assertTrue(self.connections[0].closed)
+        self.assertEqual(self.errors, [])
+
+    def test_write_is_not_retried(self):
+        """Тест: изменение не повторяется, но потерянное соединение отбрасывается"""
+        self.assertFalse(self.db.execute_update("UPDATE t SET a = 1"))
+        self.assertEqual(len(self.errors), 1)
+        self.assertTrue(self.connections[0].closed)
+        self.assertTrue(self.db.execute_update("UPDATE t SET a = 1"))
+
+    def test_backoff_is_bounded(self):
+        """Тест границ задержки перед повтором"""
+        self.db.retry_base_delay = 0.1
+        self.db.retry_max_delay = 0.3
+        for attempt in range(6):
+            delay = self.db._backoff_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(0.3, 0.1 * 2 ** attempt))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,186 @@
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+from decimal import Decimal
+from unittest.mock import patch
+
+from database.backends import SQLiteBackend, translate
+from database.connection import DatabaseConnection, SQLITE_CONFIG
+from models.partner_request import ChangeVersion, PartnerRequest
+from models.reference_data import reference_cache
+
+
+class TestTranslate(unittest.TestCase):
+    def test_upsert(self):
+        """Тест перевода ON DUPLICATE KEY UPDATE на диалект SQLite"""
+        query = translate(
+            "INSERT INTO t (a, b) VALUES (%s, %s) "
+            "ON DUPLICATE KEY UPDATE b = VALUES(b)"
+        )
+        self.assertEqual(
+            query,
+            "INSERT INTO t (a, b) VALUES (?, ?) ON CONFLICT DO UPDATE SET b = excluded.b"
+        )
+
+
+class TestSQLiteBackend(unittest.TestCase):
+    """Модели на встроенной базе SQLite со схемой и данными из db_sqlite.sql"""
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        backend = SQLiteBackend(
+            os.path.join(self.directory, 'test.sqlite3'), SQLITE_CONFIG['schema_path']
+        )
+        self.errors = []
+        self.db = DatabaseConnection(pool_size=2, backend=backend)
+        self.db.error_reporter = lambda title, message: self.errors.append(message)
+        self.assertTrue(self.db.connect())
+        self.model = PartnerRequest(self.db)
+        reference_cache.invalidate()
+
+    def tearDown(self):
+        self.db.disconnect()
+        reference_cache.invalidate()
+        shutil.rmtree(self.directory)
+
+    def test_seed_data(self):
+        """Тест начальных данных и постраничной выборки"""
+        self.assertEqual(self.model.count_requests(), 20)
+        rows, cursor = self.model.get_requests_page(page_size=15)
+        self.assertEqual(len(rows), 15)
+        rows, cursor = self.model.get_requests_page(cursor, page_size=15)
+        self.assertEqual(len(rows), 5)
+        self.assertIsNone(cursor)
+
+    def test_line_items_and_total(self):
+        """Тест добавления позиций и пересчета суммы триггерами"""
+        request_id = self.model.create_request(1)
+        self.assertTrue(request_id)
+        self.assertTrue(self.model.add_products_to_request(request_id, [(1, 2), (2, 3)]))
+        self.assertTrue(self.model.add_product_to_request(request_id, 1, 5))
+        self.assertTrue(self.model.remove_product_from_request(request_id, 2))
+
+        request = self.model.get_request_by_id(request_id)
+        products = self.model.get_request_products(request_id)
+        self.assertEqual([(p['product_id'], p['quantity']) for p in products], [(1, 5)])
+        expected = Decimal(str(products[0]['cost_per_unit'])) * 5
+        self.assertEqual(Decimal(str(request['total_cost'])), expected)
+        self.assertEqual(self.errors, [])
+
+    def test_transaction_rollback(self):
+        """Тест отката единицы работы"""
+        with self.db.transaction() as transaction:
+            self.model.create_request(1)
+            transaction.set_rollback_only()
+        self.assertEqual(self.model.count_requests(), 20)
+
+    def test_change_feed(self):
+        """Тест ленты изменений: позиции, партнер и новые заявки по отметке версии"""
+        version = self.model.get_change_version()
+        rows, version = self.model.get_changes_since(version)
+        self.assertEqual(rows, [])
+
+        self.model.add_product_to_request(3, 1, 2)
+        partner = self.db.execute_query("SELECT * FROM partners WHERE id = 2")[0]
+        self.model.partner.update_partner(
+            2, partner['partner_type_id'], "Новое имя", partner['director_name'], partner['email'],
+            partner['phone'], partner['legal_address'], partner['inn'], partner['rating']
+        )
+        request_id = self.model.create_request(1)
+
+        rows, version = self.model.get_changes_since(version)
+        changed = [row['request_id'] for row in rows]
+        self.assertEqual(changed[0], 3)
+        self.assertEqual(changed[-1], request_id)
+        renamed = [row for row in rows if row['partner_id'] == 2]
+        self.assertTrue(renamed)
+        self.assertTrue(all(row['company_name'] == "Новое имя" for row in renamed))
+        self.assertEqual(self.model.get_changes_since(version), ([], version))
+
+    def test_transaction_takes_write_lock(self):
+        """Тест: единица работы сразу берет блокировку записи (BEGIN IMMEDIATE)"""
+        other = self.db.pool.checkout()
+        try:
+            other.raw.execute("PRAGMA busy_timeout = 0")
+            with self.db.transaction():
+                with self.assertRaises(sqlite3.OperationalError):
+                    other.start_transaction()
+        finally:
+            self.db.pool.checkin(other)
+
+    def test_change_feed_total_logged_once(self):
+        """Тест: изменение позиции записывается в журнал один раз, без записи итога"""
+        self.model.add_product_to_request(3, 1, 2)
+        rows = self.db.execute_query("SELECT COUNT(*) as count FROM request_changes WHERE request_id = 3")
+        self.assertEqual(rows[0]['count'], 1)
+
+    def test_change_feed_waits_for_gap(self):
+        """Тест ожидания пропущенного номера журнала (незафиксированной транзакции)"""
+        version = self.model.get_change_version()
+        mark = version.mark
+        log = "INSERT INTO request_changes (id, request_id) VALUES (%s, %s)"
+        self.db.execute_update(log, (mark + 2, 5))
+
+        rows, version = self.model.get_changes_since(version)
+        self.assertEqual([row['request_id'] for row in rows], [5])
+        self.assertEqual(version.mark, mark)
+        rows, version = self.model.get_changes_since(version)
+        self.assertEqual(rows, [])
+
+        self.db.execute_update(log, (mark + 1, 4))
+        rows, version = self.model.get_changes_since(version)
+        self.assertEqual([row['request_id'] for row in rows], [4])
+        self.assertEqual(version, ChangeVersion(mark + 2))
+
+        # Пропуск, не заполненный за CHANGE_GAP_TIMEOUT, считается откатом
+        self.db.execute_update(log, (mark + 4, 6))
+        with patch('models.partner_request.CHANGE_GAP_TIMEOUT', 0):
+            rows, version = self.model.get_changes_since(version)
+            self.assertEqual(version.mark, mark + 2)
+            rows, version = self.model.get_changes_since(version)
+        self.assertEqual((rows, version), ([], ChangeVersion(mark + 4)))
+
+    def test_update_request_total_logged(self):
+        """Тест записи сверки итога в журнал изменений"""
+        version = self.model.get_change_version()
+        self.db.execute_update("UPDATE partner_requests SET total_cost = 0 WHERE id = 2")
+        self.assertEqual(self.model.get_changes_since(version), ([], version))
+        self.assertTrue(self.model.update_request_total(2))
+        rows, version = self.model.get_changes_since(version)
+        self.assertEqual([row['request_id'] for row in rows], [2])
+        self.assertGreater(rows[0]['total_cost'], 0)
+
+
+class TestSQLiteMemoryBackend(unittest.TestCase):
+    """База в памяти: все соединения пула работают с одной базой"""
+    def test_pool_shares_database(self):
+        """Тест общей базы для нескольких соединений пула"""
+        db = DatabaseConnection(pool_size=3, backend=SQLiteBackend(':memory:', SQLITE_CONFIG['schema_path']))
+        self.assertTrue(db.connect())
+        try:
+            connections = [db.pool.checkout() for _ in range(3)]
+            for connection in connections:
+                cursor = connection.cursor()
+                cursor.execute("SELECT COUNT(*) FROM partner_requests")
+                self.assertEqual(cursor.fetchone(), (20,))
+            connections[0].cursor().execute("DELETE FROM request_products")
+            cursor = connections[2].cursor()
+            cursor.execute("SELECT COUNT(*) FROM request_products")
+            self.assertEqual(cursor.fetchone(), (0,))
+            for connection in connections:
+                db.pool.checkin(connection)
+        finally:
+            db.disconnect()
+
+    def test_backends_do_not_share_database(self):
+        """Тест: каждое хранилище в памяти получает собственную базу"""
+        first = SQLiteBackend(':memory:', SQLITE_CONFIG['schema_path']).create_connection()
+        second = SQLiteBackend(':memory:').create_connection()
+        first.raw.execute("SELECT 1 FROM partners")
+        with self.assertRaises(sqlite3.OperationalError):
+            second.raw.execute("SELECT 1 FROM partners")
+
+
+if __name__ == '__main__':
+    unittest.main()
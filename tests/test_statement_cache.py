@@ -0,0 +1,87 @@
+import unittest
+from mysql.connector import Error
+
+from database.backends import ER_UNKNOWN_STMT_HANDLER, MySQLBackend, StatementCache
+from database.connection import ConnectionPool, DatabaseConnection
+
+
+class FakePreparedCursor:
+    """Подготовленный курсор: считает подготовки выражений на сервере"""
+    def __init__(self, connection):
+        self.connection = connection
+        self.executed = None
+        self.lastrowid = None
+        self.rowcount = 1
+
+    def execute(self, query, params=None):
+        if self.executed is not query:
+            self.connection.prepares += 1
+            self.executed = query
+        if self.connection.forget_statements:
+            self.connection.forget_statements = False
+            raise Error(errno=ER_UNKNOWN_STMT_HANDLER, msg="Unknown prepared statement handler")
+
+    def fetchall(self):
+        return [{'count': 0}]
+
+    def close(self):
+        self.connection.closed_statements += 1
+
+
+class FakeConnection:
+    def __init__(self):
+        self.prepares = 0
+        self.closed_statements = 0
+        self.forget_statements = False
+
+    def cursor(self, prepared=False, dictionary=False):
+        return FakePreparedCursor(self)
+
+    def close(self):
+        pass
+
+
+class TestStatementCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованных выражений"""
+        connection = FakeConnection()
+        cache = StatementCache(connection, capacity=2)
+        for query in ("SELECT 1", "SELECT 2", "SELECT 1", "SELECT 3"):
+            cache.get(query).execute()
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(connection.prepares, 3)
+        self.assertEqual(connection.closed_statements, 1)
+
+    def test_reprepare_after_reconnect(self):
+        """Тест повторной подготовки, если сервер забыл выражение"""
+        connection = FakeConnection()
+        statement = StatementCache(connection).get("SELECT 1")
+        statement.execute()
+        connection.forget_statements = True
+        statement.execute()
+        self.assertEqual(connection.prepares, 2)
+
+    def test_reprepare_closes_old_cursor(self):
+        """Тест закрытия прежнего курсора при повторной подготовке"""
+        connection = FakeConnection()
+        statement = StatementCache(connection).get("SELECT 1")
+        statement.execute()
+        cursor = statement.cursor
+        connection.forget_statements = True
+        statement.execute()
+        self.assertIsNot(statement.cursor, cursor)
+        self.assertEqual(connection.closed_statements, 1)
+
+    def test_database_connection_reuses_statement(self):
+        """Тест: повторный запрос с prepared=True не подготавливается заново"""
+        connection = FakeConnection()
+        db = DatabaseConnection(backend=MySQLBackend({}))
+        db.pool = ConnectionPool(lambda: connection, size=1)
+        query = "SELECT COUNT(*) as count FROM products WHERE article = %s"
+        for article in ('1', '2', '3'):
+            self.assertEqual(db.execute_query(query, (article,), prepared=True), [{'count': 0}])
+        self.assertEqual(connection.prepares, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,69 @@
+import unittest
+from database.connection import ConnectionPool, DatabaseConnection
+
+
+class FakeStreamCursor:
+    """Курсор, отдающий строки порциями и считающий обращения"""
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.fetches = 0
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchmany(self, size):
+        self.fetches += 1
+        batch, self.rows = self.rows[:size], self.rows[size:]
+        return batch
+
+    def close(self):
+        pass
+
+
+class FakeStreamConnection:
+    def __init__(self, rows):
+        self.rows = rows
+        self.closed = False
+
+    def cursor(self, dictionary=False, buffered=None):
+        self.last_cursor = FakeStreamCursor(self.rows)
+        return self.last_cursor
+
+    def close(self):
+        self.closed = True
+
+
+class TestIterQuery(unittest.TestCase):
+    def setUp(self):
+        self.connections = []
+
+        def factory():
+            connection = FakeStreamConnection([{'id': i} for i in range(7)])
+            self.connections.append(connection)
+            return connection
+
+        self.db = DatabaseConnection()
+        self.db.pool = ConnectionPool(factory, size=1)
+
+    def test_batches(self):
+        """Тест выдачи строк пакетами фиксированного размера"""
+        batches = list(self.db.iter_query_batches("SELECT", batch_size=3))
+        self.assertEqual([len(batch) for batch in batches], [3, 3, 1])
+        self.assertEqual(self.db.pool.idle, 1)
+
+    def test_rows(self):
+        """Тест построчного обхода"""
+        ids = [row['id'] for row in self.db.iter_query("SELECT", batch_size=2)]
+        self.assertEqual(ids, list(range(7)))
+
+    def test_abandoned_stream_discards_connection(self):
+        """Тест: соединение с непрочитанным результатом не возвращается в пул"""
+        stream = self.db.iter_query("SELECT", batch_size=2)
+        next(stream)
+        stream.close()
+        self.assertTrue(self.connections[0].closed)
+        self.assertEqual(self.db.pool.created, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+import threading
+import time
+import unittest
+from utils.task_executor import TaskExecutor
+
+
+class FakeRoot:
+    """Заглушка окна Tk: отложенные вызовы выполняются вручную"""
+    def __init__(self):
+        self.callbacks = []
+        self.errors = []
+
+    def after(self, delay, callback):
+        self.callbacks.append(callback)
+        return len(self.callbacks)
+
+    def after_cancel(self, after_id):
+        pass
+
+    def report_callback_exception(self, exc_type, exc_value, tb):
+        self.errors.append(exc_value)
+
+    def pump(self):
+        callbacks, self.callbacks = self.callbacks, []
+        for callback in callbacks:
+            callback()
+
+
+class TestTaskExecutor(unittest.TestCase):
+    def setUp(self):
+        self.root = FakeRoot()
+        self.executor = TaskExecutor(self.root, max_workers=2)
+
+    def tearDown(self):
+        self.executor.shutdown()
+
+    def wait_for(self, condition):
+        deadline = time.monotonic() + 2
+        while not condition() and time.monotonic() < deadline:
+            self.root.pump()
+            time.sleep(0.005)
+
+    def test_result_delivered_on_poll_thread(self):
+        """Тест доставки результата в поток опроса"""
+        results = []
+        self.executor.submit(
+            lambda: 42,
+            on_success=lambda value: results.append((value, threading.current_thread()))
+        )
+        self.wait_for(lambda: results)
+        self.assertEqual(results, [(42, threading.current_thread())])
+
+    def test_stale_result_dropped(self):
+        """Тест отмены устаревшей загрузки с тем же ключом"""
+        release = threading.Event()
+        results = []
+        self.executor.submit(lambda: release.wait() and 'old', on_success=results.append, key='load')
+        self.executor.submit(lambda: 'new', on_success=results.append, key='load')
+        release.set()
+        self.wait_for(lambda: results)
+        time.sleep(0.02)
+        self.root.pump()
+        self.assertEqual(results, ['new'])
+
+    def test_error_delivered(self):
+        """Тест доставки исключения обработчику"""
+        errors = []
+        self.executor.submit(lambda: 1 / 0, on_error=errors.append)
+        self.wait_for(lambda: errors)
+        self.assertIsInstance(errors[0], ZeroDivisionError)
@@ -0,0 +1,172 @@
+import unittest
+from mysql.connector import Error
+from database.connection import ConnectionPool, DatabaseConnection, PoolError
+from database.errors import DatabaseError
+
+
+class FakeCursor:
+    """Курсор, записывающий выполненные команды в журнал соединения"""
+    def __init__(self, connection, fail=False):
+        self.connection = connection
+        self.fail = fail  # ошибка любой команды
+        self.lastrowid = None
+
+    def execute(self, query, params=None):
+        if self.fail or 'FAIL' in query:
+            raise Error(msg="ошибка запроса")
+        self.connection.log.append(query)
+        self.lastrowid = len(self.connection.log)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    """Соединение, записывающее команды управления транзакцией"""
+    def __init__(self):
+        self.log = []
+
+    def cursor(self, dictionary=False):
+        return FakeCursor(self)
+
+    def start_transaction(self):
+        self.log.append('BEGIN')
+
+    def commit(self):
+        self.log.append('COMMIT')
+
+    def rollback(self):
+        self.log.append('ROLLBACK')
+
+    def close(self):
+        pass
+
+
+class TestTransaction(unittest.TestCase):
+    def setUp(self):
+        self.connections = []
+
+        def factory():
+            connection = FakeConnection()
+            self.connections.append(connection)
+            return connection
+
+        self.errors = []
+        self.db = DatabaseConnection()
+        self.db.error_reporter = lambda title, message: self.errors.append(title)
+        self.db.pool = ConnectionPool(factory, size=2)
+
+    def test_single_commit(self):
+        """Тест фиксации нескольких запросов одной транзакцией"""
+        with self.db.transaction() as transaction:
+            self.db.execute_insert("INSERT a")
+            self.db.execute_update("UPDATE b")
+        self.assertTrue(transaction.committed)
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(self.connections[0].log, ['BEGIN', 'INSERT a', 'UPDATE b', 'COMMIT'])
+        self.assertEqual(self.db.pool.idle, 1)
+
+    def test_failed_statement_rolls_back(self):
+        """Тест отката при ошибке запроса внутри блока"""
+        with self.db.transaction() as transaction:
+            self.db.execute_update("UPDATE a")
+            self.assertFalse(self.db.execute_update("FAIL"))
+        self.assertFalse(transaction.committed)
+        self.assertEqual(self.connections[0].log, ['BEGIN', 'UPDATE a', 'ROLLBACK'])
+
+    def test_exception_rolls_back(self):
+        """Тест отката при исключении"""
+        with self.assertRaises(RuntimeError):
+            with self.db.transaction():
+                self.db.execute_update("UPDATE a")
+                raise RuntimeError()
+        self.assertEqual(self.connections[0].log[-1], 'ROLLBACK')
+        self.assertIsNone(self.db.current_transaction)
+
+    def test_nested_savepoint(self):
+        """Тест отката вложенного блока до точки сохранения"""
+        with self.db.transaction() as outer:
+            self.db.execute_update("UPDATE a")
+            with self.db.transaction() as inner:
+                self.db.execute_update("FAIL")
+            self.db.execute_update("UPDATE b")
+        self.assertFalse(inner.committed)
+        self.assertTrue(outer.committed)
+        self.assertEqual(self.connections[0].log, [
+            'BEGIN', 'UPDATE a', 'SAVEPOINT sp_1', 'ROLLBACK TO SAVEPOINT sp_1',
+            'UPDATE b', 'COMMIT'
+        ])
+
+    def test_on_commit_runs_after_commit(self):
+        """Тест вызова функций только после фиксации"""
+        calls = []
+        with self.db.transaction():
+            self.db.on_commit(lambda: calls.append('done'))
+            self.assertEqual(calls, [])
+        self.assertEqual(calls, ['done'])
+
+        with self.db.transaction() as transaction:
+            self.db.on_commit(lambda: calls.append('skipped'))
+            transaction.set_rollback_only()
+        self.assertEqual(calls, ['done'])
+
+    def test_begin_error_reported(self):
+        """Тест сообщения об ошибке открытия транзакции"""
+        connection = FakeConnection()
+        connection.start_transaction = lambda: connection.cursor().execute("FAIL")
+        self.db.pool = ConnectionPool(lambda: connection, size=1)
+        with self.assertRaises(DatabaseError):
+            with self.db.transaction():
+                self.fail("блок не должен выполняться")
+        self.assertEqual(self.errors, ["Ошибка транзакции"])
+        self.assertIsNone(self.db.current_transaction)
+
+    def test_savepoint_error_reported(self):
+        """Тест сообщения об ошибке точки сохранения и отката внешнего блока"""
+        with self.db.transaction() as outer:
+            self.db.execute_update("UPDATE a")
+            self.connections[0].cursor = lambda dictionary=False: FakeCursor(FakeConnection(), fail=True)
+            with self.assertRaises(DatabaseError):
+                with self.db.transaction():
+                    self.fail("блок не должен выполняться")
+            self.assertIs(self.db.current_transaction, outer)
+        self.assertFalse(outer.committed)
+        self.assertEqual(self.errors, ["Ошибка транзакции"])
+
+
+class TestErrorReporting(unittest.TestCase):
+    def setUp(self):
+        self.db = DatabaseConnection()
+        self.db.pool = ConnectionPool(FakeConnection, size=1)
+
+    def test_default_reporter_logs(self):
+        """Тест: без интерфейса ошибки пишутся в журнал"""
+        with self.assertLogs('partner_orders.db', level='ERROR'):
+            self.assertIsNone(self.db.execute_query("FAIL"))
+
+    def test_raise_errors(self):
+        """Тест режима выброса исключений для пакетных заданий"""
+        self.db.raise_errors = True
+        with self.assertRaises(DatabaseError) as context:
+            self.db.execute_update("FAIL")
+        self.assertEqual(context.exception.title, "Ошибка обновления")
+        self.assertIsInstance(context.exception.__cause__, Error)
+
+    def test_raise_errors_on_begin(self):
+        """Тест выброса DatabaseError при ошибке открытия транзакции"""
+        self.db.raise_errors = True
+        self.db.error_reporter = lambda title, message: self.fail(message)
+        # Закрытый пул не выдает соединений (PoolError)
+        self.db.pool.close_all()
+        with self.assertRaises(DatabaseError) as context:
+            with self.db.transaction():
+                pass
+        self.assertEqual(context.exception.title, "Ошибка транзакции")
+        self.assertIsInstance(context.exception.__cause__, PoolError)
+
+
+if __name__ == '__main__':
+    unittest.main()
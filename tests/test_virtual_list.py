@@ -0,0 +1,221 @@
+import unittest
+from views.virtual_list import VirtualCardList, VirtualTreeview, reconcile, visible_range
+
+
+class TestVisibleRange(unittest.TestCase):
+    def test_top_of_list(self):
+        """Тест диапазона в начале списка"""
+        self.assertEqual(visible_range(0, 400, 100, 1000, overscan=2), (0, 7))
+
+    def test_scrolled(self):
+        """Тест диапазона после прокрутки"""
+        self.assertEqual(visible_range(1050, 400, 100, 1000, overscan=1), (9, 16))
+
+    def test_end_of_list(self):
+        """Тест ограничения диапазона количеством строк"""
+        self.assertEqual(visible_range(900, 400, 100, 10, overscan=2), (7, 10))
+
+    def test_empty(self):
+        """Тест пустого списка"""
+        self.assertEqual(visible_range(0, 400, 100, 0), (0, 0))
+
+
+class FakeCanvas:
+    """Canvas без дисплея: в видимую область попадают четыре карточки"""
+    def __init__(self):
+        self.windows = {}
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def configure(self, **kwargs):
+        pass
+
+    def canvasy(self, y):
+        return y
+
+    def winfo_height(self):
+        return 300
+
+    def create_window(self, x, y, window, **kwargs):
+        window_id = len(self.windows) + 1
+        self.windows[window_id] = y
+        return window_id
+
+    def coords(self, window_id, x, y):
+        self.windows[window_id] = y
+
+    def itemconfigure(self, window_id, **kwargs):
+        pass
+
+
+class TestReconcile(unittest.TestCase):
+    def test_changes(self):
+        """Тест сверки наборов строк по ключу"""
+        old = [{'id': 3, 'cost': 1}, {'id': 2, 'cost': 1}, {'id': 1, 'cost': 1}]
+        new = [{'id': 4, 'cost': 1}, {'id': 3, 'cost': 5}, {'id': 1, 'cost': 1}]
+        changes = reconcile(old, new, lambda row: row['id'])
+        self.assertEqual(changes['added'], [4])
+        self.assertEqual(changes['removed'], [2])
+        self.assertEqual(changes['changed'], [3])
+        self.assertEqual(changes['positions'], {4: 0, 3: 1, 1: 2})
+
+
+class TestVirtualCardList(unittest.TestCase):
+    def setUp(self):
+        self.created = []
+        self.updated = []
+        self.card_list = VirtualCardList(
+            FakeCanvas(),
+            create_card=lambda parent, row: self.created.append(row['id']) or {'row': row},
+            update_card=lambda card, row: self.updated.append(row['id']) or card.update(row=row),
+            item_width=800, item_height=90, overscan=0,
+            row_key=lambda row: row['id']
+        )
+        self.rows = [{'id': i, 'cost': 0} for i in range(10, 0, -1)]
+        self.card_list.set_rows(self.rows)
+
+    def test_single_change(self):
+        """Тест перерисовки только изменившейся карточки"""
+        rows = [dict(row) for row in self.rows]
+        rows[1]['cost'] = 100
+        self.created.clear()
+        changes = self.card_list.set_rows(rows)
+
+        self.assertEqual(changes['changed'], [9])
+        self.assertEqual(self.updated, [9])
+        self.assertEqual(self.created, [])
+
+    def test_insert_shifts_cards(self):
+        """Тест сдвига карточек при добавлении заявки в начало списка"""
+        self.created.clear()
+        self.card_list.set_rows([{'id': 11, 'cost': 0}] + self.rows)
+
+        # Новая карточка создается или берется из свободных, остальные только сдвигаются
+        self.assertEqual(self.created + self.updated, [11])
+        shown = {index: card['row']['id'] for index, (card, _) in self.card_list._active.items()}
+        self.assertEqual(shown, {0: 11, 1: 10, 2: 9, 3: 8})
+
+
+class FakeTree:
+    """Treeview без дисплея: хранит порядок строк и считает вставки"""
+    def __init__(self, height=3):
+        self.height = height
+        self.children = []
+        self.values = {}
+        self.inserted = []
+        self.selected = ()
+
+    def cget(self, option):
+        return self.height
+
+    def configure(self, **kwargs):
+        pass
+
+    def bind(self, *args, **kwargs):
+        pass
+
+    def insert(self, parent, index, iid, values, tags=()):
+        self.children.insert(index, iid)
+        self.values[iid] = values
+        self.inserted.append(iid)
+
+    def delete(self, *iids):
+        for iid in iids:
+            self.children.remove(iid)
+            del self.values[iid]
+        self.selected = tuple(iid for iid in self.selected if iid not in iids)
+
+    def move(self, iid, parent, index):
+        self.children.remove(iid)
+        self.children.insert(index, iid)
+
+    def item(self, iid, values, tags=()):
+        self.values[iid] = values
+
+    def selection(self):
+        return self.selected
+
+    def selection_set(self, iid):
+        self.selected = (iid,)
+
+    def focus(self, iid):
+        pass
+
+
+class FakeScrollbar:
+    def configure(self, **kwargs):
+        pass
+
+    def set(self, first, last):
+        self.position = (first, last)
+
+
+class TestVirtualTreeview(unittest.TestCase):
+    def setUp(self):
+        self.tree = FakeTree(height=3)
+        self.scrollbar = FakeScrollbar()
+        self.table = VirtualTreeview(
+            self.tree, self.scrollbar,
+            row_key=lambda row: row['id'],
+            row_options=lambda row: {'values': (row['name'], row['cost'])},
+            sort_key=lambda row: (row['name'], row['id']),
+            overscan=0
+        )
+        self.table.set_rows({'id': i, 'name': f"Продукт {i:04d}", 'cost': i} for i in range(1000))
+
+    def test_only_visible_rows_inserted(self):
+        """Тест вставки в Treeview только видимых строк"""
+        self.assertEqual(self.tree.children, ['0', '1', '2'])
+        self.assertEqual(self.tree.inserted, ['0', '1', '2'])
+        self.assertEqual(self.scrollbar.position, (0.0, 0.003))
+
+    def test_scroll(self):
+        """Тест сдвига окна при прокрутке"""
+        self.table.scroll(2)
+        self.assertEqual(self.tree.children, ['2', '3', '4'])
+        self.assertEqual(self.tree.inserted, ['0', '1', '2', '3', '4'])
+
+        self.table.yview('moveto', '0.5')
+        self.assertEqual(self.tree.children, ['500', '501', '502'])
+        self.table.yview('scroll', '1', 'pages')
+        self.assertEqual(self.tree.children, ['503', '504', '505'])
+        self.table.yview('moveto', '1.0')
+        self.assertEqual(self.tree.children, ['997', '998', '999'])
+
+    def test_patches(self):
+        """Тест вставки, изменения и удаления отдельных строк"""
+        self.tree.inserted.clear()
+        self.table.put({'id': 5000, 'name': 'Продукт 0000а', 'cost': 7})
+        self.assertEqual(self.tree.children, ['0', '5000', '1'])
+        self.assertEqual(self.tree.inserted, ['5000'])
+
+        self.table.put({'id': 1, 'name': 'Продукт 0001', 'cost': 100})
+        self.assertEqual(self.tree.values['1'], ('Продукт 0001', 100))
+
+        self.table.remove(0)
+        self.assertEqual(self.tree.children, ['5000', '1', '2'])
+
+        # Строки вне окна меняют только данные
+        self.tree.inserted.clear()
+        self.table.put({'id': 700, 'name': 'Продукт 0700', 'cost': 1})
+        self.table.remove(800)
+        self.assertEqual(self.tree.inserted, [])
+        self.assertEqual(len(self.table), 999)
+        self.assertEqual(self.table.get(700)['cost'], 1)
+
+    def test_selection_survives_scroll(self):
+        """Тест сохранения выбранной строки при уходе из окна"""
+        self.tree.selection_set('1')
+        self.table._on_select()
+        self.table.scroll(10)
+        self.table._on_select()
+        self.assertEqual(self.table.selected, 1)
+
+        self.table.see(1)
+        self.assertEqual(self.tree.children, ['1', '2', '3'])
+        self.assertEqual(self.tree.selection(), ('1',))
+
+        self.table._move_selection(3)
+        self.assertEqual(self.table.selected, 4)
+        self.assertEqual(self.tree.children, ['2', '3', '4'])
@@ -0,0 +1,125 @@
+"""Кэш миниатюр логотипов партнеров"""
+import io
+import os
+from collections import OrderedDict
+
+from PIL import Image, ImageTk
+
+
+# Каталог дискового кэша по умолчанию
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.cache', 'partner_orders', 'logos')
+
+
+class LogoCache:
+    """Кэш миниатюр логотипов
+
+    Миниатюры хранятся в двух уровнях: в памяти (LRU из готовых
+    ``ImageTk.PhotoImage``) и на диске (уменьшенные PNG). Ключ кэша —
+    идентификатор партнера и хэш содержимого логотипа, поэтому после смены
+    логотипа старая миниатюра просто перестает использоваться. Исходный
+    логотип запрашивается из БД только при промахе обоих уровней.
+    Логотипы, которые не удалось прочитать, запоминаются и повторно из БД
+    не запрашиваются, пока не изменится их хэш. Ошибка самой загрузки из БД
+    не запоминается: ``load_logo`` выбрасывает исключение, и логотип
+    запрашивается снова при следующем обращении.
+    """
+    def __init__(self, load_logo, cache_dir=DEFAULT_CACHE_DIR, size=(50, 50), max_items=256):
+        self.load_logo = load_logo  # (partner_id) -> bytes или None; ошибка БД - исключение
+        self.cache_dir = cache_dir
+        self.size = size
+        self.max_items = max_items
+        self._photos = OrderedDict()
+        self._broken = set()  # (partner_id, logo_hash) поврежденных логотипов
+
+    def get(self, partner_id, logo_hash):
+        """
+        Получение миниатюры логотипа для отображения в Tk
+
+        Args:
+            partner_id: идентификатор партнера
+            logo_hash: хэш содержимого логотипа (None, если логотипа нет)
+
+        Returns:
+            ImageTk.PhotoImage или None, если логотипа нет или он поврежден
+        """
+        if not logo_hash or self.is_broken(partner_id, logo_hash):
+            return None
+
+        photo = self.peek(partner_id, logo_hash)
+        if photo is not None:
+            return photo
+
+        image = self.get_thumbnail(partner_id, logo_hash)
+        if image is None:
+            return None
+        return self.add(partner_id, logo_hash, image)
+
+    def peek(self, partner_id, logo_hash):
+        """Получение миниатюры только из кэша в памяти (без обращения к диску и БД)"""
+        key = (partner_id, logo_hash)
+        photo = self._photos.get(key)
+        if photo is not None:
+            self._photos.move_to_end(key)
+        return photo
+
+    def is_broken(self, partner_id, logo_hash):
+        """Логотип уже не удалось прочитать (миниатюры для него нет)"""
+        return (partner_id, logo_hash) in self._broken
+
+    def add(self, partner_id, logo_hash, image):
+        """Помещение готовой миниатюры в кэш в памяти (вызывается в потоке Tk)"""
+        photo = ImageTk.PhotoImage(image)
+        self._photos[(partner_id, logo_hash)] = photo
+        if len(self._photos) > self.max_items:
+            self._photos.popitem(last=False)
+        return photo
+
+    def get_thumbnail(self, partner_id, logo_hash):
+        """Получение уменьшенного изображения из дискового кэша или из БД
+
+        Не использует Tk, поэтому может вызываться из фонового потока.
+        Исключение ``load_logo`` (ошибка БД) передается вызывающему.
+        """
+        path = self._thumbnail_path(partner_id, logo_hash)
+        try:
+            with Image.open(path) as cached:
+                cached.load()
+                return cached.copy()
+        except (OSError, ValueError):
+            pass
+
+        if self.is_broken(partner_id, logo_hash):
+            return None
+        logo_data = self.load_logo(partner_id)
+        if not logo_data:
+            self._broken.add((partner_id, logo_hash))
+            return None
+        try:
+            image = Image.open(io.BytesIO(logo_data))
+            image = image.resize(self.size, Image.Resampling.LANCZOS)
+        except (OSError, ValueError):
+            self._broken.add((partner_id, logo_hash))
+            return None
+
+        self._save_thumbnail(image, path)
+        return image
+
+    def clear(self):
+        """Очистка кэша в памяти"""
+        self._photos.clear()
+        self._broken.clear()
+
+    def _thumbnail_path(self, partner_id, logo_hash):
+        """Путь к миниатюре в дисковом кэше"""
+        width, height = self.size
+        return os.path.join(self.cache_dir, f"{partner_id}_{logo_hash}_{width}x{height}.png")
+
+    def _save_thumbnail(self, image, path):
+        """Сохранение миниатюры на диск (ошибки записи не критичны)"""
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            image.save(temp_path, format='PNG')
+            os.replace(temp_path, path)
+        except (OSError, ValueError):
+            pass
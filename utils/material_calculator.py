@@ -1,6 +1,8 @@
 """Модуль для расчета необходимого количества материалов"""
 from decimal import Decimal, ROUND_UP
 
+from models.reference_data import get_coefficient_tables
+
 
 class MaterialCalculator:
     """Класс для расчета материалов"""
@@ -20,10 +22,58 @@ class MaterialCalculator:
             param2: второй параметр продукции
             db_connection: подключение к БД для получения коэффициентов
             
+        Returns:
+            int: количество необходимого материала или -1 при ошибке
+        """
+        # Коэффициенты берутся из кэша справочников, а не запрашиваются при каждом вызове
+        product_coefficients, material_defects = get_coefficient_tables(db_connection)
+        return MaterialCalculator.calculate_with_tables(
+            (product_type_id, material_type_id, required_quantity,
+             stock_quantity, param1, param2),
+            product_coefficients, material_defects
+        )
+    
+    @staticmethod
+    def calculate_material_amounts(rows, db_connection):
+        """
+        Пакетный расчет количества материала для набора позиций
+        
+        Коэффициенты типов продукции и проценты брака загружаются один раз
+        для всего набора (из кэша справочников), а не для каждой позиции.
+        
+        Args:
+            rows: итерируемый набор кортежей (product_type_id, material_type_id,
+                  required_quantity, stock_quantity, param1, param2)
+            db_connection: подключение к БД для получения коэффициентов
+            
+        Returns:
+            list: количество материала для каждой позиции в порядке входных данных
+                  (-1 для позиций с ошибкой)
+        """
+        product_coefficients, material_defects = get_coefficient_tables(db_connection)
+        return [
+            MaterialCalculator.calculate_with_tables(row, product_coefficients, material_defects)
+            for row in rows
+        ]
+    
+    @staticmethod
+    def calculate_with_tables(row, product_coefficients, material_defects):
+        """
+        Расчет одной позиции по заранее загруженным коэффициентам
+        
+        Args:
+            row: кортеж (product_type_id, material_type_id, required_quantity,
+                 stock_quantity, param1, param2)
+            product_coefficients: словарь id типа продукции -> коэффициент (Decimal)
+            material_defects: словарь id типа материала -> процент брака (Decimal)
+        
         Returns:
             int: количество необходимого материала или -1 при ошибке
         """
         try:
+            (product_type_id, material_type_id, required_quantity,
+             stock_quantity, param1, param2) = row
+            
             # Валидация входных данных
             if any(x < 0 for x in [required_quantity, stock_quantity]):
                 return -1
@@ -31,46 +81,44 @@ class MaterialCalculator:
             if param1 <= 0 or param2 <= 0:
                 return -1
             
-            # Получаем коэффициент типа продукции
-            query = "SELECT coefficient FROM product_types WHERE id = %s"
-            result = db_connection.execute_query(query, (product_type_id,))
-            if not result:
+            # Проверка существования типов
+            if product_type_id not in product_coefficients:
                 return -1
-            product_coefficient = Decimal(str(result[0]['coefficient']))
-            
-            # Получаем процент брака материала
-            query = "SELECT defect_percentage FROM material_types WHERE id = %s"
-            result = db_connection.execute_query(query, (material_type_id,))
-            if not result:
+            if material_type_id not in material_defects:
                 return -1
-            defect_percentage = Decimal(str(result[0]['defect_percentage']))
-            
-            # Вычисляем количество продукции для производства (с учетом склада)
-            quantity_to_produce = max(0, required_quantity - stock_quantity)
-            
-            if quantity_to_produce == 0:
-                return 0
-            
-            # Вычисляем количество материала на единицу продукции
-            param1_decimal = Decimal(str(param1))
-            param2_decimal = Decimal(str(param2))
-            material_per_unit = param1_decimal * param2_decimal * product_coefficient
-            
-            # Вычисляем базовое количество материала
-            base_material = material_per_unit * Decimal(str(quantity_to_produce))
-            
-            # Учитываем процент брака (увеличиваем количество)
-            # Формула: необходимое_количество = базовое_количество / (1 - процент_брака)
-            material_with_defect = base_material / (Decimal('1') - defect_percentage)
             
-            # Округляем вверх до целого числа
-            result = int(material_with_defect.quantize(Decimal('1'), rounding=ROUND_UP))
-            
-            return result
-            
-        except Exception as e:
-            # В случае любой ошибки возвращаем -1
+            return MaterialCalculator._calculate(
+                product_coefficients[product_type_id], material_defects[material_type_id],
+                required_quantity, stock_quantity, param1, param2
+            )
+        
+        except Exception:
             return -1
+    
+    @staticmethod
+    def _calculate(product_coefficient, defect_percentage, required_quantity,
+                   stock_quantity, param1, param2):
+        """Расчет по известным коэффициентам (входные данные уже проверены)"""
+        # Вычисляем количество продукции для производства (с учетом склада)
+        quantity_to_produce = max(0, required_quantity - stock_quantity)
+        
+        if quantity_to_produce == 0:
+            return 0
+        
+        # Вычисляем количество материала на единицу продукции
+        param1_decimal = Decimal(str(param1))
+        param2_decimal = Decimal(str(param2))
+        material_per_unit = param1_decimal * param2_decimal * product_coefficient
+        
+        # Вычисляем базовое количество материала
+        base_material = material_per_unit * Decimal(str(quantity_to_produce))
+        
+        # Учитываем процент брака (увеличиваем количество)
+        # Формула: необходимое_количество = базовое_количество / (1 - процент_брака)
+        material_with_defect = base_material / (Decimal('1') - defect_percentage)
+        
+        # Округляем вверх до целого числа
+        return int(material_with_defect.quantize(Decimal('1'), rounding=ROUND_UP))
 
 
 def calculate_material_amount(product_type_id, material_type_id, required_quantity, 
@@ -79,10 +127,20 @@ def calculate_material_amount(product_type_id, material_type_id, required_quanti
     Функция-обертка для расчета материалов
     
     Метод рассчитывает целое количество материала, необходимого для производства 
-    требуемого количества продукции, учитывая наличие продукции на складе и 
+    требуемого количества продукции, учитывая наличие продукции на складе и
     возможный брак материала.
     """
     return MaterialCalculator.calculate_material_amount(
         product_type_id, material_type_id, required_quantity, 
         stock_quantity, param1, param2, db_connection
     )
+
+
+def calculate_material_amounts(rows, db_connection):
+    """
+    Функция-обертка для пакетного расчета материалов
+    
+    Принимает набор позиций (product_type_id, material_type_id, required_quantity,
+    stock_quantity, param1, param2) и возвращает список результатов в том же порядке.
+    """
+    return MaterialCalculator.calculate_material_amounts(rows, db_connection)
@@ -0,0 +1,145 @@
+"""Параллельный расчет количества материалов в пуле процессов"""
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.material_calculator import MaterialCalculator
+
+
+class ParallelMaterialCalculator:
+    """Расчет больших наборов позиций в нескольких процессах
+
+    Набор делится на порции по ``chunk_size`` позиций, которые считаются
+    в ``ProcessPoolExecutor`` тем же точным расчетом на Decimal, что и
+    ``MaterialCalculator.calculate_with_tables``. Таблицы коэффициентов
+    передаются каждому процессу один раз при его запуске, а не с каждой
+    порцией. Результаты возвращаются в порядке входных данных; в работе
+    одновременно не больше двух порций на процесс, поэтому поток позиций
+    любой длины обрабатывается в ограниченной памяти.
+    """
+    def __init__(self, product_coefficients, material_defects, workers=None, chunk_size=5000):
+        """
+        Args:
+            product_coefficients: словарь id типа продукции -> коэффициент (Decimal)
+            material_defects: словарь id типа материала -> процент брака (Decimal)
+            workers: количество процессов (None - по числу процессоров;
+                     0 или 1 - расчет в текущем процессе)
+            chunk_size: количество позиций в одной порции
+        """
+        self.tables = (product_coefficients, material_defects)
+        self.workers = (os.cpu_count() or 1) if workers is None else workers
+        self.chunk_size = max(1, chunk_size)
+        self._executor = None
+
+    @classmethod
+    def from_database(cls, db_connection, **kwargs):
+        """Создание расчета с коэффициентами из кэша справочников"""
+        from models.reference_data import get_coefficient_tables
+        return cls(*get_coefficient_tables(db_connection), **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self):
+        """Остановка рабочих процессов"""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def calculate(self, rows):
+        """
+        Расчет набора позиций
+
+        Args:
+            rows: итерируемый набор кортежей (product_type_id, material_type_id,
+                  required_quantity, stock_quantity, param1, param2)
+
+        Returns:
+            list: количество материала для каждой позиции в порядке входных данных
+                  (-1 для позиций с ошибкой)
+        """
+        return list(self.map(rows))
+
+    def map(self, rows):
+        """Результаты расчета по одному в порядке входных данных (генератор)"""
+        for results in self.map_chunks(chunked(rows, self.chunk_size)):
+            yield from results
+
+    def map_chunks(self, chunks):
+        """
+        Расчет готовых порций позиций
+
+        Порции из ``chunks`` забираются по мере освобождения процессов,
+        поэтому вызывающий код может читать их из файла лениво.
+
+        Returns:
+            генератор списков результатов в порядке порций
+        """
+        if self.workers <= 1:
+            for chunk in chunks:
+                yield _calculate_rows(chunk, self.tables)
+            return
+
+        executor = self._get_executor()
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_calculate_chunk, chunk))
+            if len(pending) >= self.workers * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+    def _get_executor(self):
+        """Пул процессов (запускается при первом расчете)"""
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=_init_worker, initargs=(self.tables,)
+            )
+        return self._executor
+
+
+def calculate_material_amounts_parallel(rows, db_connection, workers=None):
+    """
+    Функция-обертка для параллельного расчета материалов
+
+    Принимает набор позиций (product_type_id, material_type_id, required_quantity,
+    stock_quantity, param1, param2) и возвращает список результатов в том же порядке.
+    """
+    with ParallelMaterialCalculator.from_database(db_connection, workers=workers) as calculator:
+        return calculator.calculate(rows)
+
+
+# Таблицы коэффициентов рабочего процесса (устанавливаются при его запуске)
+_worker_tables = None
+
+
+def _init_worker(tables):
+    global _worker_tables
+    _worker_tables = tables
+
+
+def _calculate_chunk(rows):
+    return _calculate_rows(rows, _worker_tables)
+
+
+def _calculate_rows(rows, tables):
+    product_coefficients, material_defects = tables
+    return [
+        MaterialCalculator.calculate_with_tables(row, product_coefficients, material_defects)
+        for row in rows
+    ]
+
+
+def chunked(iterable, size):
+    """Разбиение потока на списки не длиннее size"""
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
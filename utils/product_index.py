@@ -0,0 +1,255 @@
+"""Поисковый индекс каталога продукции для подбора по мере ввода"""
+import bisect
+import heapq
+import itertools
+import re
+import threading
+
+
+# Латинские буквы, которые пишутся так же, как кириллические: в наименованиях
+# размеры записываются как "600х300" (кириллическая "х"), а пользователь
+# может ввести латинскую "x". Латиница приводится к кириллице, чтобы
+# наименования сохраняли алфавитный порядок
+_HOMOGLYPHS = str.maketrans('aeopcxykё', 'аеорсхуке')
+_SEPARATORS = re.compile(r'[^\w]+')
+
+# Длина n-граммы наименования
+NGRAM = 3
+
+
+def normalize(text):
+    """Приведение строки к виду для поиска: регистр, "ё", похожие буквы, разделители"""
+    text = str(text or '').casefold().translate(_HOMOGLYPHS)
+    return _SEPARATORS.sub(' ', text).strip()
+
+
+def tokenize(text):
+    """Слова нормализованной строки"""
+    return normalize(text).split()
+
+
+class ProductIndex:
+    """Индекс продукции для поиска по артикулу и наименованию
+
+    Артикулы хранятся в префиксном дереве, наименования - в индексе
+    n-грамм слов (для коротких слов запроса - в индексе начал слов) и в
+    списке, упорядоченном по наименованию. Поиск находит продукцию, у
+    которой каждое слово запроса входит в наименование, или артикул
+    начинается с запроса, и возвращает не больше ``limit`` лучших
+    совпадений. Для частых слов вместо полного множества совпадений
+    просматривается начало упорядоченного списка, поэтому время поиска
+    почти не зависит от размера каталога.
+    """
+    def __init__(self, products=()):
+        self._products = {}   # id -> продукция
+        self._names = {}      # id -> нормализованное наименование
+        self._articles = {}   # id -> нормализованный артикул
+        self._exact = {}      # нормализованный артикул -> множество id
+        self._trie = {}       # символ -> узел; в узле под ключом None - id продукции с этим префиксом
+        self._grams = {}      # n-грамма -> множество id
+        self._prefixes = {}   # начало слова короче n-граммы -> множество id
+        self._order = []      # (наименование, id) по возрастанию
+        self._lock = threading.RLock()
+        for product in products:
+            self._index(product)
+        self._order.sort()
+
+    def __len__(self):
+        return len(self._products)
+
+    def add(self, product):
+        """Добавление продукции (словарь с id, product_name и article) или ее замена"""
+        with self._lock:
+            self.remove(product['id'])
+            entry = self._index(product)
+            # _index добавил запись в конец списка: переносим ее на место
+            self._order.pop()
+            bisect.insort(self._order, entry)
+
+    def remove(self, product_id):
+        """Удаление продукции из индекса"""
+        with self._lock:
+            product = self._products.pop(product_id, None)
+            if product is None:
+                return
+            name = self._names.pop(product_id)
+            article = self._articles.pop(product_id)
+
+            position = bisect.bisect_left(self._order, (name, product_id))
+            del self._order[position]
+
+            _discard(self._exact, article, product_id)
+            node = self._trie
+            for char in article:
+                node = node.get(char)
+                if node is None:
+                    break
+                node[None].discard(product_id)
+
+            prefixes, grams = _name_keys(name)
+            for key in prefixes:
+                _discard(self._prefixes, key, product_id)
+            for key in grams:
+                _discard(self._grams, key, product_id)
+
+    def search(self, query, limit=20):
+        """
+        Поиск продукции по мере ввода
+
+        Args:
+            query: строка запроса (начало артикула или слова наименования)
+            limit: наибольшее количество результатов
+
+        Returns:
+            list: продукция в порядке релевантности: точное совпадение
+                  артикула, начало артикула, наименование, начинающееся
+                  с запроса, остальные совпадения (внутри групп - по алфавиту)
+        """
+        normalized = normalize(query)
+        if not normalized or limit <= 0:
+            return []
+        article = normalized.replace(' ', '')
+        tokens = normalized.split()
+        with self._lock:
+            found = []
+            seen = set()
+
+            def extend(ids):
+                for product_id in ids:
+                    if len(found) >= limit:
+                        return
+                    if product_id not in seen:
+                        seen.add(product_id)
+                        found.append(product_id)
+
+            extend(self._first(self._exact.get(article, ()), limit))
+            extend(self._first(self._article_node(article), limit + len(seen)))
+            extend(self._name_prefix_matches(normalized, limit))
+            if len(found) < limit:
+                extend(self._name_matches(tokens, limit + len(seen)))
+            return [self._products[product_id] for product_id in found]
+
+    def _index(self, product):
+        """Добавление продукции во все индексы, кроме места в упорядоченном списке"""
+        product_id = product['id']
+        name = normalize(product['product_name'])
+        article = _article_key(product['article'])
+        self._products[product_id] = product
+        self._names[product_id] = name
+        self._articles[product_id] = article
+        entry = (name, product_id)
+        self._order.append(entry)
+
+        self._exact.setdefault(article, set()).add(product_id)
+        node = self._trie
+        for char in article:
+            node = node.setdefault(char, {})
+            node.setdefault(None, set()).add(product_id)
+
+        prefixes, grams = _name_keys(name)
+        for key in prefixes:
+            self._prefixes.setdefault(key, set()).add(product_id)
+        for key in grams:
+            self._grams.setdefault(key, set()).add(product_id)
+        return entry
+
+    def _article_node(self, prefix):
+        """id продукции, артикул которой начинается с prefix (множество индекса, не копия)"""
+        node = self._trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return set()
+        return node.get(None, set())
+
+    def _first(self, ids, count, accept=None):
+        """
+        Первые по наименованию count id из множества ids
+
+        Маленькое множество упорядочивается целиком, для большого
+        просматривается начало общего упорядоченного списка: выбирается
+        то, что дешевле.
+        """
+        if not ids:
+            return []
+        if len(ids) * len(ids) <= count * len(self._order):
+            if accept is None:
+                return heapq.nsmallest(count, ids, key=lambda i: (self._names[i], i))
+            entries = sorted((self._names[i], i) for i in ids)
+        else:
+            entries = self._order
+        result = []
+        for name, product_id in entries:
+            if product_id in ids and (accept is None or accept(name)):
+                result.append(product_id)
+                if len(result) >= count:
+                    break
+        return result
+
+    def _name_prefix_matches(self, normalized, count):
+        """Первые count id продукции, наименование которой начинается с запроса"""
+        result = []
+        position = bisect.bisect_left(self._order, (normalized,))
+        for name, product_id in itertools.islice(self._order, position, position + count):
+            if not name.startswith(normalized):
+                break
+            result.append(product_id)
+        return result
+
+    def _name_matches(self, tokens, count):
+        """Первые count id продукции, наименование которой содержит все слова запроса"""
+        # Для каждого слова берется самое маленькое множество его ключей,
+        # множества слов пересекаются, а точное вхождение слов проверяется
+        # по самому наименованию
+        per_token = []
+        for token in tokens:
+            if len(token) < NGRAM:
+                keys = [(self._prefixes, token)]
+            else:
+                keys = [(self._grams, token[i:i + NGRAM]) for i in range(len(token) - NGRAM + 1)]
+            sets = [index.get(key) for index, key in keys]
+            if not all(sets):
+                return []
+            per_token.append(min(sets, key=len))
+        per_token.sort(key=len)
+
+        def accept(name):
+            padded = ' ' + name
+            # Короткое слово запроса ищется в начале слова, длинное - в любом месте
+            return all(
+                (' ' + token if len(token) < NGRAM else token) in padded
+                for token in tokens
+            )
+
+        candidates = per_token[0]
+        for ids in per_token[1:]:
+            candidates = candidates & ids
+            if not candidates:
+                return []
+        return self._first(candidates, count, accept)
+
+
+def _article_key(article):
+    """Нормализованный артикул без разделителей"""
+    return normalize(article).replace(' ', '')
+
+
+def _name_keys(name):
+    """Ключи индекса наименования: короткие начала слов и n-граммы слов"""
+    prefixes = set()
+    grams = set()
+    for token in name.split():
+        for length in range(1, min(len(token), NGRAM - 1) + 1):
+            prefixes.add(token[:length])
+        for i in range(len(token) - NGRAM + 1):
+            grams.add(token[i:i + NGRAM])
+    return prefixes, grams
+
+
+def _discard(index, key, product_id):
+    """Удаление id из множества индекса (пустое множество удаляется)"""
+    ids = index.get(key)
+    if ids is not None:
+        ids.discard(product_id)
+        if not ids:
+            del index[key]
@@ -0,0 +1,151 @@
+"""Выполнение запросов к базе данных вне потока интерфейса"""
+import queue
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class Task:
+    """Фоновая задача"""
+    def __init__(self, key=None, owner=None, on_success=None, on_error=None):
+        self.key = key
+        self.owner = owner
+        self.on_success = on_success
+        self.on_error = on_error
+        self.future = None
+        self.cancelled = False
+
+    def cancel(self):
+        """Отмена задачи: если она уже выполняется, ее результат будет отброшен"""
+        self.cancelled = True
+        if self.future is not None:
+            self.future.cancel()
+
+
+class TaskExecutor:
+    """Пул потоков для обращений к БД с доставкой результатов в поток Tk
+
+    Функции выполняются в рабочих потоках (каждый запрос берет собственное
+    соединение из пула ``DatabaseConnection``), а обработчики результатов
+    вызываются в главном потоке через периодический опрос ``root.after``.
+    Задачи с одинаковым ключом вытесняют друг друга: при повторной загрузке
+    результат предыдущей, уже устаревшей, загрузки не доставляется.
+    """
+    def __init__(self, root, max_workers=4, poll_interval=50):
+        self.root = root
+        self.poll_interval = poll_interval
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db-task')
+        self._results = queue.Queue()
+        self._latest = {}  # ключ -> последняя задача с этим ключом
+        self._lock = threading.Lock()
+        self._after_id = None
+        self._closed = False
+        self._schedule_poll()
+
+    def submit(self, func, *args, on_success=None, on_error=None, key=None, owner=None, **kwargs):
+        """
+        Запуск функции в фоновом потоке
+
+        Args:
+            func: функция, выполняемая в фоне (например, метод модели)
+            on_success: обработчик результата, вызывается в потоке Tk
+            on_error: обработчик исключения, вызывается в потоке Tk
+            key: ключ задачи; новая задача с тем же ключом отменяет предыдущую
+            owner: виджет-владелец; если он уничтожен, результат не доставляется
+
+        Returns:
+            Task: дескриптор задачи
+        """
+        task = Task(key, owner, on_success, on_error)
+        if key is not None:
+            with self._lock:
+                previous = self._latest.get(key)
+                self._latest[key] = task
+            if previous is not None:
+                previous.cancel()
+
+        task.future = self._pool.submit(self._run, task, func, args, kwargs)
+        return task
+
+    def cancel(self, key):
+        """Отмена задачи с заданным ключом"""
+        with self._lock:
+            task = self._latest.pop(key, None)
+        if task is not None:
+            task.cancel()
+
+    def post(self, callback, *args):
+        """Вызов функции в потоке Tk (можно вызывать из любого потока)"""
+        self._results.put((callback, args))
+
+    def shutdown(self):
+        """Остановка пула и опроса результатов"""
+        self._closed = True
+        if self._after_id is not None:
+            try:
+                self.root.after_cancel(self._after_id)
+            except Exception:
+                pass
+            self._after_id = None
+        self._pool.shutdown(wait=False)
+
+    def _run(self, task, func, args, kwargs):
+        """Выполнение задачи в рабочем потоке"""
+        if task.cancelled:
+            return
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.post(self._deliver_error, task, sys.exc_info())
+        else:
+            self.post(self._deliver_result, task, result)
+
+    def _is_stale(self, task):
+        """Проверка, что результат задачи больше никому не нужен"""
+        if task.cancelled:
+            return True
+        if task.key is not None:
+            with self._lock:
+                if self._latest.get(task.key) is task:
+                    del self._latest[task.key]
+        owner = task.owner
+        if owner is not None:
+            try:
+                return not owner.winfo_exists()
+            except Exception:
+                return True
+        return False
+
+    def _deliver_result(self, task, result):
+        """Передача результата обработчику (поток Tk)"""
+        if not self._is_stale(task) and task.on_success:
+            task.on_success(result)
+
+    def _deliver_error(self, task, exc_info):
+        """Передача исключения обработчику (поток Tk)"""
+        if self._is_stale(task):
+            return
+        if task.on_error:
+            task.on_error(exc_info[1])
+        else:
+            self.root.report_callback_exception(*exc_info)
+
+    def _schedule_poll(self):
+        """Планирование очередного опроса очереди результатов"""
+        if not self._closed:
+            self._after_id = self.root.after(self.poll_interval, self._poll)
+
+    def _poll(self):
+        """Обработка накопившихся результатов в потоке Tk"""
+        try:
+            while True:
+                try:
+                    callback, args = self._results.get_nowait()
+                except queue.Empty:
+                    break
+                try:
+                    callback(*args)
+                except Exception:
+                    self.root.report_callback_exception(*sys.exc_info())
+        finally:
+            self._schedule_poll()
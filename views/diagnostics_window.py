@@ -0,0 +1,117 @@
+"""Окно диагностики запросов к базе данных"""
+import tkinter as tk
+from tkinter import ttk, messagebox, filedialog
+from utils.styles import AppStyles
+
+
+class DiagnosticsWindow:
+    """Окно со статистикой выполнения запросов (открывается по F12)
+
+    Запросы упорядочены по суммарному времени; большое количество
+    выполнений одного запроса из одного метода указывает на шаблон N+1.
+    """
+
+    def __init__(self, parent, instrumentation):
+        self.parent = parent
+        self.instrumentation = instrumentation
+
+        # Создание окна
+        self.window = tk.Toplevel(parent)
+        self.window.title("Диагностика запросов - Новые технологии")
+        self.window.geometry("1000x500")
+        self.window.configure(bg=AppStyles.MAIN_BG)
+        self.window.transient(parent)
+
+        # Создаем интерфейс
+        self._create_widgets()
+
+        # Загружаем данные
+        self.refresh()
+
+    def _create_widgets(self):
+        """Создание виджетов окна"""
+        # Панель инструментов
+        toolbar_frame = tk.Frame(self.window, bg=AppStyles.SECONDARY_BG)
+        toolbar_frame.pack(fill=tk.X, padx=20, pady=(20, 10))
+
+        self.summary_label = tk.Label(
+            toolbar_frame,
+            text="",
+            font=(AppStyles.MAIN_FONT, 12, 'bold'),
+            bg=AppStyles.SECONDARY_BG,
+            fg=AppStyles.TEXT_COLOR
+        )
+        self.summary_label.pack(side=tk.LEFT, padx=10, pady=8)
+
+        for text, command in (
+            ("Сохранить в JSON", self._save_json),
+            ("Сбросить", self._reset),
+            ("Обновить", self.refresh),
+        ):
+            ttk.Button(
+                toolbar_frame,
+                text=text,
+                style='Action.TButton',
+                command=command
+            ).pack(side=tk.RIGHT, padx=5, pady=5)
+
+        # Таблица запросов
+        table_frame = tk.Frame(self.window, bg=AppStyles.MAIN_BG)
+        table_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=(0, 20))
+
+        columns = ('Вызовов', 'Всего, мс', 'Среднее, мс', 'Макс., мс', 'Строк', 'Байт', 'Источник', 'Запрос')
+        self.tree = ttk.Treeview(table_frame, columns=columns, show='headings')
+        widths = (70, 90, 90, 90, 70, 90, 200, 400)
+        for col, width in zip(columns, widths):
+            self.tree.heading(col, text=col)
+            self.tree.column(col, width=width, anchor='w' if width >= 200 else 'e')
+
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
+        self.tree.configure(yscrollcommand=scrollbar.set)
+
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+    def refresh(self):
+        """Обновление таблицы по текущей статистике"""
+        snapshot = self.instrumentation.snapshot()
+        self.tree.delete(*self.tree.get_children())
+
+        for stats in snapshot['statements']:
+            callers = ', '.join(f"{name} ×{count}" for name, count in stats['callers'].items())
+            self.tree.insert('', 'end', values=(
+                stats['count'],
+                f"{stats['total_ms']:.1f}",
+                f"{stats['avg_ms']:.2f}",
+                f"{stats['max_ms']:.1f}",
+                stats['rows'],
+                stats['bytes'],
+                callers,
+                stats['statement']
+            ))
+
+        total_count = sum(stats['count'] for stats in snapshot['statements'])
+        total_ms = sum(stats['total_ms'] for stats in snapshot['statements'])
+        self.summary_label.config(
+            text=f"Запросов: {total_count}, время: {total_ms:.1f} мс (с {snapshot['started']})"
+        )
+
+    def _reset(self):
+        """Сброс накопленной статистики"""
+        self.instrumentation.reset()
+        self.refresh()
+
+    def _save_json(self):
+        """Сохранение статистики в файл JSON"""
+        path = filedialog.asksaveasfilename(
+            parent=self.window,
+            defaultextension='.json',
+            filetypes=[("JSON", "*.json")],
+            initialfile='query_stats.json'
+        )
+        if not path:
+            return
+        try:
+            self.instrumentation.dump_json(path)
+        except OSError as e:
+            messagebox.showerror("Ошибка", f"Не удалось сохранить файл:\n{str(e)}", parent=self.window)
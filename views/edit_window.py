@@ -8,11 +8,11 @@ from utils.validators import Validators
 class EditWindow:
     """Окно редактирования/добавления заявки"""
     
-    def __init__(self, parent, partner_request, request_data=None, refresh_callback=None):
+    def __init__(self, parent, partner_request, executor, request_data=None):
         self.parent = parent
         self.partner_request = partner_request
+        self.executor = executor  # Фоновое выполнение запросов к БД
         self.request_data = request_data
-        self.refresh_callback = refresh_callback  # Добавляем callback для обновления
         self.is_edit = request_data is not None
         
         # Создание окна
@@ -61,9 +61,8 @@ class EditWindow:
         self.form_frame = tk.Frame(self.window, bg=AppStyles.MAIN_BG)
         self.form_frame.pack(padx=40, pady=20, fill=tk.BOTH, expand=True)
         
-        # Получаем типы партнеров
-        partner_types = self.partner_request.partner.get_partner_types()
-        self.partner_types_dict = {pt['type_name']: pt['id'] for pt in partner_types}
+        # Типы партнеров загружаются в фоне после создания формы
+        self.partner_types_dict = {}
         
         # Создаем поля формы
         self.fields = {}
@@ -71,6 +70,19 @@ class EditWindow:
         
         # Кнопки
         self._create_buttons()
+        
+        self.executor.submit(
+            self.partner_request.partner.get_partner_types,
+            on_success=self._on_partner_types_loaded,
+            owner=self.window
+        )
+    
+    def _on_partner_types_loaded(self, partner_types):
+        """Заполнение списка типов партнеров после загрузки"""
+        self.partner_types_dict = {pt['type_name']: pt['id'] for pt in partner_types or []}
+        self.partner_type_combo['values'] = list(self.partner_types_dict.keys())
+        if not self.is_edit and self.partner_types_dict:
+            self.partner_type_combo.current(0)
     
     def _create_form_fields(self):
         """Создание полей формы"""
@@ -108,8 +120,9 @@ class EditWindow:
                 widget['values'] = values
                 if self.is_edit:
                     var.set(self.request_data.get('partner_type', ''))
-                else:
+                elif values:
                     widget.current(0)
+                self.partner_type_combo = widget
             else:
                 var = tk.StringVar()
                 widget = ttk.Entry(
@@ -137,13 +150,13 @@ class EditWindow:
         button_frame.pack(pady=(0, 20))
         
         save_text = "Сохранить" if self.is_edit else "Создать"
-        save_button = ttk.Button(
+        self.save_button = ttk.Button(
             button_frame,
             text=save_text,
             style='Action.TButton',
             command=self._save
         )
-        save_button.pack(side=tk.LEFT, padx=5)
+        self.save_button.pack(side=tk.LEFT, padx=5)
         
         cancel_button = ttk.Button(
             button_frame,
@@ -167,6 +180,9 @@ class EditWindow:
         if not self.fields['legal_address'].get().strip():
             errors.append("Адрес не может быть пустым")
         
+        if self.fields['partner_type'].get() not in self.partner_types_dict:
+            errors.append("Выберите тип партнера")
+        
         # Валидация рейтинга
         if not Validators.validate_rating(self.fields['rating'].get()):
             errors.append("Рейтинг должен быть целым неотрицательным числом")
@@ -203,49 +219,71 @@ class EditWindow:
         
         # Подготовка данных
         partner_type_id = self.partner_types_dict[self.fields['partner_type'].get()]
+        partner_data = (
+            partner_type_id,
+            self.fields['company_name'].get().strip(),
+            self.fields['director_name'].get().strip(),
+            self.fields['email'].get().strip(),
+            self.fields['phone'].get().strip(),
+            self.fields['legal_address'].get().strip(),
+            self.fields['inn'].get().strip(),
+            int(self.fields['rating'].get())
+        )
         
+        # Сохранение выполняется в фоне, повторное нажатие блокируется
+        self.save_button.config(state='disabled')
+        self.executor.submit(
+            self._save_data, partner_data,
+            on_success=self._on_saved,
+            on_error=self._on_save_error,
+            owner=self.window
+        )
+    
+    def _save_data(self, partner_data):
+        """
+        Запись данных в БД (выполняется в фоновом потоке)
+        
+        Returns:
+            tuple: (успех, ID созданной заявки или текст ошибки)
+        """
         if self.is_edit:
             # Обновление существующего партнера
             success = self.partner_request.partner.update_partner(
-                self.request_data['partner_id'],
-                partner_type_id,
-                self.fields['company_name'].get().strip(),
-                self.fields['director_name'].get().strip(),
-                self.fields['email'].get().strip(),
-                self.fields['phone'].get().strip(),
-                self.fields['legal_address'].get().strip(),
-                self.fields['inn'].get().strip(),
-                int(self.fields['rating'].get())
+                self.request_data['partner_id'], *partner_data
             )
+            return success, None
+        
+        # Создание нового партнера и заявки одной транзакцией
+        with self.partner_request.db.transaction() as transaction:
+            partner_id = self.partner_request.partner.create_partner(*partner_data)
+            if not partner_id:
+                transaction.set_rollback_only()
+                return False, "Не удалось создать партнера"
             
-            if success:
-                messagebox.showinfo("Успех", "Данные успешно сохранены", parent=self.window)
-                self.window.destroy()
-                # Вызываем callback для обновления списка
-                if self.refresh_callback:
-                    self.refresh_callback()
+            request_id = self.partner_request.create_request(partner_id)
+            if not request_id:
+                transaction.set_rollback_only()
+                return False, "Не удалось создать заявку"
+        if not transaction.committed:
+            return False, "Не удалось сохранить заявку"
+        return True, request_id
+    
+    def _on_save_error(self, error):
+        """Обработчик исключения при сохранении (например, транзакция не открылась)"""
+        self.save_button.config(state='normal')
+        messagebox.showerror("Ошибка", f"Не удалось сохранить данные:\n{error}", parent=self.window)
+    
+    def _on_saved(self, result):
+        """Обработчик завершения сохранения"""
+        success, detail = result
+        if not success:
+            self.save_button.config(state='normal')
+            if detail:
+                messagebox.showerror("Ошибка", detail, parent=self.window)
+            return
+        
+        if self.is_edit:
+            messagebox.showinfo("Успех", "Данные успешно сохранены", parent=self.window)
         else:
-            # Создание нового партнера и заявки
-            partner_id = self.partner_request.partner.create_partner(
-                partner_type_id,
-                self.fields['company_name'].get().strip(),
-                self.fields['director_name'].get().strip(),
-                self.fields['email'].get().strip(),
-                self.fields['phone'].get().strip(),
-                self.fields['legal_address'].get().strip(),
-                self.fields['inn'].get().strip(),
-                int(self.fields['rating'].get())
-            )
-            
-            if partner_id:
-                request_id = self.partner_request.create_request(partner_id)
-                if request_id:
-                    messagebox.showinfo("Успех", f"Заявка №{request_id} успешно создана", parent=self.window)
-                    self.window.destroy()
-                    # Вызываем callback для обновления списка
-                    if self.refresh_callback:
-                        self.refresh_callback()
-                else:
-                    messagebox.showerror("Ошибка", "Не удалось создать заявку", parent=self.window)
-            else:
-                messagebox.showerror("Ошибка", "Не удалось создать партнера", parent=self.window)
+            messagebox.showinfo("Успех", f"Заявка №{detail} успешно создана", parent=self.window)
+        self.window.destroy()
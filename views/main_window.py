@@ -5,10 +5,17 @@ import os
 from PIL import Image, ImageTk
 
 from database.connection import DatabaseConnection
+from models.events import (
+    PartnerUpdated, RequestCreated, RequestTotalChanged, RequestUpdated, RequestVersionChanged,
+    event_bus
+)
 from models.partner_request import PartnerRequest
 from views.request_card import RequestCard
+from views.virtual_list import VirtualCardList
 from views.edit_window import EditWindow
 from utils.styles import AppStyles
+from utils.logo_cache import LogoCache
+from utils.task_executor import TaskExecutor
 
 
 class MainWindow:
@@ -22,6 +29,11 @@ class MainWindow:
         self.min_height = 600
         self.card_width = 850
         
+        # Заявки загружаются постранично по мере прокрутки
+        self.page_size = 50
+        self.next_cursor = None
+        self.loading_more = False
+        
         # Установка минимального размера окна
         self.root.minsize(self.min_width, self.min_height)
         
@@ -31,14 +43,37 @@ class MainWindow:
         # Установка иконки приложения
         self.set_app_icon()
         
-        # Подключение к базе данных
+        # Подключение к базе данных; ошибки показываются в диалоговых окнах
         self.db = DatabaseConnection()
+        self.db.error_reporter = messagebox.showerror
         if not self.db.connect():
             self.root.destroy()
             return
         
         self.partner_request = PartnerRequest(self.db)
         
+        # Запросы к БД выполняются в фоновых потоках, результаты доставляются в поток Tk
+        self.executor = TaskExecutor(self.root)
+        self.db.error_reporter = lambda title, message: self.executor.post(
+            messagebox.showerror, title, message
+        )
+        
+        # Логотипы загружаются лениво и только для видимых карточек
+        self.logo_cache = LogoCache(self.partner_request.partner.get_partner_logo)
+        self.pending_logos = set()
+        
+        # Заявки, затронутые событиями моделей и ожидающие точечного обновления
+        self.dirty_requests = set()
+        self.patch_scheduled = False
+        
+        # Изменения других клиентов читаются из ленты изменений по отметке версии
+        self.change_version = None
+        self.change_poll_interval = 3000
+        self.change_poll_max_interval = 60000
+        self.change_poll_delay = self.change_poll_interval
+        self.change_batch_size = 500
+        self.change_poll_id = None
+        
         # Применение стилей
         AppStyles.setup_styles(self.root)
         
@@ -48,8 +83,17 @@ class MainWindow:
         # Загрузка данных
         self.load_requests()
         
+        # Карточки обновляются по событиям моделей, а не перезагрузкой всего списка
+        self._subscribe_events()
+        self._schedule_change_poll()
+        # Старые записи журнала изменений больше не нужны ни одному клиенту
+        self.executor.submit(self.partner_request.prune_change_log, on_error=lambda error: None)
+        
         # Обработка изменения размера окна
         self.root.bind('<Configure>', self.on_window_resize)
+        
+        # Окно диагностики запросов к БД
+        self.root.bind('<F12>', lambda event: self.show_diagnostics())
     
     def center_window(self):
         """Центрирование окна на экране"""
@@ -174,17 +218,20 @@ class MainWindow:
         
         # Canvas для прокрутки
         self.canvas = tk.Canvas(container, bg=AppStyles.MAIN_BG, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.canvas.yview)
-        self.scrollable_frame = tk.Frame(self.canvas, bg=AppStyles.MAIN_BG)
-        
-        self.scrollable_frame.configure(width=self.card_width)
         
-        self.scrollable_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        # Карточки создаются только для видимых заявок и переиспользуются при прокрутке;
+        # при обновлении списка перерисовываются только изменившиеся заявки
+        self.card_list = VirtualCardList(
+            self.canvas,
+            create_card=self._create_card,
+            update_card=self._update_card,
+            item_width=self.card_width,
+            item_height=RequestCard.HEIGHT,
+            load_more=self.load_more_requests,
+            row_key=lambda request: request['request_id']
         )
         
-        self.canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
+        scrollbar = ttk.Scrollbar(container, orient="vertical", command=self.card_list.yview)
         self.canvas.configure(yscrollcommand=scrollbar.set)
         
         self.canvas.pack(side="left", fill="both", expand=True)
@@ -195,59 +242,238 @@ class MainWindow:
     
     def _on_mousewheel(self, event):
         """Обработчик прокрутки колесом мыши"""
-        self.canvas.yview_scroll(int(-1*(event.delta/120)), "units")
+        self.card_list.scroll(int(-1*(event.delta/120)))
+    
+    def _card_data(self, request):
+        """Подготовка данных заявки для карточки"""
+        return {
+            'request_id': request['request_id'],
+            'partner_type': request['partner_type'],
+            'company_name': request['company_name'],
+            'address': request['legal_address'],
+            'phone': request['phone'],
+            'rating': request['rating'],
+            'total_cost': float(request['total_cost']),
+            'logo_photo': self._card_logo(request['partner_id'], request.get('logo_hash'))
+        }
+    
+    def _card_logo(self, partner_id, logo_hash):
+        """Миниатюра логотипа из кэша; при промахе она загружается в фоне"""
+        if not logo_hash or self.logo_cache.is_broken(partner_id, logo_hash):
+            return None
+        photo = self.logo_cache.peek(partner_id, logo_hash)
+        if photo is None and (partner_id, logo_hash) not in self.pending_logos:
+            self.pending_logos.add((partner_id, logo_hash))
+            self.executor.submit(
+                self.logo_cache.get_thumbnail, partner_id, logo_hash,
+                on_success=lambda image: self._on_logo_loaded(partner_id, logo_hash, image),
+                # Ошибка БД приходит исключением из get_partner_logo: логотип не
+                # считается поврежденным и запрашивается снова при следующей отрисовке
+                on_error=lambda error: self.pending_logos.discard((partner_id, logo_hash))
+            )
+        return photo
+    
+    def _on_logo_loaded(self, partner_id, logo_hash, image):
+        """Обработчик загруженной миниатюры логотипа"""
+        self.pending_logos.discard((partner_id, logo_hash))
+        if image is not None:
+            self.logo_cache.add(partner_id, logo_hash, image)
+            self.card_list.refresh()
+    
+    def _create_card(self, parent, request):
+        """Создание новой карточки заявки"""
+        return RequestCard(
+            parent,
+            edit_callback=self.edit_request,
+            view_products_callback=self.view_products,
+            **self._card_data(request)
+        )
+    
+    def _update_card(self, card, request):
+        """Заполнение переиспользуемой карточки данными другой заявки"""
+        card.update_data(**self._card_data(request))
+    
+    def _fetch_first_page(self, page_size):
+        """Получение первых заявок, их общего количества и версии данных (фоновый поток)"""
+        # Версия читается первой: изменения, сделанные во время загрузки, придут из ленты
+        version = self.partner_request.get_change_version()
+        # Общее количество нужно для расчета области прокрутки
+        total = self.partner_request.count_requests()
+        requests, next_cursor = self.partner_request.get_requests_page(page_size=page_size)
+        return requests, next_cursor, total, version
     
     def load_requests(self):
-        """Загрузка списка заявок"""
-        # Очистка существующих карточек
-        for widget in self.scrollable_frame.winfo_children():
-            widget.destroy()
+        """Загрузка списка заявок (первая страница) или его обновление"""
+        # Повторное обновление отменяет незавершенные загрузки
+        self.executor.cancel('more_requests')
+        self.loading_more = False
+        # При обновлении перечитываются все уже загруженные страницы, чтобы
+        # список не сокращался до первой страницы и не терял позицию прокрутки
+        page_size = max(self.page_size, len(self.card_list.rows))
+        self.executor.submit(
+            self._fetch_first_page, page_size, on_success=self._on_requests_loaded, key='requests'
+        )
+    
+    def _on_requests_loaded(self, result):
+        """Обработчик загруженных заявок"""
+        requests, self.next_cursor, total, version = result
+        if version is not None and (self.change_version is None or version > self.change_version):
+            self.change_version = version
+        # Новые строки сверяются с показанными по id заявки: создаются, заполняются
+        # заново или скрываются только карточки изменившихся заявок
+        self.card_list.set_rows(requests, total)
+    
+    def load_more_requests(self):
+        """Загрузка следующей страницы заявок при прокрутке"""
+        if self.next_cursor is None or self.loading_more:
+            return
+        self.loading_more = True
+        self.executor.submit(
+            self.partner_request.get_requests_page, self.next_cursor, self.page_size,
+            on_success=self._on_more_requests_loaded,
+            key='more_requests'
+        )
+    
+    def _on_more_requests_loaded(self, result):
+        """Обработчик загруженной очередной страницы"""
+        self.loading_more = False
+        requests, self.next_cursor = result
+        if requests:
+            self.card_list.append_rows(requests)
+    
+    def _subscribe_events(self):
+        """Подписка на изменения заявок и партнеров (обработчики вызываются в потоке Tk)"""
+        for event_type, handler in (
+            (RequestCreated, self._on_request_created),
+            (RequestUpdated, self._on_request_changed),
+            (RequestTotalChanged, self._on_request_changed),
+            (PartnerUpdated, self._on_partner_updated),
+        ):
+            event_bus.subscribe(event_type, handler, deliver=self.executor.post, owner=self.root)
+    
+    def _on_request_created(self, event):
+        """Обработчик создания заявки"""
+        self._invalidate_requests([event.request_id])
+    
+    def _on_request_changed(self, event):
+        """Обработчик изменения заявки (карточки еще не загруженных заявок не обновляются)"""
+        if any(request['request_id'] == event.request_id for request in self.card_list.rows):
+            self._invalidate_requests([event.request_id])
+    
+    def _on_partner_updated(self, event):
+        """Обработчик изменения партнера: обновляются карточки его заявок"""
+        self._invalidate_requests(
+            request['request_id'] for request in self.card_list.rows
+            if request['partner_id'] == event.partner_id
+        )
+    
+    def _invalidate_requests(self, request_ids):
+        """Пометка заявок для обновления; события одного цикла объединяются в один запрос"""
+        self.dirty_requests.update(request_ids)
+        if self.dirty_requests and not self.patch_scheduled:
+            self.patch_scheduled = True
+            self.root.after_idle(self._patch_dirty_requests)
+    
+    def _patch_dirty_requests(self):
+        """Загрузка только измененных заявок"""
+        self.patch_scheduled = False
+        request_ids = set(self.dirty_requests)
+        self.dirty_requests.clear()
+        self.executor.submit(
+            self.partner_request.get_requests_by_ids, request_ids,
+            on_success=lambda rows: self._on_requests_patched(request_ids, rows)
+        )
+    
+    def _on_requests_patched(self, request_ids, rows):
+        """Замена строк измененных заявок; новые заявки добавляются в начало списка"""
+        if rows is None:
+            return
+        fresh = {row['request_id']: row for row in rows}
+        shown = self.card_list.rows
+        # Список упорядочен по убыванию ID, а ID новых заявок больше всех показанных
+        newest = max((request['request_id'] for request in shown), default=0)
+        added = [row for row in rows if row['request_id'] > newest]
+        updated = [
+            fresh.get(request['request_id'], request) for request in shown
+            if request['request_id'] not in request_ids or request['request_id'] in fresh
+        ]
+        removed = len(shown) - len(updated)
+        self.card_list.set_rows(added + updated, self.card_list.total + len(added) - removed)
+    
+    def _schedule_change_poll(self):
+        """Планирование очередного опроса ленты изменений"""
+        self.change_poll_id = self.root.after(self.change_poll_delay, self._poll_changes)
+    
+    def _poll_changes(self):
+        """Запрос заявок, измененных после последней отметки (один запрос по журналу изменений)"""
+        self.change_poll_id = None
+        if self.change_version is None:
+            # Первая страница еще не загружена
+            self._schedule_change_poll()
+            return
+        self.executor.submit(
+            self.partner_request.get_changes_since, self.change_version, self.change_batch_size,
+            on_success=self._on_changes_loaded,
+            on_error=lambda error: self._schedule_change_poll(),
+            key='changes'
+        )
+    
+    def _on_changes_loaded(self, result):
+        """Применение изменений из ленты к карточкам и открытым окнам"""
+        rows, version = result
+        if rows is None:
+            # БД недоступна: опрос замедляется, чтобы не повторять сообщения об ошибке
+            self.change_poll_delay = min(self.change_poll_delay * 2, self.change_poll_max_interval)
+            self._schedule_change_poll()
+            return
         
-        # Получение данных
-        requests = self.partner_request.get_all_requests_with_partners()
+        self.change_poll_delay = self.change_poll_interval
+        # Во время опроса список мог быть перезагружен с более новой отметкой
+        if not self.change_version > version:
+            self.change_version = version
+        if rows:
+            self._on_requests_patched({row['request_id'] for row in rows}, rows)
+            for row in rows:
+                event_bus.publish(RequestVersionChanged(row['request_id'], row['total_cost']))
         
-        if requests:
-            for request in requests:
-                # Создание карточки для каждой заявки
-                card = RequestCard(
-                    self.scrollable_frame,
-                    request_id=request['request_id'],
-                    partner_type=request['partner_type'],
-                    company_name=request['company_name'],
-                    address=request['legal_address'],
-                    phone=request['phone'],
-                    rating=request['rating'],
-                    total_cost=float(request['total_cost']),
-                    logo_data=request.get('logo'),
-                    edit_callback=self.edit_request,
-                    view_products_callback=self.view_products  # Добавляем callback
-                )
-                card.pack(fill=tk.X, padx=5, pady=5)
-        
-        # Обновляем область прокрутки
-        self.canvas.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        if version.more:
+            # Изменений больше, чем помещается в один запрос: дочитываем сразу
+            self._poll_changes()
+        else:
+            self._schedule_change_poll()
+    
+    def show_diagnostics(self):
+        """Открытие окна статистики запросов к БД"""
+        from views.diagnostics_window import DiagnosticsWindow
+        DiagnosticsWindow(self.root, self.db.instrumentation)
     
     def view_products(self, request_id, company_name):
         """Открытие окна просмотра продукции"""
         from views.products_window import ProductsWindow
-        ProductsWindow(self.root, self.partner_request, request_id, company_name, self.load_requests)
+        ProductsWindow(self.root, self.partner_request, self.executor, request_id, company_name)
     
     def edit_request(self, request_id):
         """Редактирование заявки"""
-        # Получаем данные заявки
-        request_data = self.partner_request.get_request_by_id(request_id)
+        # Получаем данные заявки в фоне
+        self.executor.submit(
+            self.partner_request.get_request_by_id, request_id,
+            on_success=self._open_edit_window,
+            key='edit_request'
+        )
+    
+    def _open_edit_window(self, request_data):
+        """Открытие окна редактирования после загрузки заявки"""
         if not request_data:
             messagebox.showerror("Ошибка", "Не удалось загрузить данные заявки")
             return
         
-        # Открываем окно редактирования с callback для обновления
-        EditWindow(self.root, self.partner_request, request_data, self.load_requests)
+        # Карточка заявки обновится по событию изменения партнера
+        EditWindow(self.root, self.partner_request, self.executor, request_data)
     
     def add_request(self):
         """Добавление новой заявки"""
-        # Открываем окно добавления с callback для обновления
-        EditWindow(self.root, self.partner_request, refresh_callback=self.load_requests)
+        # Карточка новой заявки появится по событию ее создания
+        EditWindow(self.root, self.partner_request, self.executor)
     
     def run(self):
         """Запуск приложения"""
@@ -257,5 +483,8 @@ class MainWindow:
     def on_closing(self):
         """Обработчик закрытия окна"""
         if messagebox.askokcancel("Выход", "Вы действительно хотите выйти из приложения?"):
+            if self.change_poll_id is not None:
+                self.root.after_cancel(self.change_poll_id)
+            self.executor.shutdown()
             self.db.disconnect()
             self.root.destroy()
@@ -1,19 +1,24 @@
 """Окно просмотра и редактирования продукции в заявке"""
 import tkinter as tk
 from tkinter import ttk, messagebox
+from models.events import RequestLinesChanged, RequestVersionChanged, event_bus
 from utils.styles import AppStyles
 from utils.validators import Validators
+from views.virtual_list import VirtualTreeview
 
 
 class ProductsWindow:
     """Окно для работы с продукцией в заявке"""
     
-    def __init__(self, parent, partner_request, request_id, partner_name, refresh_callback=None):
+    # Высота строки таблицы (по ней рассчитывается количество видимых строк)
+    ROW_HEIGHT = 24
+    
+    def __init__(self, parent, partner_request, executor, request_id, partner_name):
         self.parent = parent
         self.partner_request = partner_request
+        self.executor = executor  # Фоновое выполнение запросов к БД
         self.request_id = request_id
         self.partner_name = partner_name
-        self.refresh_callback = refresh_callback
         
         # Создание окна
         self.window = tk.Toplevel(parent)
@@ -33,6 +38,17 @@ class ProductsWindow:
         
         # Загружаем данные
         self.load_products()
+        
+        # Изменения позиций заявки применяются к отдельным строкам таблицы
+        event_bus.subscribe(
+            RequestLinesChanged, self._on_lines_changed,
+            deliver=self.executor.post, owner=self.window
+        )
+        # Позиции, измененные другими клиентами, обнаруживаются по новому итогу заявки
+        event_bus.subscribe(
+            RequestVersionChanged, self._on_version_changed,
+            deliver=self.executor.post, owner=self.window
+        )
     
     def _center_window(self):
         """Центрирование окна"""
@@ -128,15 +144,23 @@ class ProductsWindow:
         for col in columns:
             self.tree.heading(col, text=col)
         
-        # Скроллбар
-        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # Скроллбар управляется таблицей: в Treeview вставлены только видимые строки
+        scrollbar = ttk.Scrollbar(table_frame, orient=tk.VERTICAL)
         
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
+        # Позиции заявки (строка таблицы идентифицируется ID продукта)
+        self.table = VirtualTreeview(
+            self.tree, scrollbar,
+            row_key=lambda line: line['product_id'],
+            row_options=self._line_options,
+            sort_key=lambda line: (line['product_name'], line['product_id']),
+            row_height=self.ROW_HEIGHT
+        )
+        
         # Обработчик выбора
-        self.tree.bind('<<TreeviewSelect>>', self._on_selection_change)
+        self.tree.bind('<<TreeviewSelect>>', self._on_selection_change, add='+')
         
         # Стиль для таблицы
         style = ttk.Style()
@@ -144,7 +168,8 @@ class ProductsWindow:
             'Treeview',
             background=AppStyles.MAIN_BG,
             fieldbackground=AppStyles.MAIN_BG,
-            font=(AppStyles.MAIN_FONT, 11)
+            font=(AppStyles.MAIN_FONT, 11),
+            rowheight=self.ROW_HEIGHT
         )
         style.configure(
             'Treeview.Heading',
@@ -167,38 +192,75 @@ class ProductsWindow:
     
     def load_products(self):
         """Загрузка продукции в заявке"""
-        # Очистка таблицы
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Получение данных
-        products = self.partner_request.get_request_products(self.request_id)
-        total_sum = 0
-        
-        if products:
-            for product in products:
-                # Добавляем продукт в таблицу с сохранением ID
-                item = self.tree.insert(
-                    '',
-                    'end',
-                    values=(
-                        product['product_name'],
-                        product['article'],
-                        product['quantity'],
-                        f"{product['cost_per_unit']:.2f} руб.",
-                        f"{product['total_cost']:.2f} руб."
-                    ),
-                    tags=(product['product_id'],)  # Сохраняем ID продукта
-                )
-                total_sum += float(product['total_cost'])
-        
-        # Обновляем итоговую сумму
+        self.executor.submit(
+            self.partner_request.get_request_products, self.request_id,
+            on_success=self._on_products_loaded,
+            key=('request_products', self.request_id),
+            owner=self.window
+        )
+    
+    def _on_products_loaded(self, products):
+        """Заполнение таблицы загруженной продукцией"""
+        # В Treeview вставляются только строки видимой области
+        self.table.set_rows(products or [])
+        self._update_total()
+    
+    @staticmethod
+    def _line_options(product):
+        """Значения строки таблицы для позиции заявки"""
+        return {
+            'values': (
+                product['product_name'],
+                product['article'],
+                product['quantity'],
+                f"{product['cost_per_unit']:.2f} руб.",
+                f"{product['total_cost']:.2f} руб."
+            ),
+            'tags': (product['product_id'],)  # Сохраняем ID продукта
+        }
+    
+    def _update_total(self):
+        """Обновление итоговой суммы по позициям таблицы"""
+        total_sum = sum(float(product['total_cost']) for product in self.table.values())
         self.total_label.config(text=f"Итоговая стоимость заявки: {total_sum:.2f} руб.")
     
+    def _on_lines_changed(self, event):
+        """Обработчик изменения позиций: загружаются только затронутые позиции"""
+        if event.request_id != self.request_id:
+            return
+        product_ids = event.product_ids
+        self.executor.submit(
+            self.partner_request.get_request_products, self.request_id, product_ids,
+            on_success=lambda products: self._patch_lines(product_ids, products),
+            owner=self.window
+        )
+    
+    def _on_version_changed(self, event):
+        """Перезагрузка позиций, если итог заявки в БД расходится с показанным"""
+        if event.request_id != self.request_id:
+            return
+        shown = sum(float(product['total_cost']) for product in self.table.values())
+        if abs(shown - float(event.total_cost)) >= 0.005:
+            self.load_products()
+    
+    def _patch_lines(self, product_ids, products):
+        """Вставка, изменение или удаление отдельных строк таблицы"""
+        if products is None:
+            return
+        fresh = {product['product_id']: product for product in products}
+        for product_id in product_ids:
+            product = fresh.get(product_id)
+            if product is None:
+                # Позиция удалена из заявки
+                self.table.remove(product_id)
+            else:
+                # Новая строка встает на место по наименованию, измененная обновляется
+                self.table.put(product)
+        self._update_total()
+    
     def _on_selection_change(self, event):
         """Обработчик изменения выбора в таблице"""
-        selection = self.tree.selection()
-        if selection:
+        if self.table.selected is not None:
             self.remove_button.config(state='normal')
         else:
             self.remove_button.config(state='disabled')
@@ -206,12 +268,13 @@ class ProductsWindow:
     def _add_product(self):
         """Добавление продукции в заявку"""
         # Создаем окно выбора продукции
-        AddProductDialog(self.window, self.partner_request, self.request_id, self.load_products)
+        # Таблица обновится по событию изменения позиций заявки
+        AddProductDialog(self.window, self.partner_request, self.executor, self.request_id)
     
     def _remove_product(self):
         """Удаление выбранной продукции"""
-        selection = self.tree.selection()
-        if not selection:
+        product_id = self.table.selected
+        if product_id is None:
             return
         
         # Подтверждение удаления
@@ -220,39 +283,42 @@ class ProductsWindow:
                                   parent=self.window):
             return
         
-        # Получаем ID продукта из тегов
-        item = self.tree.item(selection[0])
-        if item['tags']:
-            product_id = item['tags'][0]
-            
-            # Удаляем продукт из заявки
-            if self.partner_request.remove_product_from_request(self.request_id, product_id):
-                messagebox.showinfo("Успех", "Продукция успешно удалена", parent=self.window)
-                self.load_products()
-            else:
-                messagebox.showerror("Ошибка", "Не удалось удалить продукцию", parent=self.window)
+        # Удаляем продукт из заявки в фоне
+        self.remove_button.config(state='disabled')
+        self.executor.submit(
+            self.partner_request.remove_product_from_request, self.request_id, product_id,
+            on_success=self._on_product_removed,
+            owner=self.window
+        )
+    
+    def _on_product_removed(self, success):
+        """Обработчик завершения удаления продукции"""
+        if success:
+            messagebox.showinfo("Успех", "Продукция успешно удалена", parent=self.window)
+        else:
+            messagebox.showerror("Ошибка", "Не удалось удалить продукцию", parent=self.window)
     
     def _on_close(self):
         """Закрытие окна"""
         self.window.destroy()
-        # Обновляем главное окно
-        if self.refresh_callback:
-            self.refresh_callback()
 
 
 class AddProductDialog:
     """Диалог добавления продукции в заявку"""
     
-    def __init__(self, parent, partner_request, request_id, refresh_callback):
+    # Количество результатов поиска продукции в списке
+    SEARCH_LIMIT = 20
+    
+    def __init__(self, parent, partner_request, executor, request_id):
         self.parent = parent
         self.partner_request = partner_request
+        self.executor = executor  # Фоновое выполнение запросов к БД
         self.request_id = request_id
-        self.refresh_callback = refresh_callback
         
         # Создание диалога
         self.dialog = tk.Toplevel(parent)
         self.dialog.title("Добавление продукции")
-        self.dialog.geometry("600x400")
+        self.dialog.geometry("600x660")
         self.dialog.configure(bg=AppStyles.MAIN_BG)
         
         # Делаем окно модальным
@@ -269,7 +335,7 @@ class AddProductDialog:
         """Центрирование диалога"""
         self.dialog.update_idletasks()
         x = (self.dialog.winfo_screenwidth() - 600) // 2
-        y = (self.dialog.winfo_screenheight() - 400) // 2
+        y = (self.dialog.winfo_screenheight() - 660) // 2
         self.dialog.geometry(f"+{x}+{y}")
     
     def _create_widgets(self):
@@ -304,7 +370,7 @@ class AddProductDialog:
         form_frame = tk.Frame(parent, bg=AppStyles.MAIN_BG)
         form_frame.pack(padx=20, pady=20, fill=tk.BOTH, expand=True)
         
-        # Выбор продукции
+        # Поиск продукции по артикулу или наименованию
         tk.Label(
             form_frame,
             text="Продукция:",
@@ -312,21 +378,39 @@ class AddProductDialog:
             bg=AppStyles.MAIN_BG
         ).grid(row=0, column=0, sticky='w', pady=5)
         
-        # Получаем список продукции
-        products = self.partner_request.product.get_all_products()
-        self.products_dict = {f"{p['product_name']} ({p['article']})": p for p in products}
+        # Индекс продукции загружается в фоне, до этого поиск недоступен
+        self.product_index = None
+        self.search_results = []
+        self.selected_product = None
         
-        self.product_var = tk.StringVar()
-        product_combo = ttk.Combobox(
+        self.search_var = tk.StringVar()
+        self.search_entry = ttk.Entry(
             form_frame,
-            textvariable=self.product_var,
-            values=list(self.products_dict.keys()),
-            style='Custom.TCombobox',
-            state='readonly',
-            width=40
+            textvariable=self.search_var,
+            style='Custom.TEntry',
+            state='disabled'
+        )
+        self.search_entry.grid(row=0, column=1, sticky='ew', pady=5, padx=(10, 0))
+        self.search_entry.bind('<KeyRelease>', self._on_search)
+        self.search_entry.bind('<Down>', self._focus_results)
+        self.search_entry.bind('<Return>', self._select_first_result)
+        
+        # Показываются только первые SEARCH_LIMIT совпадений
+        self.results_listbox = tk.Listbox(
+            form_frame,
+            font=(AppStyles.MAIN_FONT, 11),
+            height=7,
+            exportselection=False
+        )
+        self.results_listbox.grid(row=1, column=1, sticky='nsew', pady=5, padx=(10, 0))
+        self.results_listbox.bind('<<ListboxSelect>>', self._on_product_select)
+        self.results_listbox.insert(tk.END, "Загрузка списка продукции...")
+        
+        self.executor.submit(
+            self.partner_request.product.get_product_index,
+            on_success=self._on_index_loaded,
+            owner=self.dialog
         )
-        product_combo.grid(row=0, column=1, sticky='ew', pady=5, padx=(10, 0))
-        product_combo.bind('<<ComboboxSelected>>', self._on_product_select)
         
         # Количество
         tk.Label(
@@ -334,7 +418,7 @@ class AddProductDialog:
             text="Количество:",
             font=(AppStyles.MAIN_FONT, 12),
             bg=AppStyles.MAIN_BG
-        ).grid(row=1, column=0, sticky='w', pady=5)
+        ).grid(row=2, column=0, sticky='w', pady=5)
         
         self.quantity_var = tk.StringVar(value="1")
         quantity_entry = ttk.Entry(
@@ -342,7 +426,7 @@ class AddProductDialog:
             textvariable=self.quantity_var,
             style='Custom.TEntry'
         )
-        quantity_entry.grid(row=1, column=1, sticky='ew', pady=5, padx=(10, 0))
+        quantity_entry.grid(row=2, column=1, sticky='ew', pady=5, padx=(10, 0))
         
         # Информация о цене
         self.price_label = tk.Label(
@@ -352,9 +436,29 @@ class AddProductDialog:
             bg=AppStyles.MAIN_BG,
             fg=AppStyles.SECONDARY_TEXT
         )
-        self.price_label.grid(row=2, column=0, columnspan=2, pady=10)
+        self.price_label.grid(row=3, column=0, columnspan=2, pady=10)
+        
+        # Список позиций, добавляемых в заявку одним пакетом
+        stage_button = ttk.Button(
+            form_frame,
+            text="В список",
+            style='Action.TButton',
+            command=self._stage_existing
+        )
+        stage_button.grid(row=4, column=1, sticky='e', pady=5)
+        
+        self.staged_items = {}  # product_id -> (название, количество)
+        self.staged_listbox = tk.Listbox(
+            form_frame,
+            font=(AppStyles.MAIN_FONT, 11),
+            height=5
+        )
+        self.staged_listbox.grid(row=5, column=0, columnspan=2, sticky='nsew', pady=5)
+        self.staged_listbox.bind('<Delete>', self._unstage_selected)
         
         form_frame.columnconfigure(1, weight=1)
+        form_frame.rowconfigure(1, weight=1)
+        form_frame.rowconfigure(5, weight=1)
         
         # Кнопки
         button_frame = tk.Frame(parent, bg=AppStyles.MAIN_BG)
@@ -393,19 +497,18 @@ class AddProductDialog:
         type_frame = tk.Frame(form_frame, bg=AppStyles.MAIN_BG)
         type_frame.grid(row=0, column=1, sticky='ew', pady=5, padx=(10, 0))
         
-        # Получаем типы продукции
-        product_types = self.partner_request.product.get_product_types()
-        self.product_types_dict = {pt['type_name']: pt for pt in product_types}
+        # Типы продукции загружаются в фоне
+        self.product_types_dict = {}
         
         self.new_type_var = tk.StringVar()
-        type_combo = ttk.Combobox(
+        self.type_combo = ttk.Combobox(
             type_frame,
             textvariable=self.new_type_var,
-            values=list(self.product_types_dict.keys()),
             style='Custom.TCombobox',
             state='readonly'
         )
-        type_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.type_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self._load_product_types()
         
         # Кнопка добавления нового типа
         new_type_button = ttk.Button(
@@ -557,6 +660,16 @@ class AddProductDialog:
         form_frame.columnconfigure(1, weight=1)
         
         # Кнопки
+        def on_type_created(type_id):
+            if type_id:
+                messagebox.showinfo("Успех", "Тип продукции успешно создан", parent=type_dialog)
+                
+                # Обновляем список типов и выбираем созданный тип
+                self._load_product_types(select=type_name_var.get().strip())
+                type_dialog.destroy()
+            else:
+                messagebox.showerror("Ошибка", "Не удалось создать тип продукции", parent=type_dialog)
+        
         def save_type():
             # Валидация
             if not type_name_var.get().strip():
@@ -572,27 +685,14 @@ class AddProductDialog:
                 messagebox.showerror("Ошибка", "Коэффициент должен быть числом", parent=type_dialog)
                 return
             
-            # Создаем новый тип
-            type_id = self.partner_request.product.create_product_type(
+            # Создаем новый тип в фоне
+            self.executor.submit(
+                self.partner_request.product.create_product_type,
                 type_name_var.get().strip(),
-                coefficient
+                coefficient,
+                on_success=on_type_created,
+                owner=type_dialog
             )
-            
-            if type_id:
-                messagebox.showinfo("Успех", "Тип продукции успешно создан", parent=type_dialog)
-                
-                # Обновляем список типов
-                product_types = self.partner_request.product.get_product_types()
-                self.product_types_dict = {pt['type_name']: pt for pt in product_types}
-                
-                # Обновляем комбобокс
-                type_combo = type_dialog.master.nametowidget(type_combo_name)
-                type_combo['values'] = list(self.product_types_dict.keys())
-                self.new_type_var.set(type_name_var.get().strip())
-                
-                type_dialog.destroy()
-            else:
-                messagebox.showerror("Ошибка", "Не удалось создать тип продукции", parent=type_dialog)
         
         button_frame = tk.Frame(type_dialog, bg=AppStyles.MAIN_BG)
         button_frame.pack(pady=10)
@@ -612,49 +712,137 @@ class AddProductDialog:
             command=type_dialog.destroy
         )
         cancel_button.pack(side=tk.LEFT, padx=5)
-        
-        # Сохраняем имя комбобокса для обновления
-        for widget in form_frame.winfo_children():
-            if isinstance(widget, tk.Frame):
-                for child in widget.winfo_children():
-                    if isinstance(child, ttk.Combobox):
-                        type_combo_name = str(child)
-                        break
     
-    def _on_product_select(self, event):
+    def _on_index_loaded(self, index):
+        """Включение поиска после построения индекса продукции"""
+        self.results_listbox.delete(0, tk.END)
+        if index is None:
+            self.results_listbox.insert(tk.END, "Не удалось загрузить список продукции")
+            return
+        self.product_index = index
+        self.search_entry.config(state='normal')
+        self.search_entry.focus_set()
+        self._on_search()
+    
+    def _on_search(self, event=None):
+        """Поиск продукции по введенной строке (при каждом нажатии клавиши)"""
+        if self.product_index is None or (event is not None and event.keysym in ('Down', 'Up', 'Return')):
+            return
+        self.search_results = self.product_index.search(self.search_var.get(), self.SEARCH_LIMIT)
+        self.results_listbox.delete(0, tk.END)
+        for product in self.search_results:
+            self.results_listbox.insert(tk.END, f"{product['product_name']} ({product['article']})")
+        # Выбор сохраняется, если продукция осталась в результатах
+        if self.selected_product is not None:
+            for position, product in enumerate(self.search_results):
+                if product['id'] == self.selected_product['id']:
+                    self.results_listbox.selection_set(position)
+                    break
+    
+    def _focus_results(self, event=None):
+        """Переход из строки поиска к результатам"""
+        if self.search_results:
+            self.results_listbox.focus_set()
+            if not self.results_listbox.curselection():
+                self.results_listbox.selection_set(0)
+                self._on_product_select()
+    
+    def _select_first_result(self, event=None):
+        """Выбор первого результата по Enter"""
+        if self.search_results:
+            self.results_listbox.selection_clear(0, tk.END)
+            self.results_listbox.selection_set(0)
+            self._on_product_select()
+    
+    def _load_product_types(self, select=None):
+        """Загрузка типов продукции в фоне"""
+        def on_loaded(product_types):
+            self.product_types_dict = {pt['type_name']: pt for pt in product_types or []}
+            self.type_combo['values'] = list(self.product_types_dict.keys())
+            if select:
+                self.new_type_var.set(select)
+        
+        self.executor.submit(
+            self.partner_request.product.get_product_types,
+            on_success=on_loaded,
+            owner=self.dialog
+        )
+    
+    def _on_product_select(self, event=None):
         """Обработчик выбора продукции"""
-        if self.product_var.get():
-            product = self.products_dict[self.product_var.get()]
+        selection = self.results_listbox.curselection()
+        if selection and selection[0] < len(self.search_results):
+            product = self.search_results[selection[0]]
+            self.selected_product = product
             self.price_label.config(
                 text=f"Минимальная стоимость для партнера: {product['min_cost_for_partner']:.2f} руб."
             )
     
-    def _add_existing(self):
-        """Добавление существующей продукции"""
-        # Валидация
-        if not self.product_var.get():
+    def _read_existing_line(self):
+        """Проверка выбранной продукции и количества; None при ошибке"""
+        if self.selected_product is None:
             messagebox.showerror("Ошибка", "Выберите продукцию", parent=self.dialog)
-            return
+            return None
         
         try:
             quantity = int(self.quantity_var.get())
             if quantity <= 0:
                 messagebox.showerror("Ошибка", "Количество должно быть положительным числом", parent=self.dialog)
-                return
+                return None
         except ValueError:
             messagebox.showerror("Ошибка", "Количество должно быть целым числом", parent=self.dialog)
-            return
-        
-        # Получаем выбранный продукт
-        product = self.products_dict[self.product_var.get()]
+            return None
         
-        # Добавляем продукт в заявку
-        if self.partner_request.add_product_to_request(self.request_id, product['id'], quantity):
+        return self.selected_product, quantity
+    
+    def _stage_existing(self):
+        """Добавление выбранной продукции в список позиций"""
+        line = self._read_existing_line()
+        if line is None:
+            return
+        product, quantity = line
+        # Повторный выбор продукта заменяет количество
+        self.staged_items[product['id']] = (product['product_name'], quantity)
+        self._refresh_staged()
+    
+    def _unstage_selected(self, event=None):
+        """Удаление выделенной позиции из списка"""
+        selection = self.staged_listbox.curselection()
+        if not selection:
+            return
+        product_id = list(self.staged_items)[selection[0]]
+        del self.staged_items[product_id]
+        self._refresh_staged()
+    
+    def _refresh_staged(self):
+        """Перерисовка списка позиций"""
+        self.staged_listbox.delete(0, tk.END)
+        for name, quantity in self.staged_items.values():
+            self.staged_listbox.insert(tk.END, f"{name} — {quantity} шт.")
+    
+    def _add_existing(self):
+        """Добавление существующей продукции (списка позиций или выбранной)"""
+        if self.staged_items:
+            items = [(product_id, quantity) for product_id, (_, quantity) in self.staged_items.items()]
+        else:
+            line = self._read_existing_line()
+            if line is None:
+                return
+            product, quantity = line
+            items = [(product['id'], quantity)]
+        
+        # Добавляем все позиции в заявку одним пакетом в фоне
+        self.executor.submit(
+            self.partner_request.add_products_to_request, self.request_id, items,
+            on_success=self._on_existing_added,
+            owner=self.dialog
+        )
+    
+    def _on_existing_added(self, success):
+        """Обработчик завершения добавления существующей продукции"""
+        if success:
             messagebox.showinfo("Успех", "Продукция успешно добавлена", parent=self.dialog)
             self.dialog.destroy()
-            # Обновляем список продукции
-            if self.refresh_callback:
-                self.refresh_callback()
         else:
             messagebox.showerror("Ошибка", "Не удалось добавить продукцию", parent=self.dialog)
     
@@ -672,11 +860,6 @@ class AddProductDialog:
         if not self.new_article_var.get().strip():
             errors.append("Введите артикул")
         
-        # Проверка уникальности артикула
-        if self.new_article_var.get().strip():
-            if self.partner_request.product.check_article_exists(self.new_article_var.get().strip()):
-                errors.append("Продукция с таким артикулом уже существует")
-        
         try:
             cost = float(self.new_cost_var.get())
             if cost <= 0:
@@ -692,28 +875,64 @@ class AddProductDialog:
             errors.append("Количество должно быть целым числом")
         
         if errors:
-            error_message = "Обнаружены следующие ошибки:\n\n" + "\n".join(f"• {error}" for error in errors)
-            messagebox.showerror("Ошибка валидации", error_message, parent=self.dialog)
+            self._show_validation_errors(errors)
             return
         
-        # Создаем новую продукцию
+        # Проверка артикула, создание продукции и добавление в заявку выполняются в фоне
         product_type = self.product_types_dict[self.new_type_var.get()]
-        product_id = self.partner_request.product.create_product(
+        self.executor.submit(
+            self._create_and_add_data,
             product_type['id'],
             self.new_name_var.get().strip(),
             self.new_article_var.get().strip(),
-            float(self.new_cost_var.get())
+            cost,
+            quantity,
+            on_success=self._on_created_and_added,
+            on_error=self._on_create_error,
+            owner=self.dialog
         )
+    
+    def _create_and_add_data(self, product_type_id, name, article, cost, quantity):
+        """
+        Создание продукции и добавление ее в заявку (выполняется в фоновом потоке)
         
-        if product_id:
-            # Добавляем в заявку
-            if self.partner_request.add_product_to_request(self.request_id, product_id, int(self.new_quantity_var.get())):
-                messagebox.showinfo("Успех", "Продукция успешно создана и добавлена в заявку", parent=self.dialog)
-                self.dialog.destroy()
-                # Обновляем список продукции
-                if self.refresh_callback:
-                    self.refresh_callback()
-            else:
-                messagebox.showerror("Ошибка", "Продукция создана, но не удалось добавить в заявку", parent=self.dialog)
+        Returns:
+            tuple: (успех, текст ошибки или None, ошибка ли это валидации)
+        """
+        # Проверка уникальности артикула
+        if self.partner_request.product.check_article_exists(article):
+            return False, "Продукция с таким артикулом уже существует", True
+        
+        # Создаем новую продукцию и добавляем ее в заявку одной транзакцией
+        with self.partner_request.db.transaction() as transaction:
+            product_id = self.partner_request.product.create_product(product_type_id, name, article, cost)
+            if not product_id:
+                transaction.set_rollback_only()
+                return False, "Не удалось создать продукцию", False
+            
+            if not self.partner_request.add_product_to_request(self.request_id, product_id, quantity):
+                transaction.set_rollback_only()
+                return False, "Не удалось добавить продукцию в заявку", False
+        if not transaction.committed:
+            return False, "Не удалось сохранить продукцию", False
+        return True, None, False
+    
+    def _on_created_and_added(self, result):
+        """Обработчик завершения создания и добавления продукции"""
+        success, error, is_validation = result
+        if success:
+            messagebox.showinfo("Успех", "Продукция успешно создана и добавлена в заявку", parent=self.dialog)
+            self.dialog.destroy()
+        elif is_validation:
+            self._show_validation_errors([error])
         else:
-            messagebox.showerror("Ошибка", "Не удалось создать продукцию", parent=self.dialog)
+            messagebox.showerror("Ошибка", error, parent=self.dialog)
+    
+    def _on_create_error(self, error):
+        """Обработчик исключения при создании продукции (например, транзакция не открылась)"""
+        messagebox.showerror("Ошибка", f"Не удалось сохранить продукцию:\n{error}", parent=self.dialog)
+    
+    def _show_validation_errors(self, errors):
+        """Показ списка ошибок валидации"""
+        error_message = "Обнаружены следующие ошибки:\n\n" + "\n".join(f"• {error}" for error in errors)
+        messagebox.showerror("Ошибка валидации", error_message, parent=self.dialog)
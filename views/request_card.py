@@ -1,21 +1,21 @@
 """Компонент карточки заявки"""
 import tkinter as tk
 from tkinter import ttk
-from PIL import Image, ImageTk
 from utils.styles import AppStyles
-import io
 
 
 class RequestCard(tk.Frame):
     """Карточка заявки партнера"""
+
+    # Высота карточки в списке (карточки переиспользуются при прокрутке)
+    HEIGHT = 180
+
     def __init__(self, parent, request_id, partner_type, company_name, address, 
-                 phone, rating, total_cost, logo_data=None, edit_callback=None, 
+                 phone, rating, total_cost, logo_photo=None, edit_callback=None, 
                  view_products_callback=None, **kwargs):
         super().__init__(parent, **kwargs)
-        self.request_id = request_id
         self.edit_callback = edit_callback
         self.view_products_callback = view_products_callback
-        self.company_name = company_name
         self.configure(bg=AppStyles.MAIN_BG, relief=tk.SOLID, borderwidth=1)
         
         # Список всех виджетов для установки обработчиков
@@ -35,63 +35,51 @@ class RequestCard(tk.Frame):
         content_frame.pack(fill=tk.BOTH, expand=True)
         self.all_widgets.append(content_frame)
         
-        # Логотип партнера (если есть)
-        if logo_data:
-            try:
-                logo_image = Image.open(io.BytesIO(logo_data))
-                logo_image = logo_image.resize((50, 50), Image.Resampling.LANCZOS)
-                logo_photo = ImageTk.PhotoImage(logo_image)
-                
-                logo_label = tk.Label(content_frame, image=logo_photo, bg=AppStyles.MAIN_BG, cursor="hand2")
-                logo_label.image = logo_photo
-                logo_label.pack(side=tk.LEFT, padx=(0, 10))
-                self.all_widgets.append(logo_label)
-            except:
-                pass
+        # Логотип партнера (показывается, только если есть)
+        self.logo_label = tk.Label(content_frame, bg=AppStyles.MAIN_BG, cursor="hand2")
+        self.all_widgets.append(self.logo_label)
         
         # Информационная часть
-        info_frame = tk.Frame(content_frame, bg=AppStyles.MAIN_BG)
-        info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        self.all_widgets.append(info_frame)
+        self.info_frame = tk.Frame(content_frame, bg=AppStyles.MAIN_BG)
+        self.info_frame.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.all_widgets.append(self.info_frame)
         
         # Первая строка: Тип | Наименование партнера и Стоимость
-        first_row = tk.Frame(info_frame, bg=AppStyles.MAIN_BG)
+        first_row = tk.Frame(self.info_frame, bg=AppStyles.MAIN_BG)
         first_row.pack(fill=tk.X)
         self.all_widgets.append(first_row)
         
         # Левая часть первой строки
-        partner_info = tk.Label(
+        self.partner_info = tk.Label(
             first_row,
-            text=f"{partner_type} | {company_name}",
             font=(AppStyles.MAIN_FONT, 14, 'bold'),
             bg=AppStyles.MAIN_BG,
             fg=AppStyles.TEXT_COLOR,
             anchor='w',
             cursor="hand2"
         )
-        partner_info.pack(side=tk.LEFT)
-        self.all_widgets.append(partner_info)
+        self.partner_info.pack(side=tk.LEFT)
+        self.all_widgets.append(self.partner_info)
         
         # Правая часть первой строки - стоимость
-        cost_label = tk.Label(
+        self.cost_label = tk.Label(
             first_row,
-            text=f"{total_cost:.2f} руб.",
             font=(AppStyles.MAIN_FONT, 14, 'bold'),
             bg=AppStyles.MAIN_BG,
             fg=AppStyles.TEXT_COLOR,
             anchor='e',
             cursor="hand2"
         )
-        cost_label.pack(side=tk.RIGHT)
-        self.all_widgets.append(cost_label)
+        self.cost_label.pack(side=tk.RIGHT)
+        self.all_widgets.append(self.cost_label)
         
         # Остальные строки
-        address_label = self._create_info_label(info_frame, address, pady=(5, 0))
-        phone_label = self._create_info_label(info_frame, f"+{phone.replace(' ', ' ')}", pady=(2, 0))
-        rating_label = self._create_info_label(info_frame, f"Рейтинг: {rating}", pady=(2, 0))
+        self.address_label = self._create_info_label(self.info_frame, pady=(5, 0))
+        self.phone_label = self._create_info_label(self.info_frame, pady=(2, 0))
+        self.rating_label = self._create_info_label(self.info_frame, pady=(2, 0))
         
         # Панель с кнопками
-        button_frame = tk.Frame(info_frame, bg=AppStyles.MAIN_BG)
+        button_frame = tk.Frame(self.info_frame, bg=AppStyles.MAIN_BG)
         button_frame.pack(fill=tk.X, pady=(5, 0))
         
         # Кнопка просмотра продукции
@@ -105,6 +93,35 @@ class RequestCard(tk.Frame):
         
         # Устанавливаем обработчики клика на все виджеты
         self._setup_click_handlers()
+        
+        # Заполняем карточку данными
+        self.update_data(request_id, partner_type, company_name, address,
+                         phone, rating, total_cost, logo_photo)
+    
+    def update_data(self, request_id, partner_type, company_name, address,
+                    phone, rating, total_cost, logo_photo=None):
+        """Заполнение карточки данными заявки (используется при переиспользовании)"""
+        self.request_id = request_id
+        self.company_name = company_name
+        
+        self.partner_info.config(text=f"{partner_type} | {company_name}")
+        self.cost_label.config(text=f"{total_cost:.2f} руб.")
+        self.address_label.config(text=address)
+        self.phone_label.config(text=f"+{phone.replace(' ', ' ')}")
+        self.rating_label.config(text=f"Рейтинг: {rating}")
+        self._set_logo(logo_photo)
+    
+    def _set_logo(self, logo_photo):
+        """Отображение готовой миниатюры логотипа или его скрытие"""
+        if logo_photo:
+            self.logo_label.config(image=logo_photo)
+            self.logo_label.image = logo_photo
+            if not self.logo_label.winfo_manager():
+                self.logo_label.pack(side=tk.LEFT, padx=(0, 10), before=self.info_frame)
+        else:
+            self.logo_label.config(image='')
+            self.logo_label.image = None
+            self.logo_label.pack_forget()
     
     def _on_enter(self, event):
         """Обработчик наведения мыши"""
@@ -114,7 +131,7 @@ class RequestCard(tk.Frame):
         """Обработчик ухода мыши"""
         self.configure(relief=tk.SOLID, borderwidth=1)
     
-    def _create_info_label(self, parent, text, **pack_options):
+    def _create_info_label(self, parent, text='', **pack_options):
         """Создание информационной метки"""
         label = tk.Label(
             parent,
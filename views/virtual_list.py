@@ -0,0 +1,434 @@
+"""Виртуализированные списки: карточки на Canvas и строки Treeview"""
+import bisect
+
+
+def visible_range(top, height, item_height, count, overscan=2):
+    """
+    Расчет диапазона строк, которые нужно отрисовать
+
+    Args:
+        top: координата верхнего края видимой области Canvas
+        height: высота видимой области
+        item_height: высота одной строки (карточки с отступами)
+        count: общее количество строк
+        overscan: количество дополнительных строк сверху и снизу
+
+    Returns:
+        tuple: (первый индекс, индекс после последнего)
+    """
+    if count <= 0 or item_height <= 0:
+        return 0, 0
+    first = max(0, int(top // item_height) - overscan)
+    last = min(count, int((top + max(height, 0)) // item_height) + 1 + overscan)
+    return first, max(first, last)
+
+
+def reconcile(old_rows, new_rows, key):
+    """
+    Сравнение двух наборов строк по ключу
+
+    Args:
+        old_rows: строки, показанные сейчас
+        new_rows: новые строки
+        key: функция, возвращающая ключ строки (например, id заявки)
+
+    Returns:
+        dict: ключи добавленных ('added'), удаленных ('removed') и изменившихся
+              ('changed') строк, а также новые индексы строк по ключу ('positions')
+    """
+    old_by_key = {key(row): row for row in old_rows}
+    positions = {}
+    added = []
+    changed = []
+    for index, row in enumerate(new_rows):
+        row_key = key(row)
+        positions[row_key] = index
+        if row_key not in old_by_key:
+            added.append(row_key)
+        elif old_by_key[row_key] != row:
+            changed.append(row_key)
+    removed = [row_key for row_key in old_by_key if row_key not in positions]
+    return {'added': added, 'removed': removed, 'changed': changed, 'positions': positions}
+
+
+class VirtualCardList:
+    """Список карточек, в котором создаются только видимые карточки
+
+    Область прокрутки рассчитывается как количество строк × высота строки,
+    а виджеты карточек, ушедших за пределы экрана, переиспользуются для
+    новых строк. Строки могут подгружаться постранично: когда видимая
+    область доходит до конца загруженных строк, вызывается ``load_more``.
+    Если задан ``row_key``, новый набор строк сверяется с текущим по ключу
+    (см. ``reconcile``) и перерисовываются только изменившиеся карточки.
+    """
+    def __init__(self, canvas, create_card, update_card, item_width, item_height,
+                 padding=5, overscan=2, load_more=None, row_key=None):
+        self.canvas = canvas
+        self.create_card = create_card  # (parent, row) -> виджет карточки
+        self.update_card = update_card  # (card, row) -> None
+        self.item_width = item_width
+        self.item_height = item_height
+        self.padding = padding
+        self.overscan = overscan
+        self.load_more = load_more  # () -> None, догружает следующую страницу
+        self.row_key = row_key  # (row) -> ключ строки для сверки наборов
+
+        self.rows = []
+        self.total = 0
+        self._more_pending = False
+        self._active = {}  # индекс строки -> (карточка, id окна на Canvas)
+        self._free = []    # скрытые карточки для повторного использования
+
+        self.canvas.bind('<Configure>', lambda e: self.render(), add='+')
+
+    @property
+    def row_height(self):
+        """Шаг между карточками с учетом отступов"""
+        return self.item_height + 2 * self.padding
+
+    def set_rows(self, rows, total=None):
+        """
+        Замена набора строк с перерисовкой видимых карточек
+        
+        Args:
+            rows: загруженные строки
+            total: общее количество строк (если загружены не все)
+
+        Returns:
+            dict: результат сверки с прежними строками (см. ``reconcile``)
+                  или None, если ключ строк не задан
+        """
+        rows = list(rows)
+        changes = None
+        if self.row_key is not None:
+            changes = reconcile(self.rows, rows, self.row_key)
+            active_keys = {index: self.row_key(self.rows[index]) for index in self._active}
+        self.rows = rows
+        self.total = max(total or 0, len(self.rows))
+        self._update_scrollregion()
+
+        if changes is None:
+            # Видимые карточки заполняются новыми данными при отрисовке
+            for index in list(self._active):
+                self._release(index)
+        else:
+            self._reposition(active_keys, changes)
+        self.render()
+        return changes
+
+    def append_rows(self, rows):
+        """Добавление очередной загруженной страницы строк"""
+        self.rows.extend(rows)
+        self.total = max(self.total, len(self.rows))
+        self._update_scrollregion()
+        self.render()
+
+    def refresh(self):
+        """Повторное заполнение видимых карточек текущими данными"""
+        for index, (card, _) in self._active.items():
+            self.update_card(card, self.rows[index])
+
+    def yview(self, *args):
+        """Прокрутка (команда для Scrollbar)"""
+        self.canvas.yview(*args)
+        self.render()
+
+    def scroll(self, units):
+        """Прокрутка на заданное количество шагов"""
+        self.canvas.yview_scroll(units, "units")
+        self.render()
+
+    def render(self):
+        """Отрисовка карточек, попадающих в видимую область"""
+        first, last = visible_range(
+            self.canvas.canvasy(0),
+            self.canvas.winfo_height(),
+            self.row_height,
+            self.total,
+            self.overscan
+        )
+
+        for index in list(self._active):
+            if not first <= index < last:
+                self._release(index)
+
+        # Карточки создаются только для уже загруженных строк
+        for index in range(first, min(last, len(self.rows))):
+            if index not in self._active:
+                self._acquire(index)
+
+        has_more = len(self.rows) < self.total
+        if has_more and last >= len(self.rows) and self.load_more and not self._more_pending:
+            # Подгрузка выполняется в фоне цикла событий, а не рекурсивно
+            self._more_pending = True
+            self.canvas.after_idle(self._request_more)
+
+    def _request_more(self):
+        """Запрос следующей страницы строк"""
+        self._more_pending = False
+        self.load_more()
+
+    def _acquire(self, index):
+        """Размещение карточки для строки с заданным индексом"""
+        row = self.rows[index]
+        y = index * self.row_height + self.padding
+        if self._free:
+            card, window_id = self._free.pop()
+            self.update_card(card, row)
+            self.canvas.coords(window_id, self.padding, y)
+            self.canvas.itemconfigure(window_id, state='normal')
+        else:
+            card = self.create_card(self.canvas, row)
+            window_id = self.canvas.create_window(
+                self.padding, y,
+                window=card,
+                anchor='nw',
+                width=self.item_width,
+                height=self.item_height
+            )
+        self._active[index] = (card, window_id)
+
+    def _reposition(self, active_keys, changes):
+        """Перенос видимых карточек на новые позиции их строк
+
+        Карточка удаленной строки освобождается, карточка изменившейся
+        строки заполняется заново, остальные карточки не перерисовываются.
+        """
+        active = self._active
+        self._active = {}
+        changed = set(changes['changed'])
+        for index, (card, window_id) in active.items():
+            row_key = active_keys[index]
+            new_index = changes['positions'].get(row_key)
+            if new_index is None:
+                self.canvas.itemconfigure(window_id, state='hidden')
+                self._free.append((card, window_id))
+                continue
+            if new_index != index:
+                self.canvas.coords(window_id, self.padding, new_index * self.row_height + self.padding)
+            if row_key in changed:
+                self.update_card(card, self.rows[new_index])
+            self._active[new_index] = (card, window_id)
+
+    def _release(self, index):
+        """Скрытие карточки и возврат ее в список свободных"""
+        card, window_id = self._active.pop(index)
+        self.canvas.itemconfigure(window_id, state='hidden')
+        self._free.append((card, window_id))
+
+    def _update_scrollregion(self):
+        """Расчет области прокрутки по количеству строк"""
+        height = self.total * self.row_height
+        width = self.item_width + 2 * self.padding
+        self.canvas.configure(scrollregion=(0, 0, width, height))
+
+
+class VirtualTreeview:
+    """Таблица Treeview, в которую вставлены только видимые строки
+
+    Все строки хранятся в памяти в порядке ``sort_key``, а в Treeview
+    находится только окно из ``page_size`` строк, начиная с ``top``.
+    Прокрутка (полоса прокрутки, колесо мыши, клавиши) сдвигает окно:
+    строки, ушедшие за его пределы, удаляются из Treeview, новые
+    вставляются, поэтому форматируются значения только видимых строк.
+    Изменения данных применяются к отдельным строкам (``put``, ``remove``)
+    без перезагрузки таблицы. Идентификатор строки в Treeview - строковое
+    представление ключа строки.
+    """
+    def __init__(self, tree, scrollbar, row_key, row_options, sort_key=None,
+                 row_height=20, overscan=1):
+        """
+        Args:
+            tree: ttk.Treeview (режим выбора одной строки)
+            scrollbar: вертикальная ttk.Scrollbar
+            row_key: (row) -> ключ строки
+            row_options: (row) -> параметры tree.insert/tree.item (values, tags)
+            sort_key: (row) -> ключ сортировки строк (по умолчанию ключ строки)
+            row_height: высота строки Treeview в пикселях
+            overscan: количество дополнительных строк внизу окна
+        """
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_key = row_key
+        self.row_options = row_options
+        self.sort_key = sort_key or row_key
+        self.row_height = row_height
+        self.overscan = overscan
+
+        self.top = 0
+        self.page_size = max(1, int(tree.cget('height')))
+        self.selected = None  # ключ выбранной строки (может быть вне окна)
+        self._rows = {}    # ключ -> строка
+        self._order = []   # (ключ сортировки, ключ) по возрастанию
+        self._shown = []   # ключи строк, вставленных в Treeview, по порядку
+
+        self.tree.configure(selectmode='browse', yscrollcommand='')
+        self.scrollbar.configure(command=self.yview)
+        self.tree.bind('<Configure>', self._on_configure, add='+')
+        self.tree.bind('<<TreeviewSelect>>', self._on_select, add='+')
+        self.tree.bind('<MouseWheel>', self._on_mousewheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll_break(-1))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_break(1))
+        self.tree.bind('<Up>', lambda e: self._move_selection(-1))
+        self.tree.bind('<Down>', lambda e: self._move_selection(1))
+        self.tree.bind('<Prior>', lambda e: self._move_selection(-self.page_size))
+        self.tree.bind('<Next>', lambda e: self._move_selection(self.page_size))
+
+    def __len__(self):
+        return len(self._rows)
+
+    def __contains__(self, key):
+        return key in self._rows
+
+    def get(self, key):
+        """Строка по ключу или None"""
+        return self._rows.get(key)
+
+    def values(self):
+        """Все строки в порядке сортировки"""
+        return [self._rows[key] for _, key in self._order]
+
+    def set_rows(self, rows):
+        """Замена всех строк (позиция прокрутки и выбранная строка сохраняются)"""
+        self._rows = {}
+        for row in rows:
+            self._rows[self.row_key(row)] = row
+        self._order = sorted((self.sort_key(row), key) for key, row in self._rows.items())
+        if self.selected not in self._rows:
+            self.selected = None
+        # Значения всех видимых строк заполняются заново
+        if self._shown:
+            self.tree.delete(*[str(key) for key in self._shown])
+            self._shown = []
+        self.render()
+
+    def put(self, row):
+        """Добавление строки или замена строки с тем же ключом"""
+        key = self.row_key(row)
+        old = self._rows.get(key)
+        if old is not None:
+            self._order.pop(self._position(old, key))
+        self._rows[key] = row
+        bisect.insort(self._order, (self.sort_key(row), key))
+        if old is not None and key in self._shown:
+            self.tree.item(str(key), **self.row_options(row))
+        self.render()
+
+    def remove(self, key):
+        """Удаление строки по ключу"""
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        self._order.pop(self._position(row, key))
+        if self.selected == key:
+            self.selected = None
+        self.render()
+
+    def index(self, key):
+        """Позиция строки в порядке сортировки или None"""
+        row = self._rows.get(key)
+        return None if row is None else self._position(row, key)
+
+    def see(self, key):
+        """Прокрутка к строке, если она вне окна"""
+        position = self.index(key)
+        if position is None:
+            return
+        if position < self.top:
+            self.top = position
+        elif position >= self.top + self.page_size:
+            self.top = position - self.page_size + 1
+        self.render()
+
+    def yview(self, *args):
+        """Прокрутка (команда для Scrollbar)"""
+        if not args:
+            return
+        if args[0] == 'moveto':
+            self.top = int(round(float(args[1]) * len(self._order)))
+        elif args[0] == 'scroll':
+            step = self.page_size if args[2] == 'pages' else 1
+            self.top += int(args[1]) * step
+        self.render()
+
+    def scroll(self, units):
+        """Прокрутка на заданное количество строк"""
+        self.top += units
+        self.render()
+
+    def render(self):
+        """Приведение строк Treeview к текущему окну"""
+        total = len(self._order)
+        self.top = max(0, min(self.top, total - self.page_size))
+        window = [key for _, key in self._order[self.top:self.top + self.page_size + self.overscan]]
+
+        wanted = set(window)
+        gone = [str(key) for key in self._shown if key not in wanted]
+        if gone:
+            self.tree.delete(*gone)
+        # Строки, оставшиеся в окне, переносятся только при смене позиции
+        children = [key for key in self._shown if key in wanted]
+        shown = set(children)
+        for position, key in enumerate(window):
+            if position < len(children) and children[position] == key:
+                continue
+            if key in shown:
+                self.tree.move(str(key), '', position)
+                children.remove(key)
+            else:
+                self.tree.insert('', position, iid=str(key), **self.row_options(self._rows[key]))
+            children.insert(position, key)
+        self._shown = window
+
+        if self.selected in wanted and self.tree.selection() != (str(self.selected),):
+            self.tree.selection_set(str(self.selected))
+        self._update_scrollbar()
+
+    def _position(self, row, key):
+        return bisect.bisect_left(self._order, (self.sort_key(row), key))
+
+    def _update_scrollbar(self):
+        total = len(self._order)
+        if total <= self.page_size:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(self.top / total, min(1.0, (self.top + self.page_size) / total))
+
+    def _on_configure(self, event):
+        """Пересчет количества видимых строк при изменении размера"""
+        # Одна строка приходится на заголовки колонок
+        page_size = max(1, event.height // self.row_height - 1)
+        if page_size != self.page_size:
+            self.page_size = page_size
+            self.render()
+
+    def _on_select(self, event=None):
+        """Запоминание выбранной строки, которая может уйти из окна"""
+        selection = self.tree.selection()
+        if selection:
+            for key in self._shown:
+                if str(key) == selection[0]:
+                    self.selected = key
+                    break
+        elif self.selected in self._shown:
+            self.selected = None
+
+    def _on_mousewheel(self, event):
+        return self._scroll_break(int(-1 * (event.delta / 120)) * 3)
+
+    def _scroll_break(self, units):
+        self.scroll(units)
+        # Treeview не прокручивает содержимое сам
+        return 'break'
+
+    def _move_selection(self, step):
+        """Перемещение выбора клавишами с прокруткой окна"""
+        if not self._order:
+            return 'break'
+        position = self.index(self.selected)
+        position = self.top if position is None else position + step
+        position = max(0, min(position, len(self._order) - 1))
+        self.selected = self._order[position][1]
+        self.see(self.selected)
+        self.tree.focus(str(self.selected))
+        return 'break'